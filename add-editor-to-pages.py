@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
 """
 Add Visual Editor scripts to all HTML files
+
+--dry-run reports the pages that would change; --diff FILE saves the
+changes as a patch instead of writing them.
 """
 
-import os
-import re
+import argparse
+from functools import partial
 from pathlib import Path
 
+from site_tools.parallel import add_workers_argument, run_parallel
+from site_tools.writes import TextFile, add_dry_run_arguments, dry_run_options
+
 # The editor scripts to add
 EDITOR_SCRIPTS = """  <!-- Visual Editor Scripts -->
   <script src="https://cdn.jsdelivr.net/npm/@sanity/client@6.22.7/dist/index.browser.js"></script>
@@ -23,58 +29,66 @@ def should_skip_file(filepath):
     ]
     return any(pattern in str(filepath) for pattern in skip_patterns)
 
-def add_editor_to_file(filepath):
-    """Add visual editor scripts to a single HTML file"""
+def add_editor_to_file(dry_run, diff, filepath):
+    """
+    Add visual editor scripts to a single HTML file.
+    Returns (added, unified diff or None).
+    """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        page = TextFile.read(filepath)
+        content = page.text
         
         # Check if already has the editor
         if 'visual-editor.js' in content:
             print(f"✓ Skipping {filepath} (already has editor)")
-            return False
+            return False, None
         
         # Check if has </head> tag
         if '</head>' not in content:
             print(f"⚠ Skipping {filepath} (no </head> tag found)")
-            return False
+            return False, None
         
         # Add scripts before </head>
         new_content = content.replace('</head>', f'{EDITOR_SCRIPTS}</head>')
         
         # Write back
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content)
+        patch = page.diff(new_content) if diff else None
+        page.write(new_content, dry_run=dry_run)
         
-        print(f"✅ Added editor to {filepath}")
-        return True
+        print(f"✅ {'Would add' if dry_run else 'Added'} editor to {filepath}")
+        return True, patch
         
     except Exception as e:
         print(f"❌ Error processing {filepath}: {e}")
-        return False
+        return False, None
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Add Visual Editor scripts to all HTML files")
+    add_workers_argument(parser)
+    add_dry_run_arguments(parser)
+    args = parser.parse_args()
+    dry_run, diffs = dry_run_options(args)
+
     root_dir = Path('.')
-    html_files = root_dir.rglob('*.html')
+    html_files = sorted(f for f in root_dir.rglob('*.html') if not should_skip_file(f))
     
-    added_count = 0
-    skipped_count = 0
-    
-    for filepath in html_files:
-        if should_skip_file(filepath):
-            continue
-        
-        if add_editor_to_file(filepath):
-            added_count += 1
-        else:
-            skipped_count += 1
+    # Files are independent; output is replayed in path order
+    worker = partial(add_editor_to_file, dry_run, diffs is not None)
+    results = run_parallel(worker, html_files, args.workers)
+    added_count = sum(added for added, _ in results)
+    skipped_count = len(results) - added_count
+    if diffs is not None:
+        for _, patch in results:
+            diffs.add(patch)
     
     print("\n" + "="*60)
     print(f"✅ Visual editor has been added to {added_count} pages!")
     print(f"⏭️  Skipped {skipped_count} pages")
     print("🎨 Access editor on any page by adding ?editor=true to the URL")
     print("="*60)
+    if diffs is not None:
+        diffs.write(args.diff)
 
 if __name__ == '__main__':
     main()
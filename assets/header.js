@@ -6,7 +6,10 @@
   // Banner removed per user request
 
   const mount = document.getElementById('site-header');
-  if (!mount) return;
+  // pages built by inline-header.py already contain the header
+  const inlined = document.querySelector('.site-header[data-inlined]');
+  if (!mount && !inlined) return;
+  if (inlined) window._dropdownsInitialized = true;
 
   // helper to safely fetch text; returns null on non-200 or non-text responses
   function safeFetchText(url) {
@@ -23,14 +26,21 @@
       .catch(() => null);
   }
 
-  safeFetchText('/assets/header.html?v=26').then(html => {
-    if (!html) {
-      // fallback: do nothing (avoid replacing mount with invalid content)
-      return;
-    }
+  const headerReady = inlined
+    ? Promise.resolve(true)
+    : safeFetchText('/assets/header.html?v=26').then(html => {
+        if (!html) {
+          // fallback: do nothing (avoid replacing mount with invalid content)
+          return false;
+        }
+
+        // Replace the placeholder so the header is a top-level element
+        mount.outerHTML = html;
+        return true;
+      });
 
-    // Replace the placeholder so the header is a top-level element
-    mount.outerHTML = html;
+  headerReady.then(ready => {
+    if (!ready) return;
 
     // --- after header inserted ---
     const normalize = (p) => p
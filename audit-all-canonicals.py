@@ -4,32 +4,21 @@ Comprehensive audit and fix of ALL canonical URLs across the entire site
 Ensures they match the sitemap.xml exactly
 """
 
+import argparse
 import os
 import re
 from pathlib import Path
-import xml.etree.ElementTree as ET
 
-def extract_urls_from_sitemap(sitemap_path):
-    """Extract all URLs from sitemap.xml"""
-    tree = ET.parse(sitemap_path)
-    root = tree.getroot()
-    
-    # Handle XML namespace
-    namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-    urls = []
-    
-    for url in root.findall('ns:url', namespace):
-        loc = url.find('ns:loc', namespace)
-        if loc is not None:
-            urls.append(loc.text)
-    
-    return urls
+from site_tools.cache import Manifest, add_cache_argument, version_of
+from site_tools.headreader import read_head
+from site_tools.parallel import add_workers_argument, run_parallel
+from site_tools.urls import extract_urls_from_sitemap, is_file_url, url_to_file_path
+from site_tools.writes import TextFile
 
 def get_canonical_from_file(file_path):
-    """Extract canonical URL from HTML file"""
+    """Extract canonical URL from HTML file (only <head> is read)"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = read_head(file_path)
         
         # Find canonical tag
         match = re.search(r'<link rel="canonical" href="([^"]+)"', content, re.IGNORECASE)
@@ -39,11 +28,14 @@ def get_canonical_from_file(file_path):
         print(f"   ⚠️  Error reading {file_path}: {e}")
     return None
 
+# Cached canonicals are invalidated whenever the extraction code changes
+CANONICAL_CHECK = {'canonical': version_of(get_canonical_from_file)}
+
 def fix_canonical_in_file(file_path, expected_url):
     """Fix canonical URL in HTML file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        page = TextFile.read(file_path)
+        content = page.text
         
         # Find and replace canonical tag
         pattern = r'<link rel="canonical" href="[^"]+"'
@@ -51,34 +43,57 @@ def fix_canonical_in_file(file_path, expected_url):
         
         new_content = re.sub(pattern, replacement, content, flags=re.IGNORECASE)
         
-        if new_content != content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True
+        return page.write(new_content)
     except Exception as e:
         print(f"   ⚠️  Error fixing {file_path}: {e}")
     return False
 
-def url_to_file_path(url):
-    """Convert sitemap URL to local file path"""
-    # Remove base URL
-    path = url.replace('https://www.creativejobhub.com', '')
+def audit_url(url, cached=None):
+    """
+    Check (and fix) the canonical tag of the page behind one sitemap URL.
+    cached is (canonical,) when the manifest already knows the page's tag.
+    Returns (status, url, file_path, canonical) where status is one of
+    'missing', 'no-canonical', 'fixed', 'failed' or 'correct'.
+    """
+    file_path = url_to_file_path(url)
     
-    if not path or path == '/':
-        return 'index.html'
+    # Skip if file doesn't exist
+    if not os.path.exists(file_path):
+        return 'missing', url, file_path, None
     
-    # Handle .html files
-    if path.endswith('.html'):
-        return path.lstrip('/')
+    canonical = cached[0] if cached else get_canonical_from_file(file_path)
     
-    # Handle directory URLs with trailing slash
-    if path.endswith('/'):
-        return path.lstrip('/') + 'index.html'
+    if canonical is None:
+        print(f"❌ {file_path}")
+        print(f"   Sitemap: {url}")
+        print(f"   Issue: NO CANONICAL TAG\n")
+        return 'no-canonical', url, file_path, None
     
-    # Shouldn't happen but handle just in case
-    return path.lstrip('/') + '/index.html'
+    if canonical != url:
+        print(f"⚠️  {file_path}")
+        print(f"   Sitemap:   {url}")
+        print(f"   Canonical: {canonical}")
+        
+        # Fix it
+        if fix_canonical_in_file(file_path, url):
+            print(f"   ✅ FIXED\n")
+            return 'fixed', url, file_path, canonical
+        print(f"   ❌ FAILED TO FIX\n")
+        return 'failed', url, file_path, canonical
+    
+    print(f"✅ {file_path} - CORRECT")
+    return 'correct', url, file_path, canonical
+
+def _audit_item(item):
+    """run_parallel() entry point for (url, cached) pairs"""
+    return audit_url(*item)
 
 def main():
+    parser = argparse.ArgumentParser(description="Audit and fix canonical URLs against sitemap.xml")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
     print("=" * 80)
     print("COMPREHENSIVE CANONICAL URL AUDIT")
     print("=" * 80)
@@ -89,7 +104,8 @@ def main():
         print(f"❌ Sitemap not found: {sitemap_path}")
         return
     
-    urls = extract_urls_from_sitemap(sitemap_path)
+    # CMS posts (blog/post.html?slug=...) are rendered in the browser from one page
+    urls = [url for url in extract_urls_from_sitemap(sitemap_path) if is_file_url(url)]
     print(f"\n📋 Found {len(urls)} URLs in sitemap.xml\n")
     
     issues = []
@@ -97,36 +113,39 @@ def main():
     correct = []
     missing = []
     
+    # Pages whose content hasn't changed since the last audit reuse the
+    # canonical recorded then, so they are not read at all
+    manifest = Manifest('.', reset=args.no_cache)
+    items = []
     for url in urls:
         file_path = url_to_file_path(url)
+        if os.path.exists(file_path) and manifest.is_fresh(file_path, CANONICAL_CHECK):
+            items.append((url, (manifest.result(file_path, 'canonical'),)))
+        else:
+            items.append((url, None))
+    
+    # Pages are audited in parallel; results and output stay in sitemap order.
+    # A fully cached run is cheaper than starting a pool.
+    stale = sum(1 for _, cached in items if cached is None)
+    results = run_parallel(_audit_item, items, args.workers if stale else 1)
+    for (_, cached), (status, url, file_path, canonical) in zip(items, results):
+        if status != 'missing' and (cached is None or status == 'fixed'):
+            found = url if status == 'fixed' else canonical
+            # Only <head> was read, so record without a full-file hash
+            manifest.record_unhashed(file_path, CANONICAL_CHECK, {'canonical': found})
         
-        # Skip if file doesn't exist
-        if not os.path.exists(file_path):
+        if status == 'missing':
             missing.append((url, file_path))
-            continue
-        
-        canonical = get_canonical_from_file(file_path)
-        
-        if canonical is None:
+        elif status == 'no-canonical':
             issues.append((url, file_path, "NO CANONICAL TAG FOUND"))
-            print(f"❌ {file_path}")
-            print(f"   Sitemap: {url}")
-            print(f"   Issue: NO CANONICAL TAG\n")
-        elif canonical != url:
+        elif status in ('fixed', 'failed'):
             issues.append((url, file_path, f"Mismatch: {canonical}"))
-            print(f"⚠️  {file_path}")
-            print(f"   Sitemap:   {url}")
-            print(f"   Canonical: {canonical}")
-            
-            # Fix it
-            if fix_canonical_in_file(file_path, url):
+            if status == 'fixed':
                 fixed.append(file_path)
-                print(f"   ✅ FIXED\n")
-            else:
-                print(f"   ❌ FAILED TO FIX\n")
         else:
             correct.append(file_path)
-            print(f"✅ {file_path} - CORRECT")
+    
+    manifest.save()
     
     # Summary
     print("\n" + "=" * 80)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: head-only streaming read vs full-file read for canonical lookups.
+
+Runs the canonical regex over every HTML page both ways and reports time
+and the bytes read from disk (read_head() reads whole chunks, so that is
+more than the head it returns). Run from the repo root:
+
+  python3 benchmarks/bench_head_reader.py
+  python3 benchmarks/bench_head_reader.py --repeat 20 --root /path/to/site
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from site_tools.files import iter_html_files
+from site_tools.headreader import CHUNK_SIZE, read_head, read_head_bytes
+
+CANONICAL_RE = re.compile(r'<link rel="canonical" href="([^"]+)"', re.IGNORECASE)
+
+
+def full_read(file_path):
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def head_disk_bytes(file_path):
+    """Bytes read_head_bytes() reads from disk: whole chunks up to the one with </head>"""
+    chunks = -(-len(read_head_bytes(file_path)) // CHUNK_SIZE)
+    return min(os.path.getsize(file_path), chunks * CHUNK_SIZE)
+
+
+def run(reader, disk_bytes, files, repeat):
+    """Return (best seconds per pass, bytes read from disk per pass, canonicals found)"""
+    best = None
+    for _ in range(repeat):
+        found = []
+        start = time.perf_counter()
+        for file_path in files:
+            content = reader(file_path)
+            match = CANONICAL_RE.search(content)
+            found.append(match.group(1) if match else None)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    # Counted outside the timed passes
+    bytes_read = sum(disk_bytes(file_path) for file_path in files)
+    return best, bytes_read, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark head-only reads against full reads")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--repeat', type=int, default=10, help="passes per reader (best is kept)")
+    args = parser.parse_args()
+
+    files = list(iter_html_files(args.root))
+    print(f"📄 {len(files)} HTML files, best of {args.repeat} passes\n")
+
+    full_time, full_bytes, full_found = run(full_read, os.path.getsize, files, args.repeat)
+    head_time, head_bytes, head_found = run(read_head, head_disk_bytes, files, args.repeat)
+
+    if full_found != head_found:
+        print("❌ Head-only read found different canonicals than the full read!")
+        sys.exit(1)
+
+    print(f"{'reader':<12} {'ms/pass':>10} {'MB read':>10} {'files/s':>10}")
+    for name, elapsed, bytes_read in (('full read', full_time, full_bytes),
+                                      ('head only', head_time, head_bytes)):
+        print(f"{name:<12} {elapsed * 1000:>10.2f} {bytes_read / 1e6:>10.2f} "
+              f"{len(files) / elapsed:>10.0f}")
+    print(f"\n✅ Same canonicals; head-only reads {head_bytes / full_bytes:.0%} of the bytes "
+          f"in {head_time / full_time:.0%} of the time")
+
+
+if __name__ == '__main__':
+    main()
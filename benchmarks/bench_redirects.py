@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled RedirectTable.resolve() vs a first-match scan of the
+rule list, as the number of rules grows.
+
+Rules are synthetic: mostly exact sources like the ones in _redirects,
+plus one pattern ("/section-N/*") in twenty. Lookups are an even mix of
+exact hits, pattern hits and misses. Run from the repo root:
+
+  python3 benchmarks/bench_redirects.py
+  python3 benchmarks/bench_redirects.py --sizes 100 1000 10000 50000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from site_tools.redirects import Redirect, RedirectTable
+
+
+def make_rules(count):
+    rules = []
+    for number in range(count):
+        if number % 20 == 0:
+            rules.append(Redirect(f'/section-{number}/*', f'/archive/{number}/:splat',
+                                  origin='bench', line=number))
+        else:
+            rules.append(Redirect(f'/old-page-{number}.html', f'/pages/{number}/',
+                                  origin='bench', line=number))
+    return rules
+
+
+def make_paths(count, lookups, seed=1):
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(lookups):
+        number = rng.randrange(count)
+        kind = rng.randrange(3)
+        if kind == 0:
+            paths.append(f'/old-page-{number}.html')
+        elif kind == 1:
+            paths.append(f'/section-{number - number % 20}/post/{number}')
+        else:
+            paths.append(f'/missing-{number}/')
+    return paths
+
+
+class LinearTable:
+    """The straightforward version: try every rule in order"""
+
+    def __init__(self, redirects):
+        self.rules = []
+        for redirect in redirects:
+            if redirect.source.endswith('/*'):
+                pattern = re.compile(re.escape(redirect.source[:-1]) + '(.*)$')
+            else:
+                pattern = None
+            self.rules.append((redirect, pattern))
+
+    def resolve(self, path):
+        for redirect, pattern in self.rules:
+            if pattern is None:
+                if redirect.source == path:
+                    return redirect
+            elif pattern.match(path):
+                return redirect
+        return None
+
+
+def time_lookups(table, paths, repeat):
+    """Best nanoseconds per lookup over repeat passes"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            table.resolve(path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(paths) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark redirect lookups")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 5000, 20000],
+                        help="rule counts to test")
+    parser.add_argument('--lookups', type=int, default=3000, help="lookups per pass")
+    parser.add_argument('--repeat', type=int, default=5, help="passes (best is reported)")
+    parser.add_argument('--linear-limit', type=int, default=5000,
+                        help="skip the linear scan above this many rules")
+    args = parser.parse_args()
+
+    print(f"{'rules':>8} {'compile ms':>11} {'table ns/op':>12} {'linear ns/op':>13}")
+    for size in args.sizes:
+        rules = make_rules(size)
+        paths = make_paths(size, args.lookups)
+
+        start = time.perf_counter()
+        table = RedirectTable(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        # Both must agree before either is timed
+        linear = LinearTable(rules) if size <= args.linear_limit else None
+        for path in paths[:200]:
+            hit = table.resolve(path)
+            if linear is not None:
+                expected = linear.resolve(path)
+                assert (hit is None) == (expected is None), path
+                assert hit is None or hit.location == expected.location, path
+
+        table_ns = time_lookups(table, paths, args.repeat)
+        if linear is not None:
+            linear_ns = f"{time_lookups(linear, paths[:max(50, args.lookups // size)], 1):13,.0f}"
+        else:
+            linear_ns = f"{'-':>13}"
+        print(f"{size:>8,} {compile_ms:>11.1f} {table_ns:>12,.0f} {linear_ns}")
+
+
+if __name__ == '__main__':
+    main()
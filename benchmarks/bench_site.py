@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Benchmark the maintenance scripts against synthetic sites of growing size.
+
+For each size a site is generated with synthetic_site.py, then every
+script in SCRIPTS runs on it once, in order, as a separate process (so
+the numbers include interpreter start-up, as in real use). Caches are
+bypassed with --no-cache where a script has one. For each run:
+
+  seconds      wall time
+  files/s      HTML pages in the site / seconds
+  MB/s         HTML bytes in the site / seconds
+  peak RSS     largest resident set of the script or any of its workers
+
+Results are saved to .site-cache/bench/<commit>.json (<commit>-dirty
+with uncommitted changes), and --compare shows the change against the
+results of another commit:
+
+  python3 benchmarks/bench_site.py
+  python3 benchmarks/bench_site.py --sizes 100 1000 --scripts audit-all-canonicals
+  python3 benchmarks/bench_site.py --compare HEAD~1
+
+The 50,000-page site takes about 2 GB of disk; --work-dir picks where.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from site_tools.cache import CACHE_DIR, write_json
+from synthetic_site import REPO_ROOT, generate
+
+SIZES = (100, 1000, 10000, 50000)
+
+# (script, arguments); {workers} is replaced by --workers
+SCRIPTS = (
+    ('audit-all-canonicals.py', ['--no-cache', '-j', '{workers}']),
+    ('head-index.py', ['--canonical-mismatches']),
+    ('update-og-images.py', ['-j', '{workers}']),
+    ('update-css-version.py', ['-j', '{workers}']),
+    ('update-header-version.py', []),
+    ('fix-logo-paths.py', []),
+    ('fix-sanity-cdn.py', []),
+    ('fix-feature-titles.py', ['--no-cache']),
+    ('add-editor-to-pages.py', ['-j', '{workers}']),
+    ('release-rewrite.py', ['--no-cache', '-j', '{workers}']),
+    ('reorder-head.py', ['--no-cache', '-j', '{workers}']),
+    ('inline-header.py', ['--no-cache', '-j', '{workers}']),
+    ('minify-html.py', ['--no-cache', '-j', '{workers}']),
+    ('build-sitemap.py', ['--lastmod', 'mtime']),
+    ('build-feed.py', ['--no-cache']),
+    ('build-css.py', ['--check', '-j', '{workers}']),
+    ('check-links.py', ['-j', '{workers}']),
+    ('check-budgets.py', ['--top', '0', '-j', '{workers}']),
+    ('dedupe-assets.py', ['--dry-run', '--no-cache', '-j', '{workers}']),
+    ('gc-assets.py', ['--no-cache', '-j', '{workers}']),
+    ('precompress.py', ['--no-cache', '-j', '{workers}']),
+)
+
+# Exit status 1 from these means they found problems, not that they failed
+REPORTS_FINDINGS = ('check-links.py', 'check-budgets.py', 'gc-assets.py')
+
+# Slower by more than this fraction is flagged by --compare
+REGRESSION_THRESHOLD = 0.10
+
+
+def git_revision(ref='HEAD'):
+    """Short commit id of ref, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', ref], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def is_dirty():
+    result = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                            cwd=REPO_ROOT, capture_output=True, text=True)
+    return bool(result.stdout.strip())
+
+
+def run_script(site, script, arguments, log_path):
+    """Run one script on site: (seconds, peak RSS in bytes, exit status)"""
+    # The script runs from inside the site, so tools that locate the site
+    # from their own path (update-og-images.py) see the synthetic one too
+    shutil.copy2(os.path.join(REPO_ROOT, script), os.path.join(site, script))
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    with open(log_path, 'wb') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, script] + arguments, cwd=site, env=env,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the child's own peak RSS, including the workers it waited for
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    os.remove(os.path.join(site, script))
+    return elapsed, usage.ru_maxrss * 1024, process.returncode
+
+
+def last_line(log_path):
+    with open(log_path, 'r', encoding='utf-8', errors='replace') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    return lines[-1] if lines else ''
+
+
+def results_path(revision):
+    return os.path.join(REPO_ROOT, CACHE_DIR, 'bench', f"{revision}.json")
+
+
+def compare(current, baseline):
+    """Print timings against a baseline run; returns the regressions found"""
+    before = {(r['size'], r['script']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n📊 Against {baseline['commit']} ({baseline['date'][:10]}):")
+    for result in current['results']:
+        old = before.get((result['size'], result['script']))
+        if old is None or not old['seconds']:
+            continue
+        change = result['seconds'] / old['seconds'] - 1
+        flag = '⚠️ ' if change > REGRESSION_THRESHOLD else '  '
+        print(f"{flag} {result['size']:>7,} {result['script']:<28} "
+              f"{old['seconds']:>8.2f}s -> {result['seconds']:>8.2f}s ({change:+.0%})")
+        if change > REGRESSION_THRESHOLD:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark maintenance scripts on synthetic sites")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help=f"pages per site (default: {' '.join(map(str, SIZES))})")
+    parser.add_argument('--scripts', nargs='+', metavar='NAME',
+                        help="scripts to run, with or without .py (default: all)")
+    parser.add_argument('-j', '--workers', type=int, default=1,
+                        help="worker processes for scripts that take -j (default: 1)")
+    parser.add_argument('--work-dir', help="where to generate sites (default: a temp directory)")
+    parser.add_argument('--compare', metavar='REV', help="compare with saved results for a commit")
+    parser.add_argument('--no-save', action='store_true', help="don't save the results")
+    args = parser.parse_args()
+
+    scripts = SCRIPTS
+    if args.scripts:
+        wanted = {name if name.endswith('.py') else name + '.py' for name in args.scripts}
+        unknown = wanted - {script for script, _ in SCRIPTS}
+        if unknown:
+            parser.error(f"unknown script(s): {', '.join(sorted(unknown))}")
+        scripts = [entry for entry in SCRIPTS if entry[0] in wanted]
+
+    revision = git_revision() or 'unknown'
+    if revision != 'unknown' and is_dirty():
+        revision += '-dirty'
+    run = {
+        'commit': revision,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'workers': args.workers,
+        'results': [],
+    }
+
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='site-bench-')
+    os.makedirs(work_dir, exist_ok=True)
+    print(f"{'pages':>7} {'script':<28} {'seconds':>8} {'files/s':>9} {'MB/s':>7} {'peak RSS':>9}")
+    try:
+        for size in args.sizes:
+            site = os.path.join(work_dir, f"site-{size}")
+            start = time.perf_counter()
+            paths, total = generate(site, size)
+            print(f"🏗️  {len(paths):,} pages, {total / 1024 / 1024:.1f} MB generated "
+                  f"in {time.perf_counter() - start:.1f}s")
+            for script, arguments in scripts:
+                arguments = [a.replace('{workers}', str(args.workers)) for a in arguments]
+                log_path = os.path.join(work_dir, f"{size}-{script}.log")
+                seconds, peak, status = run_script(site, script, arguments, log_path)
+                result = {
+                    'size': len(paths),
+                    'script': script,
+                    'seconds': round(seconds, 4),
+                    'files_per_s': round(len(paths) / seconds, 1),
+                    'mb_per_s': round(total / 1024 / 1024 / seconds, 2),
+                    'peak_rss_mb': round(peak / 1024 / 1024, 1),
+                    'exit': status,
+                }
+                run['results'].append(result)
+                failed = ''
+                if status and not (status == 1 and script in REPORTS_FINDINGS):
+                    failed = f"  ❌ exit {status}: {last_line(log_path)}"
+                print(f"{len(paths):>7,} {script:<28} {seconds:>8.2f} {result['files_per_s']:>9,.0f} "
+                      f"{result['mb_per_s']:>7.1f} {result['peak_rss_mb']:>7.1f}MB{failed}")
+            shutil.rmtree(site)
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not args.no_save:
+        path = results_path(revision)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json(path, run)
+        print(f"\n📄 Saved {os.path.relpath(path, REPO_ROOT)}")
+
+    if args.compare:
+        baseline_revision = git_revision(args.compare) or args.compare
+        path = results_path(baseline_revision)
+        if not os.path.exists(path):
+            print(f"❌ No saved results for {args.compare} ({os.path.relpath(path, REPO_ROOT)})")
+            sys.exit(1)
+        with open(path, 'r', encoding='utf-8') as f:
+            regressions = compare(run, json.load(f))
+        if regressions:
+            print(f"\n⚠️  {len(regressions)} runs more than {REGRESSION_THRESHOLD:.0%} slower")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Serve blog content on localhost the way the Sanity query endpoint does,
+so sync-sanity.py can be run and timed without the real API.
+
+It answers the two queries snapshot.py sends (changed documents after a
+cursor, and the ids that exist) from an export, or from generated posts:
+
+  python3 benchmarks/sanity_standin.py --export sanity-export.tar.gz
+  python3 benchmarks/sanity_standin.py --posts 5000 --port 8765
+  python3 sync-sanity.py --api-url http://127.0.0.1:8765/v2024-01-01/data/query/production
+
+The export is read again whenever its mtime changes, so editing it and
+syncing again exercises the delta path. Any other query gets a 400.
+
+--check runs a full sync, a delta sync and a deletion against generated
+posts on a free port and exits 1 if the snapshot gets any of them wrong:
+
+  python3 benchmarks/sanity_standin.py --check
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from site_tools import cms, snapshot
+
+_DELTA_RE = re.compile(re.escape(snapshot.DELTA_QUERY) + r'\[0\.\.\.(\d+)\]$')
+
+
+def generated_posts(count):
+    """count blogPost documents plus the categories they reference"""
+    docs = [{'_id': f'category-{n}', '_type': cms.CATEGORY_TYPE,
+             '_updatedAt': '2025-01-01T00:00:00Z', 'title': title}
+            for n, title in enumerate(('Scheduling', 'Invoicing', 'Field Service Management'))]
+    for n in range(count):
+        day = f"2025-{n % 12 + 1:02d}-{n % 28 + 1:02d}"
+        docs.append({
+            '_id': f'post-{n:05d}', '_type': cms.POST_TYPE, '_rev': 'r1',
+            '_updatedAt': f'{day}T12:00:00Z', 'publishedAt': f'{day}T09:00:00Z',
+            'title': f'Field Service Tips, Part {n}', 'slug': {'current': f'field-service-tips-{n:05d}'},
+            'author': 'Creative Job Hub Team',
+            'excerpt': f'Practical advice for small field service teams, part {n}.',
+            'categories': [{'_type': 'reference', '_ref': f'category-{n % 3}'}],
+            'body': [{'_type': 'block', 'style': 'normal',
+                      'children': [{'_type': 'span', 'text': f'Paragraph {p} of post {n}.'}]}
+                     for p in range(5)],
+        })
+    return docs
+
+
+class Content:
+    """The documents being served, reloaded when the export changes"""
+
+    def __init__(self, export=None, posts=0):
+        self.export = export
+        self.mtime = None
+        self.docs = generated_posts(posts) if export is None else []
+
+    def current(self):
+        if self.export is not None:
+            mtime = os.path.getmtime(self.export)
+            if mtime != self.mtime:
+                self.docs = [doc for doc in cms.read_export(self.export) if '_id' in doc]
+                self.mtime = mtime
+        return self.docs
+
+    def answer(self, query, params):
+        types = params.get('types', [])
+        docs = [doc for doc in self.current() if doc.get('_type') in types
+                and not doc['_id'].startswith('drafts.')]
+        if query == snapshot.IDS_QUERY:
+            return [doc['_id'] for doc in docs]
+        match = _DELTA_RE.match(query)
+        if match is None:
+            return None
+        since, last_id = params['since'], params['lastId']
+        changed = sorted((doc for doc in docs
+                          if (doc.get('_updatedAt', ''), doc['_id']) > (since, last_id)),
+                         key=lambda doc: (doc.get('_updatedAt', ''), doc['_id']))
+        return changed[:int(match.group(1))]
+
+
+def make_handler(content, verbose):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            fields = parse_qs(urlsplit(self.path).query)
+            query = fields.get('query', [''])[0]
+            try:
+                params = {name[1:]: json.loads(values[0]) for name, values in fields.items()
+                          if name.startswith('$')}
+                result = content.answer(query, params)
+            except (KeyError, ValueError) as e:
+                result, query = None, f"{query} ({e})"
+            if result is None:
+                self._send(400, {'error': {'description': f'unsupported query: {query}'}})
+            else:
+                self._send(200, {'ms': 0, 'query': query, 'result': result})
+
+        def _send(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def check(posts=1200):
+    """Sync a temporary snapshot through a full, a delta and a deletion pass; returns failures"""
+    content = Content(posts=posts)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(content, False))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = (f"http://127.0.0.1:{server.server_address[1]}"
+               f"/v{snapshot.SANITY_API_VERSION}/data/query/{snapshot.SANITY_DATASET}")
+    failures = []
+
+    def expect(label, actual, wanted):
+        mark = '✅' if actual == wanted else '❌'
+        print(f"{mark} {label}: {actual}" + ('' if actual == wanted else f" (expected {wanted})"))
+        if actual != wanted:
+            failures.append(label)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp, \
+                snapshot.Snapshot(os.path.join(tmp, 'sanity.sqlite')) as snap:
+            client = snapshot.QueryClient(api_url)
+            total = len(content.docs)
+            report = snap.sync(client)
+            expect("full sync fetched", report.fetched, total)
+            expect("full sync stored", snap.count(), total)
+
+            # Edit one post and publish a new one: only those two come back
+            edited = content.docs[-1]
+            edited['_updatedAt'] = '2026-01-01T00:00:00Z'
+            edited['title'] = 'Edited'
+            added = dict(content.docs[-2], _id='post-new', _updatedAt='2026-01-02T00:00:00Z',
+                         slug={'current': 'new-post'})
+            content.docs.append(added)
+            report = snap.sync(client)
+            expect("delta sync fetched", report.fetched, 2)
+            expect("delta sync requests", report.requests, 2)
+            expect("edited post title", snap.post(edited['slug']['current'])['title'], 'Edited')
+            expect("new post lastmod", snap.updated().get('new-post'), added['_updatedAt'])
+
+            content.docs.remove(edited)
+            report = snap.sync(client)
+            expect("deletion sync fetched", report.fetched, 0)
+            expect("deletion sync deleted", report.deleted, 1)
+            expect("deleted post gone", snap.post(edited['slug']['current']), None)
+            expect("stored after deletion", snap.count(), total)
+    finally:
+        server.shutdown()
+        server.server_close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in for the Sanity query API")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--export', help="export to serve (.tar.gz, .ndjson, .json)")
+    source.add_argument('--posts', type=int, help="serve this many generated posts")
+    source.add_argument('--check', action='store_true',
+                        help="check full, delta and deletion syncs against a stand-in, then exit")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check()
+        if failures:
+            print(f"\n❌ {len(failures)} sync check(s) failed")
+            raise SystemExit(1)
+        print("\n✅ Snapshot sync matches the stand-in")
+        return
+
+    content = Content(args.export, args.posts or 0)
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(content, args.verbose))
+    print(f"Serving {len(content.current())} documents on "
+          f"http://127.0.0.1:{args.port}/v{snapshot.SANITY_API_VERSION}/data/query/{snapshot.SANITY_DATASET}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
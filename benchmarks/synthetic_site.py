@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic copy of the site with any number of pages.
+
+Pages are stamped out of real pages from the repo, so they have the same
+size, head layout and markup the maintenance scripts see in production:
+
+  features/<name>-NNNNN/index.html                  from features/analytics/
+  <trade>-NNNNN-field-service-software/index.html   from carpet-cleaning-...
+  blog/posts/<slug>-NNNNN/index.html                from a blog post
+
+Each copy has its own URL in canonical, og:url and internal links to
+itself, and sitemap.xml lists every page. The home page, shared assets,
+robots.txt, _redirects and vercel.json are copied as they are.
+
+  python3 benchmarks/synthetic_site.py /tmp/site-10k --pages 10000
+"""
+import argparse
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from site_tools.urls import file_path_to_url
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# (template page, URL path stamped per copy, new path with {n}, share of pages)
+TEMPLATES = (
+    ('features/analytics/index.html', '/features/analytics',
+     '/features/analytics-{n}', 4),
+    ('carpet-cleaning-field-service-software/index.html', '/carpet-cleaning-field-service-software',
+     '/carpet-cleaning-{n}-field-service-software', 3),
+    ('blog/posts/getting-started-field-service-management/index.html',
+     '/blog/posts/getting-started-field-service-management',
+     '/blog/posts/getting-started-field-service-management-{n}', 3),
+)
+
+# Copied unchanged: what the scripts expect next to the pages
+SHARED_FILES = ('index.html', 'robots.txt', '_redirects', 'vercel.json')
+SHARED_ASSET_SUFFIXES = ('.css', '.js', '.html')
+
+
+def _copy_shared(source_root, root):
+    for name in SHARED_FILES:
+        source = os.path.join(source_root, name)
+        if os.path.exists(source):
+            shutil.copy2(source, os.path.join(root, name))
+    assets = os.path.join(source_root, 'assets')
+    os.makedirs(os.path.join(root, 'assets'), exist_ok=True)
+    for name in sorted(os.listdir(assets)):
+        if name.endswith(SHARED_ASSET_SUFFIXES):
+            shutil.copy2(os.path.join(assets, name), os.path.join(root, 'assets', name))
+
+
+def _sitemap(paths):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for path in paths:
+        lines.append(f"  <url>\n    <loc>{file_path_to_url(path)}</loc>\n  </url>")
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def generate(root, pages, source_root=REPO_ROOT):
+    """
+    Write a site with pages generated pages (plus the home page) under
+    root, replacing anything there. Returns (page paths, total bytes).
+    """
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    os.makedirs(root)
+    _copy_shared(source_root, root)
+
+    templates = []
+    for template, old_path, new_path, share in TEMPLATES:
+        with open(os.path.join(source_root, template), 'r', encoding='utf-8') as f:
+            templates.extend([(f.read(), old_path, new_path)] * share)
+
+    paths = ['index.html']
+    total = os.path.getsize(os.path.join(root, 'index.html'))
+    for number in range(pages):
+        content, old_path, new_path = templates[number % len(templates)]
+        url_path = new_path.format(n=f'{number:05d}')
+        path = url_path.lstrip('/') + '/index.html'
+        data = content.replace(old_path, url_path).encode('utf-8')
+        os.makedirs(os.path.join(root, os.path.dirname(path)), exist_ok=True)
+        with open(os.path.join(root, path), 'wb') as f:
+            f.write(data)
+        paths.append(path)
+        total += len(data)
+
+    with open(os.path.join(root, 'sitemap.xml'), 'w', encoding='utf-8') as f:
+        f.write(_sitemap(paths))
+    return paths, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic site for benchmarks")
+    parser.add_argument('root', help="directory to create (replaced if it exists)")
+    parser.add_argument('--pages', type=int, default=1000, help="pages to generate (default: 1000)")
+    args = parser.parse_args()
+
+    paths, total = generate(args.root, args.pages)
+    print(f"✓ {len(paths)} pages, {total / 1024 / 1024:.1f} MB in {args.root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Build the minified stylesheet and per-page/per-group pruned subsets.
+
+  - assets/site.css is minified into assets/site.min.css
+  - --groups writes assets/site.<group>.min.css for features/, industries/
+    and blog/, keeping only the selectors those pages can match
+  - --report lists how much of the stylesheet each page actually uses
+  - --page prints one page's pruned CSS, e.g. for an inline critical block
+
+The stylesheet is parsed once; every page is checked against the same
+selector index. Names in the strings of the local scripts a page loads
+count as used, as does the markup those scripts fetch (the shared header
+that header.js injects), since they are added at runtime.
+
+Usage:
+  python3 build-css.py
+  python3 build-css.py --groups --report
+  python3 build-css.py --page features/scheduling/index.html > critical.css
+  python3 build-css.py --check          # exit 1 if site.min.css is stale
+"""
+import argparse
+import os
+import sys
+from functools import partial
+
+from site_tools import css
+from site_tools.files import iter_html_files, rel_path
+from site_tools.parallel import add_workers_argument, run_parallel
+from site_tools.writes import write_if_changed
+
+SOURCE = 'assets/site.css'
+MINIFIED = 'assets/site.min.css'
+
+
+def scan_page(root, file_path):
+    """run_parallel() worker: (relative path, Usage or None, error)"""
+    path = rel_path(file_path, root)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return path, css.page_usage(root, path, f.read()), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def format_bytes(count):
+    return f"{count / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify and prune site.css")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--groups', action='store_true',
+                        help=f"write pruned stylesheets for {', '.join(css.PAGE_GROUPS)}")
+    parser.add_argument('--report', action='store_true', help="per-page used CSS report")
+    parser.add_argument('--page', help="print the pruned CSS for one page and exit")
+    parser.add_argument('--check', action='store_true',
+                        help="exit 1 if site.min.css is out of date (writes nothing)")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+
+    with open(os.path.join(args.root, SOURCE), 'r', encoding='utf-8') as f:
+        source = f.read()
+    index = css.SelectorIndex(source)
+    minified = index.minified()
+
+    if args.page:
+        _, usage, error = scan_page(args.root, os.path.join(args.root, args.page))
+        if error:
+            print(f"❌ Error processing {args.page}: {error}", file=sys.stderr)
+            sys.exit(1)
+        print(index.subset(usage))
+        return
+
+    for warning in index.warnings:
+        print(f"⚠️  {SOURCE}: {warning}")
+
+    minified_path = os.path.join(args.root, MINIFIED)
+    if args.check:
+        try:
+            with open(minified_path, 'r', encoding='utf-8') as f:
+                current = f.read()
+        except OSError:
+            current = None
+        if current != minified:
+            print(f"❌ {MINIFIED} is out of date: run python3 build-css.py")
+            sys.exit(1)
+        print(f"✅ {MINIFIED} is up to date")
+        return
+
+    status = 'updated' if write_if_changed(minified_path, minified) else 'unchanged'
+    print(f"🎨 {SOURCE} {format_bytes(len(source.encode('utf-8')))} -> {MINIFIED} "
+          f"{format_bytes(len(minified.encode('utf-8')))} ({status})")
+    print(f"   {index.selector_count} selectors indexed")
+
+    if not (args.groups or args.report):
+        return
+
+    files = list(iter_html_files(args.root))
+    usages = {}
+    for path, usage, error in run_parallel(partial(scan_page, args.root), files, args.workers):
+        if error:
+            print(f"❌ Error processing {path}: {error}")
+        else:
+            usages[path] = usage
+    print(f"📄 Scanned {len(usages)} pages\n")
+
+    full_size = len(minified.encode('utf-8'))
+    if args.groups:
+        for group in css.PAGE_GROUPS:
+            pages = [usage for path, usage in usages.items() if css.group_of(path) == group]
+            if not pages:
+                continue
+            combined = css.Usage()
+            for usage in pages:
+                combined.update(usage)
+            subset = index.subset(combined)
+            target = css.group_stylesheet_path(group)
+            status = 'updated' if write_if_changed(os.path.join(args.root, target), subset) else 'unchanged'
+            size = len(subset.encode('utf-8'))
+            print(f"✓ {target}: {len(pages)} pages, {format_bytes(size)} "
+                  f"({size / full_size:.0%} of site.min.css, {status})")
+        print()
+
+    if args.report:
+        sizes = sorted(((len(index.subset(usage).encode('utf-8')), path)
+                        for path, usage in usages.items()), reverse=True)
+        print(f"{'page':<60} {'used':>10} {'share':>6}")
+        for size, path in sizes:
+            print(f"{path[:59]:<60} {format_bytes(size):>10} {size / full_size:>6.0%}")
+        average = sum(size for size, _ in sizes) / len(sizes) if sizes else 0
+        print(f"\n📦 Average page uses {format_bytes(average)} of {format_bytes(full_size)}")
+
+
+if __name__ == '__main__':
+    main()
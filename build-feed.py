@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Generate blog/feed.xml from the posts in blog/posts/ (and, optionally, a
+local export of the Sanity dataset) instead of editing it by hand.
+
+  - one <item> per post page, newest first; titles, descriptions, dates
+    and categories come from each page's meta tags and JSON-LD
+  - --export adds the CMS posts that have no page of their own, linked
+    to /blog/post.html?slug=...
+  - rendered items are cached in .site-cache/feed-items.json, so only
+    new or edited posts are parsed
+  - past --per-page items the feed continues in feed-2.xml, feed-3.xml, ...
+    linked from each page with RFC 5005 paging links
+  - files are only rewritten when their content changes
+
+Usage:
+  python3 build-feed.py
+  python3 build-feed.py --export sanity-export.tar.gz --verbose
+  python3 build-feed.py --per-page 20
+"""
+import argparse
+import time
+
+from site_tools import feed
+from site_tools.cache import add_cache_argument
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the blog RSS feed from the posts")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--export', metavar='FILE',
+                        help="Sanity export (.tar.gz, .ndjson or query result JSON) to include")
+    parser.add_argument('--per-page', type=int, default=feed.ITEMS_PER_PAGE,
+                        help=f"items per feed file (default: {feed.ITEMS_PER_PAGE})")
+    parser.add_argument('--verbose', action='store_true', help="list skipped posts and why")
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        report = feed.build(args.root, export=args.export, per_page=args.per_page,
+                            use_cache=not args.no_cache)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error building the feed: {e}")
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - start
+
+    print(f"📰 {len(report.items)} feed items ({report.rendered} rendered, "
+          f"{report.cached} cached, {len(report.skipped)} skipped) in {elapsed:.2f}s")
+    if args.verbose:
+        for key, reason in report.skipped:
+            print(f"   ○ {key}: {reason}")
+    for page in report.pages:
+        status = 'updated' if page['changed'] else 'unchanged'
+        print(f"✓ {feed.FEED_DIR}/{page['name']}: {page['items']} items ({status})")
+    for name in report.removed:
+        print(f"🗑️  removed {feed.FEED_DIR}/{name}")
+    if report.errors:
+        print(f"\n❌ {len(report.errors)} post(s) could not be processed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Generate sitemap.xml and sitemap-index.xml from the pages in the tree.
+
+Replaces generate-sitemap.js (six hard-coded pages plus a network fetch)
+and the hand-edited sitemap.xml:
+
+  - every indexable page with a self-referencing canonical is listed;
+    noindex pages, robots.txt-disallowed directories, backups and
+    templates are left out (--verbose lists why)
+  - lastmod is the date of the last commit touching the page, or the
+    file mtime for uncommitted pages (--lastmod mtime to always use it)
+  - CMS posts that have no page in blog/posts/<slug>/ are listed as
+    blog/post.html?slug=..., with their _updatedAt as lastmod (what
+    generate-sitemap.js fetched from the API). They come from the
+    snapshot sync-sanity.py keeps, or from --export; --no-cms leaves
+    them out
+  - past 50,000 URLs or 50 MB the sitemap is split into sitemap-2.xml,
+    sitemap-3.xml, ... and sitemap-index.xml lists every part plus
+    video-sitemap.xml
+  - files are only rewritten when their content changes
+
+Usage:
+  python3 build-sitemap.py
+  python3 build-sitemap.py --verbose --lastmod mtime
+  python3 build-sitemap.py --export sanity-export.tar.gz
+"""
+import argparse
+import time
+
+from site_tools import sitemap, snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate sitemap.xml from the site tree")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--lastmod', choices=('git', 'mtime'), default='git',
+                        help="where lastmod dates come from (default: git)")
+    parser.add_argument('--max-urls', type=int, default=sitemap.MAX_URLS,
+                        help=f"URLs per sitemap file (default: {sitemap.MAX_URLS})")
+    parser.add_argument('--export', metavar='FILE',
+                        help="Sanity export (.tar.gz, .ndjson or query result JSON) whose posts "
+                             f"without a page are listed too (default: {snapshot.SNAPSHOT_PATH} "
+                             "if it exists)")
+    parser.add_argument('--no-cms', action='store_true', help="leave CMS-only posts out")
+    parser.add_argument('--verbose', action='store_true', help="list skipped pages and why")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        pages, skipped, shards, removed, index_changed = sitemap.build(
+            args.root, lastmod=args.lastmod, max_urls=args.max_urls,
+            export=False if args.no_cms else args.export)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error building the sitemap: {e}")
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - start
+
+    posts = sum(1 for page in pages if page.path.startswith('cms:'))
+    files = len(pages) - posts + len(skipped)
+    print(f"🗺️  {len(pages)} URLs from {files} HTML files"
+          f"{f' and {posts} CMS posts' if posts else ''} ({len(skipped)} skipped) in {elapsed:.2f}s")
+    if args.verbose:
+        for path, reason in skipped:
+            print(f"   ○ {path}: {reason}")
+    for shard in shards:
+        status = 'updated' if shard['changed'] else 'unchanged'
+        print(f"✓ {shard['name']}: {shard['urls']} URLs ({status})")
+    for name in removed:
+        print(f"🗑️  removed {name}")
+    print(f"✓ {sitemap.INDEX_NAME} ({'updated' if index_changed else 'unchanged'})")
+
+
+if __name__ == '__main__':
+    main()
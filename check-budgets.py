@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Check every page against a performance budget: the bytes it downloads in
+total and the bytes that block its first render.
+
+Every local stylesheet, script, image and font a page references (and
+the stylesheets, fonts and images those stylesheets pull in) is resolved
+in the tree and sized from disk. Budgets are set per section in
+site_tools/budget.py (features/, industries/, blog/ and the landing
+pages) and can be overridden for one run:
+
+  python3 check-budgets.py
+  python3 check-budgets.py --budget features=2000:120 --top 20
+  python3 check-budgets.py --json budget-report.json
+
+Exits with status 1 when a page is over its budget.
+"""
+import argparse
+import json
+import sys
+import time
+
+from site_tools import budget
+from site_tools.parallel import add_workers_argument
+
+
+def kb(size):
+    return f"{size / 1024:,.0f} KB" if size < 1024 * 1024 else f"{size / 1024 / 1024:,.1f} MB"
+
+
+def parse_budget(text):
+    """'features=2000:120' -> ('features', 2000, 120); blocking is optional"""
+    try:
+        section, limits = text.split('=', 1)
+        total, _, blocking = limits.partition(':')
+        return section, int(total), int(blocking) if blocking else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected SECTION=TOTAL_KB[:BLOCKING_KB], got {text!r}")
+
+
+def budgets_with(overrides):
+    budgets = []
+    for pattern, section, total_kb, blocking_kb in budget.BUDGETS:
+        for name, total, blocking in overrides:
+            if name == section:
+                total_kb = total
+                blocking_kb = blocking if blocking is not None else blocking_kb
+        budgets.append((pattern, section, total_kb, blocking_kb))
+    return tuple(budgets)
+
+
+def page_line(page):
+    marks = ('❌' if page.over_total else ' ', '❌' if page.over_blocking else ' ')
+    return (f"{kb(page.total):>9} {marks[0]} / {page.budget_kb:,} KB   "
+            f"blocking {kb(page.blocking):>7} {marks[1]} / {page.blocking_budget_kb:,} KB   "
+            f"{page.path}")
+
+
+def report_json(report):
+    return {
+        'pages': [{'page': page.path, 'section': page.section,
+                   'total': page.total, 'blocking': page.blocking,
+                   'budget_kb': page.budget_kb, 'blocking_budget_kb': page.blocking_budget_kb,
+                   'over_budget': page.over_budget, 'by_kind': page.by_kind(),
+                   'assets': [{'file': file, 'kind': kind, 'size': size, 'blocking': blocking}
+                              for file, (kind, blocking, size) in sorted(page.assets.items())],
+                   'missing': sorted(page.missing), 'external': sorted(page.external)}
+                  for page in report.pages],
+        'errors': [{'page': path, 'error': error} for path, error in report.errors],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check pages against per-section performance budgets")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--budget', action='append', type=parse_budget, default=[],
+                        metavar='SECTION=TOTAL_KB[:BLOCKING_KB]',
+                        help="override a section's budget (sections: "
+                             f"{', '.join(section for _, section, _, _ in budget.BUDGETS)})")
+    parser.add_argument('--top', type=int, default=10, help="heaviest pages to list (default: 10)")
+    parser.add_argument('--json', metavar='FILE', help="also write every page's weight as JSON")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = budget.check(args.root, workers=args.workers, budgets=budgets_with(args.budget))
+    elapsed = time.perf_counter() - start
+
+    print(f"⚖️  Weighed {len(report.pages)} pages using {report.assets} local files "
+          f"({kb(report.asset_bytes)}) in {elapsed:.2f}s")
+    for path, error in report.errors:
+        print(f"❌ Error processing {path}: {error}")
+
+    print(f"\n{'section':<12} {'pages':>5} {'median':>9} {'largest':>9} {'budget':>9} {'over':>5}")
+    for pattern, section, total_kb, _ in budgets_with(args.budget):
+        pages = report.sections().get(section)
+        if not pages:
+            continue
+        totals = sorted(page.total for page in pages)
+        over = sum(1 for page in pages if page.over_budget)
+        print(f"{section:<12} {len(pages):>5} {kb(totals[len(totals) // 2]):>9} "
+              f"{kb(totals[-1]):>9} {total_kb:>6,} KB {over:>5}")
+
+    if args.top:
+        print(f"\n🏋️  {min(args.top, len(report.pages))} heaviest pages:")
+        for page in report.heaviest(args.top):
+            print(f"   {page_line(page)}")
+            for file, kind, size in page.heaviest(3):
+                print(f"      {kb(size):>9}  {file} ({kind})")
+
+    over = report.over_budget
+    if over:
+        print(f"\n❌ {len(over)} pages over budget:")
+        for page in over:
+            print(f"   {page_line(page)}")
+
+    missing = {path for page in report.pages for path in page.missing}
+    if missing:
+        print(f"\n⚠️  {len(missing)} referenced files are missing (check-links.py has the details)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report_json(report), f, indent=2)
+            f.write('\n')
+        print(f"\n📄 Wrote {args.json}")
+
+    if not over:
+        print("\n✅ Every page is within its budget")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Check every internal link on the site against the file tree and the
+redirect rules in vercel.json and _redirects.
+
+Every href, src, srcset, poster and og:image/twitter:image on every page
+is resolved the way the host would serve it, and reported as:
+
+  ❌ broken      - nothing is served there, even after redirects
+  ↪️  redirected  - works, but only through a redirect (link the target)
+  🔁 chains      - a redirect leads to another redirect (or loops)
+  🏝️  orphans     - sitemap pages that no other page links to
+
+Exits with status 1 when there are broken links or redirect loops.
+
+Usage:
+  python3 check-links.py
+  python3 check-links.py --json link-report.json
+"""
+import argparse
+import json
+import sys
+import time
+from collections import defaultdict
+
+from site_tools import linkgraph, sitemap
+from site_tools.parallel import add_workers_argument
+
+
+def hop_text(resolution):
+    """'/a -> /b -> /c' for a resolution's redirect path"""
+    return ' -> '.join([resolution.path] + [hop.destination for hop in resolution.hops])
+
+
+def grouped(pairs):
+    """(Reference, Resolution) pairs grouped by the path they point at"""
+    groups = defaultdict(list)
+    resolutions = {}
+    for reference, resolution in pairs:
+        groups[resolution.path].append(reference)
+        resolutions[resolution.path] = resolution
+    return [(resolutions[path], references) for path, references
+            in sorted(groups.items(), key=lambda item: (-len(item[1]), item[0]))]
+
+
+def report_json(report):
+    def refs(pairs):
+        return [{'page': reference.source, 'line': reference.line,
+                 'attribute': reference.attribute, 'url': reference.url,
+                 'resolves_to': hop_text(resolution)}
+                for reference, resolution in pairs]
+
+    return {
+        'pages': report.pages,
+        'references': report.references,
+        'internal': report.internal,
+        'broken': refs(report.broken),
+        'redirected': refs(report.redirected),
+        'chains': [{'path': path, 'hops': hop_text(resolution),
+                    'rules': [hop.location for hop in resolution.hops]}
+                   for path, resolution in sorted(report.chains.items())],
+        'loops': [{'path': path, 'hops': hop_text(resolution)}
+                  for path, resolution in sorted(report.loops.items())],
+        'orphans': report.orphans,
+        'errors': [{'page': path, 'error': error} for path, error in report.errors],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check internal links, redirects and orphan pages")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--json', metavar='FILE', help="also write the findings as JSON")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pages = [page.path for page in sitemap.collect_pages(args.root)[0]]
+    report = linkgraph.check(args.root, workers=args.workers, pages=pages)
+    elapsed = time.perf_counter() - start
+
+    print(f"🔗 {report.internal} internal references ({report.references} total) "
+          f"on {report.pages} pages in {elapsed:.2f}s")
+
+    for path, error in report.errors:
+        print(f"Error processing {path}: {error}")
+
+    if report.broken:
+        print(f"\n❌ {len(report.broken)} broken references:")
+        for resolution, references in grouped(report.broken):
+            print(f"   {hop_text(resolution)} ({len(references)})")
+            for reference in references:
+                print(f"      {reference.where()} {reference.attribute}=\"{reference.url}\"")
+
+    if report.redirected:
+        print(f"\n↪️  {len(report.redirected)} references go through a redirect:")
+        for resolution, references in grouped(report.redirected):
+            print(f"   {hop_text(resolution)} ({len(references)})")
+            for reference in references:
+                print(f"      {reference.where()}")
+
+    if report.chains or report.loops:
+        print(f"\n🔁 {len(report.chains)} redirect chains, {len(report.loops)} loops:")
+        for path, resolution in sorted(report.chains.items()):
+            rules = ', '.join(hop.location for hop in resolution.hops)
+            print(f"   {hop_text(resolution)} ({rules})")
+        for path, resolution in sorted(report.loops.items()):
+            print(f"   ⚠️  loop: {hop_text(resolution)}")
+
+    if report.orphans:
+        print(f"\n🏝️  {len(report.orphans)} sitemap pages with no inbound links:")
+        for path in report.orphans:
+            print(f"   {path}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report_json(report), f, indent=2)
+            f.write('\n')
+        print(f"\n📄 Wrote {args.json}")
+
+    if not (report.broken or report.chains or report.loops or report.orphans):
+        print("\n✅ No link problems found")
+    sys.exit(1 if report.broken or report.loops else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Find byte-identical assets and point every reference at one copy.
+
+  1. every image, stylesheet, script and font is grouped by size, then by
+     a hash of its first 64KB, and only files that still collide are
+     hashed in full
+  2. each group of identical files gets a canonical copy: one that other
+     sites link to (og-dark.jpg, logo.png), then the one the site
+     references most, then one whose name is not a copy's, then the
+     shortest path
+  3. references to the other copies in HTML, CSS and JS are rewritten to
+     the canonical copy, so every page shares one cached URL
+  4. the copies nothing needs any more are listed, and --delete removes
+     them
+
+Run check-links.py afterwards: references from files this does not
+rewrite (sitemaps, vercel.json, other sites) still point at the copies.
+
+Usage:
+  python3 dedupe-assets.py --dry-run
+  python3 dedupe-assets.py --diff dedupe.patch
+  python3 dedupe-assets.py --delete
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+
+from site_tools import assets, rewrite
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+from site_tools.writes import add_dry_run_arguments, dry_run_options
+
+
+def size_text(size):
+    return f"{size / 1024:,.0f} KB" if size < 1024 * 1024 else f"{size / 1024 / 1024:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate assets and rewrite references to one copy")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--delete', action='store_true',
+                        help="delete the removable copies after rewriting references")
+    add_dry_run_arguments(parser)
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    dry_run, diffs = dry_run_options(args)
+    start = time.perf_counter()
+    report = assets.find_duplicates(args.root)
+    print(f"🔍 {report.assets} assets ({size_text(report.bytes)}): {report.partial_hashed} "
+          f"partly hashed, {report.full_hashed} fully hashed in {time.perf_counter() - start:.2f}s")
+    for path, error in report.errors:
+        print(f"❌ Error processing {path}: {error}")
+
+    if not report.groups:
+        print("\n✅ No duplicate assets")
+        return
+
+    print(f"\n🧬 {len(report.groups)} groups of identical files:")
+    for group in report.groups:
+        print(f"   {group.canonical} ({size_text(group.size)})")
+        for path in group.copies:
+            note = '' if path in group.removable else '  (linked from outside the site, kept)'
+            print(f"      = {path}{note}")
+
+    print()
+    ruleset = rewrite.RuleSet([assets.duplicate_rule(report.canonical_map())])
+    files = [Path(args.root) / path for path in assets.reference_files(args.root)]
+    rewrites = rewrite.run(ruleset, root=args.root, files=files,
+                           dry_run=dry_run, workers=args.workers,
+                           manifest=Manifest(args.root, reset=args.no_cache), diffs=diffs)
+    rewrites.print_summary(ruleset)
+
+    removable = [path for group in report.groups for path in group.removable]
+    if removable:
+        if args.delete and not dry_run and not rewrites.errors:
+            for path in removable:
+                os.remove(os.path.join(args.root, path))
+            print(f"\n🗑️  Deleted {len(removable)} duplicate files ({size_text(report.wasted)}):")
+        else:
+            print(f"\n🗑️  {len(removable)} duplicate files ({size_text(report.wasted)}) can be removed"
+                  f"{'' if args.delete else ' (--delete removes them)'}:")
+        for path in removable:
+            print(f"   {path}")
+    if diffs is not None:
+        diffs.write(args.diff)
+
+
+if __name__ == '__main__':
+    main()
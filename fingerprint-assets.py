@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Fingerprint CSS/JS assets by content hash and point every page at them.
+
+Replaces the manual ?v=N bumps done by update-css-version.py and
+update-header-version.py:
+
+  1. assets/site.css, site.min.css, header.js and the other assets/*.js are
+     copied to content-hashed names (assets/site.3f9a1c02be.css)
+  2. assets/asset-manifest.json maps each source to its hashed name
+  3. every HTML reference is rewritten from the manifest in one pass, so a
+     page only changes when an asset it references changed
+  4. vercel.json gets an immutable Cache-Control rule per hashed file
+
+Usage:
+  python3 fingerprint-assets.py
+  python3 fingerprint-assets.py --dry-run
+  python3 fingerprint-assets.py --diff assets.patch
+"""
+import argparse
+import os
+
+from site_tools import fingerprint, rewrite
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+from site_tools.writes import add_dry_run_arguments, dry_run_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint assets and rewrite references")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    add_dry_run_arguments(parser)
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    dry_run, diffs = dry_run_options(args)
+    manifest, changed, stale = fingerprint.build(args.root, dry_run=dry_run)
+    print(f"🔑 Fingerprinted {len(manifest)} assets ({len(changed)} changed)")
+    for source in changed:
+        print(f"   {source} -> {manifest[source]}")
+    for path in stale:
+        print(f"   🗑️  removed stale {path}")
+
+    print()
+    ruleset = rewrite.RuleSet([fingerprint.reference_rule(manifest)])
+    report = rewrite.run(ruleset, root=args.root, dry_run=dry_run, workers=args.workers,
+                         manifest=Manifest(args.root, reset=args.no_cache), diffs=diffs)
+    report.print_summary(ruleset)
+
+    vercel_path = os.path.join(args.root, 'vercel.json')
+    if os.path.exists(vercel_path):
+        if fingerprint.update_vercel_headers(manifest, vercel_path, dry_run=dry_run):
+            print(f"\n☁️  Updated immutable Cache-Control rules in vercel.json")
+        else:
+            print(f"\n☁️  vercel.json cache rules already up to date")
+    if diffs is not None:
+        diffs.write(args.diff)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,12 +2,18 @@
 """
 Fix all HTML files to use the external header system consistently.
 Removes inline header CSS and ensures all pages use site.css.
+
+Pages are only written when their content changes (see site_tools/writes.py);
+--dry-run reports without writing and --diff FILE saves the changes as a patch.
 """
 
+import argparse
 import re
 import os
 from pathlib import Path
 
+from site_tools.writes import TextFile, add_dry_run_arguments, dry_run_options
+
 # Files that have inline header CSS
 FILES_TO_FIX = [
     "contact.html",
@@ -51,14 +57,14 @@ def ensure_external_css(content):
     
     return content
 
-def fix_file(filepath):
+def fix_file(filepath, dry_run=False, diffs=None):
     """
     Fix a single HTML file.
     """
     print(f"Fixing {filepath}...")
     
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    page = TextFile.read(filepath)
+    content = page.text
     
     original_size = len(content)
     
@@ -68,15 +74,18 @@ def fix_file(filepath):
     # Ensure external CSS is present
     content = ensure_external_css(content)
     
-    # Write back
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Write back only if something changed
+    if diffs is not None:
+        diffs.add(page.diff(content))
+    changed = page.write(content, dry_run=dry_run)
     
     new_size = len(content)
     bytes_removed = original_size - new_size
     
     if bytes_removed > 0:
-        print(f"  ✅ Removed {bytes_removed} bytes of inline CSS")
+        print(f"  ✅ {'Would remove' if dry_run else 'Removed'} {bytes_removed} bytes of inline CSS")
+    elif changed:
+        print(f"  ✅ {'Would update' if dry_run else 'Updated'} site.css link")
     else:
         print(f"  ℹ️  No changes needed")
     
@@ -86,6 +95,11 @@ def main():
     """
     Fix all HTML files with inline header CSS.
     """
+    parser = argparse.ArgumentParser(description="Remove inline header CSS from the listed pages")
+    add_dry_run_arguments(parser)
+    args = parser.parse_args()
+    dry_run, diffs = dry_run_options(args)
+
     print("=" * 60)
     print("FIXING ALL HEADERS TO USE EXTERNAL CSS")
     print("=" * 60)
@@ -96,7 +110,7 @@ def main():
     
     for filepath in FILES_TO_FIX:
         if os.path.exists(filepath):
-            bytes_removed = fix_file(filepath)
+            bytes_removed = fix_file(filepath, dry_run, diffs)
             if bytes_removed > 0:
                 files_fixed += 1
             total_bytes_removed += bytes_removed
@@ -108,6 +122,10 @@ def main():
     print(f"✅ COMPLETE: Fixed {files_fixed} files")
     print(f"📦 Removed {total_bytes_removed:,} bytes of inline CSS")
     print("=" * 60)
+    if diffs is not None:
+        diffs.write(args.diff)
+    if dry_run:
+        return
     print()
     print("Next steps:")
     print("  1. Test the homepage and a few other pages")
@@ -7,10 +7,12 @@ import os
 import re
 from pathlib import Path
 
+from site_tools.writes import TextFile
+
 def fix_canonical_in_file(file_path):
     """Fix canonical URL in a single file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    page = TextFile.read(file_path)
+    content = page.text
     
     # Pattern to find canonical URLs without trailing slash
     pattern = r'(<link rel="canonical" href="https://www\.creativejobhub\.com/features/[^/"]+)"'
@@ -18,11 +20,7 @@ def fix_canonical_in_file(file_path):
     
     new_content = re.sub(pattern, replacement, content)
     
-    if new_content != content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        return True
-    return False
+    return page.write(new_content)
 
 def main():
     features_dir = Path('features')
@@ -1,45 +1,27 @@
 #!/usr/bin/env python3
-"""Fix incorrect CJH_circle_logo.png references to use the correct path."""
+"""Fix incorrect CJH_circle_logo.png references to use the correct path.
 
-import os
-import re
-from pathlib import Path
+The rule itself lives in site_tools/rules.py (LOGO_PATH_RULE) and also runs
+as part of release-rewrite.py.
+"""
+
+from site_tools import rewrite
+from site_tools.files import iter_html_files
+from site_tools.rules import LOGO_PATH_RULE
+
+RULESET = rewrite.RuleSet([LOGO_PATH_RULE])
 
 def fix_logo_references(file_path):
     """Fix logo references in a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original_content = content
-        
-        # Fix the incorrect lowercase path to the correct one
-        content = content.replace(
-            '/assets/CJH_circle_logo.png',
-            '/assets/illustrations/CJH_Circle_Logo.png'
-        )
-        
-        # Also fix any other case variations
-        content = re.sub(
-            r'/assets/CJH_circle_logo\.png',
-            '/assets/illustrations/CJH_Circle_Logo.png',
-            content,
-            flags=re.IGNORECASE
-        )
-        
-        if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+        return bool(rewrite.rewrite_file(RULESET, file_path))
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return False
 
 def main():
     """Main function to fix all HTML files."""
-    root_dir = Path('.')
-    html_files = list(root_dir.rglob('*.html'))
+    html_files = list(iter_html_files('.'))
     
     fixed_count = 0
     
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Find the files under assets/ that nothing on the site uses any more.
+
+Every page, stylesheet, script, sitemap, vercel.json and _redirects
+outside assets/, plus the .py/.sh maintenance scripts that inject markup
+into pages, is scanned for references, and references are followed
+through the stylesheets, scripts and fragments under assets/ they reach.
+Assets nothing reaches are reported as:
+
+  🗑️  unreachable  - no reference anywhere (--quarantine moves them out)
+  🔤 name only    - not reached, but the file name appears in a scanned
+                    file, so it may be built at runtime; never moved
+  🔗 allowed      - linked from outside the site (EXTERNAL_ASSETS or
+                    --allow), always kept
+
+Quarantined files go to .asset-quarantine/ (not in git, so not
+deployed) with their paths kept; --restore puts them all back. It is the
+only copy of those files, so unlike .site-cache/ it is not safe to delete.
+
+Exits with status 1 when unreachable assets are left in the tree, so it
+can gate a deploy:
+
+  python3 gc-assets.py
+  python3 gc-assets.py --allow 'assets/press/*' --quarantine
+  python3 gc-assets.py --restore
+"""
+import argparse
+import sys
+import time
+
+from site_tools import assetgc
+from site_tools.assets import EXTERNAL_ASSETS
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+
+
+def size_text(size):
+    return f"{size / 1024:,.0f} KB" if size < 1024 * 1024 else f"{size / 1024 / 1024:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report or quarantine unused assets")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--allow', action='append', default=[], metavar='GLOB',
+                        help="keep assets matching GLOB even when nothing references them")
+    parser.add_argument('--quarantine', action='store_true',
+                        help=f"move unreachable assets to {assetgc.QUARANTINE_DIR}/")
+    parser.add_argument('--restore', action='store_true', help="move quarantined assets back")
+    parser.add_argument('--verbose', action='store_true', help="also list reachable assets")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    if args.restore:
+        restored = assetgc.restore(args.root)
+        print(f"♻️  Restored {len(restored)} assets")
+        for path in restored:
+            print(f"   {path}")
+        return
+
+    start = time.perf_counter()
+    manifest = Manifest(args.root, reset=args.no_cache)
+    report = assetgc.collect(args.root, workers=args.workers, manifest=manifest,
+                             allow=EXTERNAL_ASSETS + tuple(args.allow))
+    elapsed = time.perf_counter() - start
+
+    print(f"🕸️  {len(report.reachable)} of {len(report.assets)} assets reachable from "
+          f"{report.scanned} scanned files ({report.cached} cached) in {elapsed:.2f}s")
+    for path, error in report.errors:
+        print(f"❌ Error processing {path}: {error}")
+
+    if args.verbose:
+        print("\n✅ Reachable:")
+        for path in sorted(report.reachable):
+            print(f"   {path}  <- {report.referrers[path]}")
+    if report.allowed:
+        print(f"\n🔗 {len(report.allowed)} unreferenced but linked from outside the site (kept):")
+        for path in report.allowed:
+            print(f"   {path}")
+    if report.name_only:
+        print(f"\n🔤 {len(report.name_only)} only referenced by file name (kept):")
+        for path in report.name_only:
+            print(f"   {path}")
+
+    if not report.unreachable:
+        print("\n✅ No unreachable assets")
+        return
+    if args.quarantine:
+        assetgc.quarantine(args.root, report.unreachable)
+        print(f"\n🗑️  Moved {len(report.unreachable)} unreachable assets "
+              f"({size_text(report.unreachable_bytes)}) to {assetgc.QUARANTINE_DIR}/:")
+    else:
+        print(f"\n🗑️  {len(report.unreachable)} unreachable assets "
+              f"({size_text(report.unreachable_bytes)}), --quarantine moves them out:")
+    for path in report.unreachable:
+        print(f"   {path} ({size_text(report.assets[path])})")
+    sys.exit(0 if args.quarantine else 1)
+
+
+if __name__ == '__main__':
+    main()
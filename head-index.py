@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Build/refresh the <head> metadata index and query it.
+
+The index (.site-cache/head-index.json) holds title, description, canonical,
+og:image, twitter:image, site.css/header.js versions, script order and
+whether the title comes before GTM for every page. Only pages that changed
+since the last run are re-read.
+
+Usage:
+  python3 head-index.py                                  # refresh + summary
+  python3 head-index.py --where title_before_gtm=false
+  python3 head-index.py --where css_version=30 --fields title,css_version
+  python3 head-index.py --canonical-mismatches           # vs sitemap.xml
+  python3 head-index.py --where has_gtm=true --json
+"""
+import argparse
+import json
+import os
+import time
+
+from site_tools.headindex import FIELDS, HeadIndex
+from site_tools.urls import extract_urls_from_sitemap
+
+
+def parse_value(text):
+    """Turn a --where value into the type stored in the index"""
+    lowered = text.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    if lowered in ('none', 'null'):
+        return None
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def parse_where(items):
+    conditions = {}
+    for item in items:
+        field, sep, value = item.partition('=')
+        if not sep or field not in FIELDS:
+            raise SystemExit(f"❌ Bad --where '{item}' (fields: {', '.join(FIELDS)})")
+        conditions[field] = parse_value(value)
+    return conditions
+
+
+def parse_fields(text):
+    fields = [field for field in text.split(',') if field]
+    for field in fields:
+        if field not in FIELDS:
+            raise SystemExit(f"❌ Bad --fields '{field}' (fields: {', '.join(FIELDS)})")
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and query the head metadata index")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--where', action='append', default=[], metavar='FIELD=VALUE',
+                        help="only pages where FIELD equals VALUE (repeatable)")
+    parser.add_argument('--fields', default='title,canonical',
+                        help="comma-separated fields to print (default: title,canonical)")
+    parser.add_argument('--canonical-mismatches', action='store_true',
+                        help="list sitemap URLs whose page canonical differs")
+    parser.add_argument('--sitemap', default='sitemap.xml', help="sitemap for --canonical-mismatches")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args()
+    fields = parse_fields(args.fields)
+
+    start = time.perf_counter()
+    index = HeadIndex(args.root).refresh()
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.canonical_mismatches:
+        urls = extract_urls_from_sitemap(os.path.join(args.root, args.sitemap))
+        mismatches = index.canonical_mismatches(urls)
+        if args.json:
+            print(json.dumps([{'url': url, 'path': path, 'canonical': canonical}
+                              for url, path, canonical in mismatches], indent=2))
+            return
+        for url, path, canonical in mismatches:
+            if path is None:
+                print(f"📝 {url} (no page on disk)")
+            else:
+                print(f"⚠️  {path}\n   Sitemap:   {url}\n   Canonical: {canonical}")
+        print(f"\n{len(mismatches)} of {len(urls)} sitemap URLs don't match")
+        return
+
+    conditions = parse_where(args.where)
+    if not conditions:
+        print(f"📇 Indexed {len(index.pages)} pages "
+              f"({len(index.refreshed)} refreshed) in {elapsed:.1f} ms")
+        return
+
+    results = index.where(**conditions)
+    if args.json:
+        print(json.dumps({path: {field: head[field] for field in fields}
+                          for path, head in results}, indent=2))
+        return
+    for path, head in results:
+        print(path)
+        for field in fields:
+            print(f"   {field}: {head[field]}")
+    print(f"\n{len(results)} matching page(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Inline assets/header.html into every page, so the header renders with the
+page instead of after header.js fetches it.
+
+Each page's <div id="site-header"></div> is replaced by the header, with
+the link to that page marked active, between site-header:start/end
+markers. Re-running only rewrites pages whose inlined header is stale, so
+run it after every edit to header.html (the copies in the pages are
+generated; never edit them by hand). Pages that are inlined or
+re-inlined also get the current header.js version, which initialises an
+inlined header instead of fetching it.
+
+vercel.json runs this as the build command, so every deploy carries the
+current header whether or not the inlined copies were committed.
+
+Usage:
+  python3 inline-header.py                       # every page
+  python3 inline-header.py --dry-run             # report without writing
+  python3 inline-header.py --diff header.patch   # ... and save the changes as a patch
+  python3 inline-header.py pricing/index.html
+"""
+import argparse
+
+from site_tools import header
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+from site_tools.writes import add_dry_run_arguments, dry_run_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inline the site header into every page")
+    parser.add_argument('files', nargs='*', help="pages to process (default: every HTML file)")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    add_dry_run_arguments(parser)
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    dry_run, diffs = dry_run_options(args)
+    report = header.run(root=args.root, files=args.files or None, dry_run=dry_run,
+                        workers=args.workers,
+                        manifest=Manifest(args.root, reset=args.no_cache), diffs=diffs)
+    report.print_summary(dry_run)
+    if diffs is not None:
+        diffs.write(args.diff)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Write a minified copy of the site to a deploy directory.
+
+Every page is minified (see site_tools/htmlmin.py for what is and is not
+touched) and every other site file is copied alongside it, so the deploy
+directory can be served as it is while the source pages stay readable for
+the maintenance scripts. Pages unchanged since the last run are not
+minified again.
+
+The Vercel build (vercel.json buildCommand) runs it after inline-header.py
+and serves .deploy/ ("outputDirectory"). It exits 1 if any page fails, so
+a deploy never goes out with pages missing.
+
+Usage:
+  python3 minify-html.py                  # writes .deploy/
+  python3 minify-html.py --out /tmp/site-deploy --prune
+  python3 minify-html.py --verbose        # list every page, not only re-minified ones
+"""
+import argparse
+
+from site_tools import htmlmin
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minify every page into a deploy directory")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--out', default=htmlmin.DEPLOY_DIR,
+                        help=f"deploy directory (default: {htmlmin.DEPLOY_DIR})")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete files in the deploy directory that are no longer in the site")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="report savings for every page, including unchanged ones")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    report = htmlmin.run(root=args.root, out=args.out, workers=args.workers,
+                         manifest=Manifest(args.root, reset=args.no_cache), prune=args.prune)
+    report.print_summary(verbose=args.verbose)
+    if report.errors:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
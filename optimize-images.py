@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Generate responsive WebP/AVIF variants for assets/illustrations and
+(optionally) rewrite <img> tags into <picture>/srcset markup.
+
+  - every PNG/JPEG gets WebP (+ AVIF when supported) and a compressed
+    fallback at 480/960/1440px and its own width, in
+    assets/illustrations/optimized/
+  - og-image-*.png social cards get one 1200x630 progressive JPEG
+  - results are cached by source hash; only new/edited images are encoded
+  - images are encoded in parallel
+
+Requires Pillow (pip install Pillow; pillow-avif-plugin adds AVIF on
+Pillow < 11.2).
+
+Usage:
+  python3 optimize-images.py                      # build variants + report
+  python3 optimize-images.py --rewrite-html       # ...and update the pages
+  python3 optimize-images.py --src assets/images -j 4
+"""
+import argparse
+import os
+import sys
+from functools import partial
+
+from site_tools import images, rewrite
+from site_tools.cache import Manifest, add_cache_argument, hash_file
+from site_tools.parallel import add_workers_argument, run_parallel
+
+
+def _optimize_safely(root, avif, source):
+    """run_parallel() worker: returns (result, error) instead of raising"""
+    try:
+        return images.optimize_image(root, source, avif=avif), None
+    except Exception as e:
+        return None, str(e)
+
+
+def format_bytes(count):
+    if count >= 1024 * 1024:
+        return f"{count / (1024 * 1024):.2f} MB"
+    return f"{count / 1024:.1f} KB"
+
+
+def best_variant(result):
+    """Smallest variant at full size (what a large screen downloads)"""
+    largest = max(variant['width'] for variant in result['variants'])
+    candidates = [v for v in result['variants'] if v['width'] == largest]
+    return min(candidates, key=lambda variant: variant['bytes'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive image variants")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--src', default=images.SOURCE_DIR,
+                        help=f"image directory (default: {images.SOURCE_DIR})")
+    parser.add_argument('--rewrite-html', action='store_true',
+                        help="rewrite <img> tags and og:image/twitter:image meta tags")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="with --rewrite-html: report page changes without writing")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    if not images.pillow_available():
+        print("❌ Pillow is required: pip install Pillow")
+        sys.exit(1)
+
+    avif = images.avif_supported()
+    print(f"🖼️  Formats: WebP{' + AVIF' if avif else ''} + compressed fallback "
+          f"at {', '.join(map(str, images.WIDTHS))}px")
+
+    cache = images.ImageCache(args.root)
+    if args.no_cache:
+        cache.images = {}
+
+    sources = images.find_images(args.root, args.src)
+    results = {}
+    stale = []
+    for source in sources:
+        digest = hash_file(os.path.join(args.root, source))
+        cached = cache.lookup(source, digest, avif)
+        if cached is None:
+            stale.append((source, digest))
+        else:
+            results[source] = cached
+    print(f"Found {len(sources)} images, {len(stale)} to encode "
+          f"({len(sources) - len(stale)} cached)\n")
+
+    worker = partial(_optimize_safely, args.root, avif)
+    encoded = run_parallel(worker, [source for source, _ in stale], args.workers)
+    errors = 0
+    for (source, digest), (result, error) in zip(stale, encoded):
+        if error is not None:
+            print(f"❌ Error processing {source}: {error}")
+            errors += 1
+            continue
+        cache.store(source, digest, avif, result)
+        results[source] = result
+    cache.save()
+
+    # Before/after report: original vs the smallest full-size variant
+    print(f"{'image':<48} {'before':>10} {'after':>10} {'saved':>6}")
+    total_before = total_after = 0
+    for source in sources:
+        result = results.get(source)
+        if result is None:
+            continue
+        variant = best_variant(result)
+        before, after = result['bytes'], variant['bytes']
+        total_before += before
+        total_after += after
+        saved = 1 - after / before if before else 0
+        print(f"{os.path.basename(source)[:47]:<48} {format_bytes(before):>10} "
+              f"{format_bytes(after):>10} {saved:>6.0%}  ({variant['format']})")
+    if total_before:
+        print(f"\n📦 Total: {format_bytes(total_before)} -> {format_bytes(total_after)} "
+              f"({1 - total_after / total_before:.0%} smaller)")
+    if errors:
+        print(f"❌ {errors} image(s) failed")
+
+    if args.rewrite_html:
+        print()
+        ordered = [results[source] for source in sources if source in results]
+        # Run on its own: the picture rule skips <script> blocks and comments
+        ruleset = rewrite.RuleSet([images.og_image_rule(ordered), images.picture_rule(ordered)])
+        report = rewrite.run(ruleset, root=args.root, dry_run=args.dry_run,
+                             workers=args.workers,
+                             manifest=Manifest(args.root, reset=args.no_cache))
+        report.print_summary(ruleset)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Write maximum-compression .gz and .br siblings for every HTML, CSS, JS,
+SVG, XML and JSON file, so they are compressed once at build time instead
+of on every request.
+
+  - gzip -9 and Brotli quality 11 (Brotli needs: pip install brotli)
+  - files are compressed in parallel
+  - results are cached by content hash; unchanged files are never
+    compressed again
+  - siblings that save less than 5%, and siblings of deleted files, are
+    removed
+
+Run it on the deploy copy from minify-html.py, so the source tree stays
+free of generated files. It is not part of the Vercel build: Vercel
+compresses responses itself and does not serve .gz/.br siblings, so they
+only pay off on a host that does (nginx gzip_static/brotli_static, a CDN
+origin, ...):
+
+  python3 minify-html.py && python3 precompress.py --root .deploy
+  python3 precompress.py --root .deploy -j 4
+"""
+import argparse
+import os
+from functools import partial
+
+from site_tools import precompress
+from site_tools.cache import add_cache_argument
+from site_tools.parallel import add_workers_argument, run_parallel
+
+
+def _compress_safely(root, fmts, path):
+    """run_parallel() worker: returns (result, error) instead of raising"""
+    try:
+        return precompress.compress_file(root, path, fmts), None
+    except Exception as e:
+        return None, str(e)
+
+
+def format_bytes(count):
+    if count >= 1024 * 1024:
+        return f"{count / (1024 * 1024):.2f} MB"
+    return f"{count / 1024:.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write precompressed .gz/.br siblings")
+    parser.add_argument('--root', default='.', help="directory to compress (default: current directory)")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    fmts = precompress.formats()
+    if not precompress.brotli_available():
+        print("⚠️  brotli is not installed (pip install brotli): writing .gz siblings only")
+
+    cache = precompress.CompressionCache(args.root)
+    if args.no_cache:
+        cache.files = {}
+
+    paths = precompress.find_files(args.root)
+    removed = cache.forget_missing(paths)
+    results = {}
+    stale = []
+    for path in paths:
+        entry = cache.lookup(path, fmts)
+        if entry is None:
+            stale.append(path)
+        else:
+            results[path] = (entry['bytes'], entry['sizes'])
+    print(f"Found {len(paths)} compressible files, {len(stale)} to compress "
+          f"({len(paths) - len(stale)} cached)")
+
+    worker = partial(_compress_safely, args.root, fmts)
+    errors = 0
+    for path, (result, error) in zip(stale, run_parallel(worker, stale, args.workers)):
+        if error is not None:
+            print(f"❌ Error processing {path}: {error}")
+            errors += 1
+            continue
+        digest, size, sizes = result
+        cache.store(path, digest, fmts, size, sizes)
+        results[path] = (size, sizes)
+    cache.save()
+
+    # Per-suffix report: what a client downloads with each encoding
+    print(f"\n{'type':<8} {'files':>6} {'original':>10}" + ''.join(f" {'.' + fmt:>10}" for fmt in fmts))
+    by_suffix = {}
+    for path, (size, sizes) in results.items():
+        suffix = os.path.splitext(path)[1].lower()
+        totals = by_suffix.setdefault(suffix, {'files': 0, 'bytes': 0, **{fmt: 0 for fmt in fmts}})
+        totals['files'] += 1
+        totals['bytes'] += size
+        for fmt in fmts:
+            # A file without a sibling is served uncompressed
+            totals[fmt] += sizes.get(fmt, size)
+    grand = {'files': 0, 'bytes': 0, **{fmt: 0 for fmt in fmts}}
+    for suffix, totals in sorted(by_suffix.items()):
+        print(f"{suffix:<8} {totals['files']:>6} {format_bytes(totals['bytes']):>10}"
+              + ''.join(f" {format_bytes(totals[fmt]):>10}" for fmt in fmts))
+        for key in grand:
+            grand[key] += totals[key]
+    if grand['bytes']:
+        print(f"\n📦 {format_bytes(grand['bytes'])} -> "
+              + ', '.join(f".{fmt} {format_bytes(grand[fmt])} ({1 - grand[fmt] / grand['bytes']:.0%} smaller)"
+                          for fmt in fmts))
+    if removed:
+        print(f"🧹 Removed siblings of {removed} deleted files")
+    if errors:
+        print(f"❌ {errors} file(s) failed")
+
+
+if __name__ == '__main__':
+    main()
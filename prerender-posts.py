@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Pre-render the CMS blog posts into blog/posts/<slug>/index.html, so posts
+are plain HTML on first paint and for crawlers instead of an empty shell
+filled in by JavaScript after a Sanity API call.
+
+  - posts come from a local export (.tar.gz, .ndjson or query result
+    JSON) or the snapshot sync-sanity.py keeps (the default)
+  - every post goes through blog/post-template.html
+  - posts render in parallel; only posts whose content or template changed
+    since the last run are rendered again
+  - hand-written pages in blog/posts/ are never overwritten
+  - --prune deletes pre-rendered pages whose post was deleted
+
+Run it before inline-header.py and build-feed.py, so the new pages get the
+header and show up in the feed:
+
+  python3 sync-sanity.py && python3 prerender-posts.py
+  python3 prerender-posts.py --export sanity-export.tar.gz -j 4
+"""
+import argparse
+import os
+import time
+
+from site_tools import cms, prerender, snapshot
+from site_tools.cache import add_cache_argument
+from site_tools.parallel import add_workers_argument
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render CMS blog posts into static pages")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--export', metavar='FILE',
+                        help=f"posts to render (default: {snapshot.SNAPSHOT_PATH})")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete pre-rendered pages whose post no longer exists")
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    export = args.export or os.path.join(args.root, snapshot.SNAPSHOT_PATH)
+    if not os.path.exists(export):
+        print(f"❌ {export} not found: run sync-sanity.py first, or pass --export")
+        raise SystemExit(1)
+    try:
+        posts = cms.load_posts(cms.read_export(export))
+    except (OSError, ValueError) as e:
+        print(f"❌ Error reading {export}: {e}")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    report = prerender.run(args.root, posts, workers=args.workers, use_cache=not args.no_cache,
+                           prune=args.prune)
+    report.print_summary()
+    print(f"⏱️  {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
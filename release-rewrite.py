@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Apply every release rewrite rule to the site in a single pass.
+
+Each HTML file is read once, run through all applicable rules in memory and
+written at most once. Rules live in site_tools/rules.py. Files whose content
+already went through the current version of every rule are skipped (see
+site_tools/cache.py); use --no-cache to force a full pass.
+
+Usage:
+  python3 release-rewrite.py                  # all rules
+  python3 release-rewrite.py css-version og-image
+  python3 release-rewrite.py --dry-run
+  python3 release-rewrite.py --diff release.patch   # dry run, changes as a patch
+  python3 release-rewrite.py -j 8             # 8 worker processes
+"""
+import argparse
+
+from site_tools import rewrite
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+from site_tools.rules import RELEASE_RULES, RULES_BY_NAME
+from site_tools.writes import add_dry_run_arguments, dry_run_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply release rewrite rules in one pass")
+    parser.add_argument('rules', nargs='*', metavar='RULE',
+                        help=f"rules to run (default: all): {', '.join(RULES_BY_NAME)}")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    add_dry_run_arguments(parser)
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+    dry_run, diffs = dry_run_options(args)
+
+    unknown = [name for name in args.rules if name not in RULES_BY_NAME]
+    if unknown:
+        parser.error(f"unknown rule(s): {', '.join(unknown)}")
+    # Keep registration order so results don't depend on argument order
+    rules = [rule for rule in RELEASE_RULES if not args.rules or rule.name in args.rules]
+
+    print(f"🔧 Running {len(rules)} rule(s): {', '.join(rule.name for rule in rules)}\n")
+    ruleset = rewrite.RuleSet(rules)
+    manifest = Manifest(args.root, reset=args.no_cache)
+    report = rewrite.run(ruleset, root=args.root, dry_run=dry_run,
+                         workers=args.workers, manifest=manifest, diffs=diffs)
+    report.print_summary(ruleset)
+    if diffs is not None:
+        diffs.write(args.diff)
+
+
+if __name__ == '__main__':
+    main()
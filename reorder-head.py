@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Put every page's <head> in the standard order:
+
+  meta charset, viewport, title, description, canonical, preconnects,
+  CSS, everything else, then third-party scripts (GTM, gtag, HubSpot)
+
+Elements already in order are left where they are; each moved element is
+listed per file. Replaces fix-feature-titles.py, fix-industry-pages.py and
+fix-affordable-page.py, which each handled one directory and one exact
+whitespace layout.
+
+Usage:
+  python3 reorder-head.py                      # every page
+  python3 reorder-head.py --dry-run            # report without writing
+  python3 reorder-head.py --diff head.patch    # ... and save the changes as a patch
+  python3 reorder-head.py features/*/index.html
+"""
+import argparse
+
+from site_tools import headorder
+from site_tools.cache import Manifest, add_cache_argument
+from site_tools.parallel import add_workers_argument
+from site_tools.writes import add_dry_run_arguments, dry_run_options
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reorder <head> elements on every page")
+    parser.add_argument('files', nargs='*', help="pages to process (default: every HTML file)")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    add_dry_run_arguments(parser)
+    add_workers_argument(parser)
+    add_cache_argument(parser)
+    args = parser.parse_args()
+
+    dry_run, diffs = dry_run_options(args)
+    report = headorder.run(root=args.root, files=args.files or None, dry_run=dry_run,
+                           workers=args.workers,
+                           manifest=Manifest(args.root, reset=args.no_cache), diffs=diffs)
+    report.print_summary()
+    if diffs is not None:
+        diffs.write(args.diff)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""
+Shared helpers for the site maintenance scripts.
+
+The hyphenated scripts in the repo root (update-css-version.py,
+audit-all-canonicals.py, ...) stay the entry points; the code they share
+lives here so it can be imported.
+"""
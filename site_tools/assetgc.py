@@ -0,0 +1,230 @@
+"""
+Which files under assets/ are still used, by following references from
+everything the site serves.
+
+The roots are every page, stylesheet, script, sitemap and config file
+outside assets/ (HTML, CSS, JS, XML, JSON, plus _redirects): all of them
+ship, so whatever they reference is reachable. The repo's .py and .sh
+scripts are roots as well, since some of them inject asset references
+into pages. Each root is scanned once
+for path-like tokens, in quoted attributes, url(...), JS string literals,
+<loc> entries or redirect rules alike, so one regex covers every format.
+Tokens resolve against the referencing file (and, for scripts, against
+the site root, since a script's relative URLs resolve against whichever
+page runs it). Stylesheets, scripts and HTML fragments under assets/ are
+only scanned once something reachable references them, so a dead script
+does not keep its images alive.
+
+An asset that is not reachable but whose file name appears in a scanned
+file is reported as "name only": it is probably assembled at runtime
+('/assets/illustrations/' + name) and is never quarantined.
+EXTERNAL_ASSETS (og images, favicons) are always kept, since other sites
+and social cards link to them directly.
+
+Token lists are cached per file in the manifest, so a run over an
+unchanged tree only stats the files.
+"""
+import html
+import os
+import posixpath
+import re
+import shutil
+from fnmatch import fnmatch
+from functools import partial
+from urllib.parse import unquote, urlsplit
+
+from site_tools.assets import ASSET_SUFFIXES, EXTERNAL_ASSETS
+from site_tools.cache import hash_bytes, version_of
+from site_tools.files import iter_files, rel_path
+from site_tools.parallel import run_parallel
+from site_tools.urls import SITE_HOSTS
+
+ASSET_DIR = 'assets'
+
+# Files under assets/ that can be garbage (everything else there is docs
+# or tooling output, such as README.md and asset-manifest.json)
+CANDIDATE_SUFFIXES = ASSET_SUFFIXES + ('.html',)
+
+# Text files that can reference an asset
+SCANNED_SUFFIXES = ('.html', '.css', '.js', '.xml', '.json', '.webmanifest', '.txt')
+SCANNED_NAMES = ('_redirects',)
+
+# Maintenance scripts that inject markup into pages (add-editor-to-pages.py
+# adds visual-editor.js): scanned as roots too, so the assets they inject
+# survive even while no page carries them
+TOOL_SUFFIXES = ('.py', '.sh')
+
+# Its own dot directory, not under CACHE_DIR: the cache is disposable (the
+# Vercel build deletes it) while quarantined files are the only copy left
+QUARANTINE_DIR = '.asset-quarantine'
+
+_EXTENSIONS = '|'.join(sorted({suffix.lstrip('.') for suffix in CANDIDATE_SUFFIXES},
+                              key=lambda ext: (-len(ext), ext)))
+# Anything quoted, in url(...) or between tags that ends in an asset
+# extension (file names with spaces included)
+_QUOTED_PATH_RE = re.compile(rf'''["'(>]([^"'()<>\n]*\.(?:{_EXTENSIONS}))(?=[?#"')<])''',
+                             re.IGNORECASE)
+# Whitespace-separated paths, for _redirects and text files
+_BARE_PATH_RE = re.compile(rf'''(?<!\S)(\S*\.(?:{_EXTENSIONS}))(?=[?#]|\s|$)''',
+                           re.IGNORECASE | re.MULTILINE)
+
+
+def file_tokens(text, bare=False):
+    """Sorted path-like strings in text ('/assets/a.png', '../b.css', ...)"""
+    tokens = set(_QUOTED_PATH_RE.findall(text))
+    if bare:
+        tokens.update(_BARE_PATH_RE.findall(text))
+    return sorted(html.unescape(token.strip()) if '&' in token else token.strip()
+                  for token in tokens)
+
+
+TOKENS_VERSION = version_of(file_tokens, _QUOTED_PATH_RE.pattern, _BARE_PATH_RE.pattern)
+
+
+def _scan(root, file_path):
+    """run_parallel() worker: (path, tokens, content hash, error)"""
+    path = rel_path(file_path, root)
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        bare = not path.endswith(('.html', '.css', '.js', '.json'))
+        return path, file_tokens(data.decode('utf-8', errors='replace'), bare), hash_bytes(data), None
+    except Exception as e:
+        return path, [], None, str(e)
+
+
+def resolve_token(token, source):
+    """
+    Repo-relative paths token may mean when found in source. Scripts also
+    try the site root; everything else resolves like a browser would.
+    """
+    parts = urlsplit(token)
+    if parts.netloc and parts.netloc not in SITE_HOSTS:
+        return []
+    path = unquote(parts.path)
+    if path.startswith('/'):
+        return [posixpath.normpath(path.lstrip('/'))]
+    candidates = [posixpath.normpath(posixpath.join(posixpath.dirname(source), path))]
+    if source.endswith('.js'):
+        candidates.append(posixpath.normpath(path))
+    return [candidate for candidate in candidates if not candidate.startswith('..')]
+
+
+def is_allowed(path, allow=EXTERNAL_ASSETS):
+    return any(fnmatch(path, pattern) for pattern in allow)
+
+
+class GCReport:
+    """Findings of one collect() run"""
+
+    def __init__(self):
+        self.scanned = 0
+        self.cached = 0
+        self.assets = {}         # candidate path -> size
+        self.reachable = set()
+        self.referrers = {}      # reachable asset -> first file found referencing it
+        self.allowed = []        # unreachable, but on the allow-list
+        self.name_only = []      # unreachable, but the file name appears somewhere
+        self.unreachable = []    # nothing uses these
+        self.errors = []         # (path, error)
+
+    @property
+    def unreachable_bytes(self):
+        return sum(self.assets[path] for path in self.unreachable)
+
+
+def _is_root(path):
+    if path.startswith(ASSET_DIR + '/'):
+        return False
+    return (path.endswith(SCANNED_SUFFIXES + TOOL_SUFFIXES)
+            or posixpath.basename(path) in SCANNED_NAMES)
+
+
+def collect(root='.', workers=1, manifest=None, allow=EXTERNAL_ASSETS):
+    """
+    Mark every asset reachable from the roots and sort the rest into
+    allowed, name-only and unreachable. With a cache.Manifest, files that
+    have not changed are not read again.
+    """
+    report = GCReport()
+    check = {'asset-refs': TOKENS_VERSION}
+    roots = []
+    for file_path in iter_files(root):
+        path = rel_path(file_path, root)
+        if _is_root(path):
+            roots.append(path)
+        elif path.startswith(ASSET_DIR + '/') and path.lower().endswith(CANDIDATE_SUFFIXES):
+            report.assets[path] = os.path.getsize(file_path)
+
+    tokens = {}
+
+    def scan(paths):
+        stale = []
+        for path in paths:
+            file_path = os.path.join(root, path)
+            if manifest is not None and manifest.is_fresh(file_path, check):
+                tokens[path] = manifest.result(file_path, 'asset-refs')
+                report.cached += 1
+            else:
+                stale.append(path)
+        worker = partial(_scan, root)
+        for path, found, digest, error in run_parallel(worker, [os.path.join(root, p) for p in stale],
+                                                       workers):
+            if error is not None:
+                report.errors.append((path, error))
+                found = []
+            elif manifest is not None:
+                manifest.record_hash(os.path.join(root, path), digest, check, {'asset-refs': found})
+            tokens[path] = found
+        report.scanned += len(paths)
+
+    names = set()
+    pending = roots
+    while pending:
+        scan(pending)
+        reached = []
+        for source in pending:
+            for token in tokens[source]:
+                names.add(posixpath.basename(unquote(urlsplit(token).path)))
+                for path in resolve_token(token, source):
+                    if path in report.assets and path not in report.reachable:
+                        report.reachable.add(path)
+                        report.referrers[path] = source
+                        if path.endswith(SCANNED_SUFFIXES):
+                            reached.append(path)
+        pending = reached
+
+    for path in sorted(report.assets):
+        if path in report.reachable:
+            continue
+        if is_allowed(path, allow):
+            report.allowed.append(path)
+        elif posixpath.basename(path) in names:
+            report.name_only.append(path)
+        else:
+            report.unreachable.append(path)
+    if manifest is not None:
+        manifest.save()
+    return report
+
+
+def quarantine(root, paths):
+    """Move paths into QUARANTINE_DIR, keeping their place in the tree"""
+    for path in paths:
+        target = os.path.join(root, QUARANTINE_DIR, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(os.path.join(root, path), target)
+
+
+def restore(root='.'):
+    """Move every quarantined file back; returns their paths"""
+    base = os.path.join(root, QUARANTINE_DIR)
+    restored = []
+    for file_path in iter_files(base):
+        path = rel_path(file_path, base)
+        target = os.path.join(root, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(file_path, target)
+        restored.append(path)
+    shutil.rmtree(base, ignore_errors=True)
+    return restored
@@ -0,0 +1,224 @@
+"""
+Asset inventory: every image, stylesheet, script and font in the tree,
+and which of them are byte-identical copies of each other.
+
+find_duplicates() hashes as little as it can. Files are grouped by size
+first (a file with a unique size has no copy and is never read), then by
+a hash of their first PARTIAL_BYTES, and only files that still collide
+are hashed in full. On this site that means a handful of multi-megabyte
+reads instead of 50MB.
+
+Each group of copies gets one canonical file: a file other sites link to
+directly (EXTERNAL_ASSETS) if the group has one, then the copy the site
+references most, then one whose name does not look like a copy
+(logo-copy.png, hero (1).jpg), then the shortest path. duplicate_rule()
+is a rewrite.Rule that points references to the other copies at the
+canonical one, so pages, stylesheets and scripts all share one cached URL
+and the copies can be deleted.
+"""
+import os
+import re
+from fnmatch import fnmatch
+
+from site_tools.cache import hash_bytes, hash_file
+from site_tools.files import iter_files, rel_path
+from site_tools.fingerprint import is_fingerprinted
+from site_tools.rewrite import Rule
+
+ASSET_SUFFIXES = (
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.svg', '.ico',
+    '.css', '.js', '.woff', '.woff2', '.ttf', '.otf', '.eot',
+    '.mp4', '.webm', '.pdf',
+)
+
+# Linked from outside the site (social cards, email, other sites): never
+# moved or removed, whatever references on the site say
+EXTERNAL_ASSETS = (
+    'assets/og-dark.jpg',
+    'assets/logo*',
+    'assets/og-images/*',
+    'assets/illustrations/og-image-*',
+    'assets/favicon*',
+    'assets/apple-touch-icon.png',
+    'favicon.ico',
+)
+
+PARTIAL_BYTES = 64 * 1024
+
+# Text files whose references to a duplicate are rewritten
+REFERENCE_SUFFIXES = ('.html', '.css', '.js')
+
+# File names that look like a copy of another file
+_COPY_NAME_RE = re.compile(r'(?:[-_ ]copy|[-_ ]?\(\d+\)|[-_](?:old|backup|bak)|[-_]\d)$',
+                           re.IGNORECASE)
+
+
+def is_external(path):
+    return any(fnmatch(path, pattern) for pattern in EXTERNAL_ASSETS)
+
+
+def is_copy_name(path):
+    return bool(_COPY_NAME_RE.search(os.path.splitext(os.path.basename(path))[0]))
+
+
+def iter_assets(root='.'):
+    """Repo-relative path of every asset, skipping fingerprinted copies"""
+    for file_path in iter_files(root, suffixes=ASSET_SUFFIXES):
+        path = rel_path(file_path, root)
+        if not is_fingerprinted(path):
+            yield path
+
+
+def _partial_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hash_bytes(f.read(PARTIAL_BYTES))
+
+
+class DuplicateGroup:
+    """Byte-identical files: one canonical copy and the rest"""
+
+    def __init__(self, size, paths, references=None):
+        self.size = size
+        references = references or {}
+        ranked = sorted(paths, key=lambda path: (not is_external(path), -references.get(path, 0),
+                                                 is_copy_name(path), len(path), path))
+        self.canonical = ranked[0]
+        self.copies = ranked[1:]
+
+    @property
+    def removable(self):
+        """Copies that can go once references point at the canonical file"""
+        return [path for path in self.copies if not is_external(path)]
+
+    @property
+    def wasted(self):
+        return self.size * len(self.removable)
+
+
+class DuplicateReport:
+    """Findings of one find_duplicates() run"""
+
+    def __init__(self):
+        self.assets = 0
+        self.bytes = 0
+        self.partial_hashed = 0
+        self.full_hashed = 0
+        self.groups = []    # DuplicateGroup, largest waste first
+        self.errors = []    # (path, error)
+
+    @property
+    def wasted(self):
+        return sum(group.wasted for group in self.groups)
+
+    def canonical_map(self):
+        """
+        {duplicate path: canonical path} for every removable copy; copies
+        other sites link to keep their own references
+        """
+        return {copy: group.canonical for group in self.groups for copy in group.removable}
+
+
+def find_duplicates(root='.', paths=None):
+    """Group byte-identical assets under root (or the given repo-relative paths)"""
+    report = DuplicateReport()
+    by_size = {}
+    for path in (iter_assets(root) if paths is None else paths):
+        try:
+            size = os.path.getsize(os.path.join(root, path))
+        except OSError as e:
+            report.errors.append((path, str(e)))
+            continue
+        report.assets += 1
+        report.bytes += size
+        if size:
+            by_size.setdefault(size, []).append(path)
+
+    found = []    # (size, identical paths)
+    for size, same_size in by_size.items():
+        if len(same_size) < 2:
+            continue
+        candidates = {}
+        for path in same_size:
+            try:
+                # Files that fit in the partial read are already fully hashed
+                key = _partial_hash(os.path.join(root, path))
+            except OSError as e:
+                report.errors.append((path, str(e)))
+                continue
+            report.partial_hashed += 1
+            candidates.setdefault(key, []).append(path)
+        for same_start in candidates.values():
+            if len(same_start) < 2:
+                continue
+            if size <= PARTIAL_BYTES:
+                found.append((size, same_start))
+                continue
+            identical = {}
+            for path in same_start:
+                try:
+                    identical.setdefault(hash_file(os.path.join(root, path)), []).append(path)
+                except OSError as e:
+                    report.errors.append((path, str(e)))
+                    continue
+                report.full_hashed += 1
+            found.extend((size, group) for group in identical.values() if len(group) > 1)
+
+    references = count_references(root, [path for _, group in found for path in group])
+    report.groups = [DuplicateGroup(size, group, references) for size, group in found]
+    report.groups.sort(key=lambda group: (-group.wasted, group.canonical))
+    return report
+
+
+def count_references(root, paths):
+    """{path: how often HTML, CSS and JS files mention it} for repo-relative paths"""
+    counts = dict.fromkeys(paths, 0)
+    if not counts:
+        return counts
+    for path in reference_files(root):
+        with open(os.path.join(root, path), encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        for asset in counts:
+            counts[asset] += text.count(asset)
+    return counts
+
+
+class DuplicateReferenceRewriter:
+    """Rule replacement that maps a reference to a duplicate to the canonical copy"""
+
+    def __init__(self, canonical):
+        self.canonical = dict(canonical)
+
+    def __call__(self, match):
+        return f"{match['prefix']}{self.canonical[match['path']]}"
+
+    def __repr__(self):
+        # Part of the rule version, so new duplicates invalidate cached files
+        return f"DuplicateReferenceRewriter({sorted(self.canonical.items())!r})"
+
+
+def duplicate_rule(canonical):
+    """
+    Rewrite rule for references to the keys of canonical ({duplicate:
+    canonical path}): root-relative, relative (../assets/...) or absolute
+    on this site. Query strings and fragments are kept.
+    """
+    paths = sorted(canonical, key=len, reverse=True)
+    pattern = (
+        r'(?P<prefix>(?:https?://(?:www\.)?creativejobhub\.com/|(?<![\w.-])(?:\.\./)*/?))'
+        rf"(?P<path>{'|'.join(re.escape(path) for path in paths) or '(?!)'})"
+        r'(?![\w.-])'
+    )
+    return Rule(
+        'asset-dedupe',
+        pattern,
+        DuplicateReferenceRewriter(canonical),
+        include=tuple(f'*{suffix}' for suffix in REFERENCE_SUFFIXES),
+        description='references to duplicate assets -> canonical copy',
+    )
+
+
+def reference_files(root='.'):
+    """Repo-relative path of every HTML, CSS and JS file that may need rewriting"""
+    paths = (rel_path(file_path, root)
+             for file_path in iter_files(root, suffixes=REFERENCE_SUFFIXES))
+    return [path for path in paths if not is_fingerprinted(path)]
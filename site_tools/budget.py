@@ -0,0 +1,380 @@
+"""
+Per-page performance budgets: how many bytes a page makes the browser
+download, and how many of them block the first render.
+
+page_resources() reads a page once and lists what it loads: stylesheets,
+scripts, images (img src, srcset, poster, icons, preloads), url()s in
+<style> blocks and style="" attributes, and the shared header for pages
+that mount it. Pages are read in parallel; everything after that runs in
+this process, so each asset is stat'd once (AssetSizes) and each
+stylesheet or fragment is parsed once (Stylesheets) however many pages
+use it.
+
+Render-blocking means a stylesheet in <head> (unless media="print"), the
+stylesheets it @imports, and a <script src> in <head> without async,
+defer or type="module". Everything a stylesheet references through url()
+is counted towards the total, so CSS backgrounds and fonts make the total
+an upper bound for pages that do not use every rule.
+
+Budgets are per section (BUDGETS, first match wins) and in KB. External
+resources (fonts.googleapis.com, CDNs, analytics) are counted but cannot
+be sized from the tree.
+"""
+import os
+import re
+from fnmatch import fnmatch
+from functools import partial
+
+from site_tools.css import STRING_PATTERN, strip_comments
+from site_tools.files import iter_html_files, rel_path
+from site_tools.header import HEADER_SOURCE, MOUNT_RE, SKIP_PATHS
+from site_tools.headindex import parse_attrs
+from site_tools.linkgraph import SiteFiles, internal_path
+from site_tools.parallel import run_parallel
+from site_tools.urls import file_path_to_url
+
+# (glob, section, total KB, render-blocking KB); first match wins
+BUDGETS = (
+    ('features/*', 'features', 3000, 150),
+    ('industries/*', 'industries', 3000, 150),
+    ('blog/*', 'blog', 2000, 150),
+    ('*', 'landing', 4000, 150),
+)
+
+KINDS = {
+    '.css': 'css',
+    '.js': 'js', '.mjs': 'js',
+    '.woff2': 'font', '.woff': 'font', '.ttf': 'font', '.otf': 'font', '.eot': 'font',
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.gif': 'image', '.webp': 'image',
+    '.avif': 'image', '.svg': 'image', '.ico': 'image',
+    '.html': 'html',
+}
+
+# <link rel=...> values whose href is downloaded
+_LINK_KINDS = {'stylesheet': 'css', 'icon': 'image', 'apple-touch-icon': 'image',
+               'modulepreload': 'js', 'preload': None, 'manifest': 'other'}
+
+# Only the tags that load something; comments are skipped whole
+_TAG_RE = re.compile(
+    r'''<!--.*?-->'''
+    r'''|<(?P<tag>link|script|style|img|video)\b(?P<attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>''',
+    re.IGNORECASE | re.DOTALL,
+)
+# No (?<=\s) here: a literal start lets the scan skip ahead much faster
+_STYLE_ATTR_RE = re.compile(r'''style\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+_RAW_END_RES = {'script': re.compile(r'</script\s*>', re.IGNORECASE),
+                'style': re.compile(r'</style\s*>', re.IGNORECASE)}
+_HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+_QUOTED_RE = re.compile(r'''"[^"]*"|'[^']*\'''')
+_FLAG_RE = re.compile(r'(?<![\w=-])([a-zA-Z][\w-]*)(?![\w-]|\s*=)')
+_CSS_URL_RE = re.compile(rf'url\(\s*(?:({STRING_PATTERN})|([^)\s]*))\s*\)', re.IGNORECASE)
+_CSS_IMPORT_RE = re.compile(rf'@import\s+(?:url\(\s*)?({STRING_PATTERN}|[^\s;)]+)', re.IGNORECASE)
+
+
+def kind_of(path):
+    """'assets/site.css' -> 'css'; 'other' for anything unknown"""
+    return KINDS.get(os.path.splitext(path.split('?', 1)[0])[1].lower(), 'other')
+
+
+def _flags(attr_text):
+    """Boolean attributes (async, defer, ...) of a tag"""
+    return {flag.lower() for flag in _FLAG_RE.findall(_QUOTED_RE.sub('', attr_text))}
+
+
+def _unquote(token):
+    return token[1:-1] if token[:1] in ('"', "'") else token
+
+
+def css_urls(text):
+    """(url, imported) for every url() and @import in a stylesheet"""
+    if 'url(' not in text and '@import' not in text:
+        return []
+    if '/*' in text:
+        text = strip_comments(text)
+    imports = [_unquote(token) for token in _CSS_IMPORT_RE.findall(text)]
+    urls = [(url, True) for url in imports]
+    for quoted, bare in _CSS_URL_RE.findall(text):
+        url = _unquote(quoted) if quoted else bare
+        if url not in imports:
+            urls.append((url, False))
+    return [(url, imported) for url, imported in urls if url and not url.startswith('data:')]
+
+
+def _largest_candidate(srcset):
+    """The widest (or last) URL in a srcset, the one a large screen fetches"""
+    best, best_width = None, -1.0
+    for candidate in srcset.split(','):
+        parts = candidate.split()
+        if not parts:
+            continue
+        descriptor = parts[1] if len(parts) > 1 else '1x'
+        try:
+            width = float(descriptor[:-1])
+        except ValueError:
+            width = 0.0
+        if width >= best_width:
+            best, best_width = parts[0], width
+    return best
+
+
+def page_resources(content):
+    """
+    [url, kind, blocking] for everything content makes the browser fetch.
+    kind is None where only the URL tells (url() in CSS); the shared
+    header is listed as HEADER_SOURCE with kind 'fragment'.
+    """
+    head_end = _HEAD_END_RE.search(content)
+    head_end = head_end.start() if head_end else 0
+    resources = []
+    pos = 0
+    while True:
+        match = _TAG_RE.search(content, pos)
+        if match is None:
+            break
+        pos = match.end()
+        tag = (match.group('tag') or '').lower()
+        if not tag:
+            continue
+        attrs = parse_attrs(match.group('attrs'))
+        in_head = match.start() < head_end
+
+        if tag == 'link' and attrs.get('href'):
+            for rel in attrs.get('rel', '').lower().split():
+                if rel not in _LINK_KINDS:
+                    continue
+                kind = _LINK_KINDS[rel] or {'style': 'css', 'script': 'js', 'font': 'font',
+                                            'image': 'image'}.get(attrs.get('as', '').lower())
+                blocking = (rel == 'stylesheet' and in_head
+                            and attrs.get('media', 'all').lower() != 'print'
+                            and 'disabled' not in _flags(match.group('attrs')))
+                resources.append([attrs['href'], kind, blocking])
+                break
+        elif tag == 'script' and attrs.get('src'):
+            flags = _flags(match.group('attrs'))
+            blocking = (in_head and not {'async', 'defer'} & flags
+                        and attrs.get('type', '').lower() != 'module')
+            resources.append([attrs['src'], 'js', blocking])
+        elif tag == 'img':
+            src = attrs.get('src') or _largest_candidate(attrs.get('srcset', ''))
+            if src:
+                resources.append([src, 'image', False])
+        elif tag == 'video' and attrs.get('poster'):
+            resources.append([attrs['poster'], 'image', False])
+
+        if tag in _RAW_END_RES:
+            end = _RAW_END_RES[tag].search(content, pos)
+            body_end = end.start() if end else len(content)
+            if tag == 'style':
+                resources.extend([url, None, in_head and imported]
+                                 for url, imported in css_urls(content[pos:body_end]))
+            pos = end.end() if end else len(content)
+
+    if 'url(' in content:
+        for match in _STYLE_ATTR_RE.finditer(content):
+            value = match.group(1) or match.group(2) or ''
+            if 'url(' in value and content[match.start() - 1].isspace():
+                resources.extend([url, None, False] for url, _ in css_urls(value))
+    if MOUNT_RE.search(content):
+        # header.js fetches the header into the mount (or the build inlines it)
+        resources.append(['/' + HEADER_SOURCE, 'fragment', False])
+    return resources
+
+
+def _page_resources(root, file_path):
+    """run_parallel() worker: (path, size, resources, error)"""
+    path = rel_path(file_path, root)
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        return path, len(data), page_resources(data.decode('utf-8', errors='replace')), None
+    except Exception as e:
+        return path, 0, [], str(e)
+
+
+class AssetSizes:
+    """File sizes, stat'd once per file however many pages use it"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.sizes = {}
+
+    def size(self, path):
+        if path not in self.sizes:
+            try:
+                self.sizes[path] = os.path.getsize(os.path.join(self.root, path))
+            except OSError:
+                self.sizes[path] = 0
+        return self.sizes[path]
+
+    @property
+    def total(self):
+        return sum(self.sizes.values())
+
+
+class Stylesheets:
+    """
+    Local files a stylesheet or HTML fragment pulls in, parsed once per
+    file: [(url, kind, imported)] with URLs left relative to the file
+    """
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.parsed = {}
+
+    def references(self, path):
+        if path not in self.parsed:
+            try:
+                with open(os.path.join(self.root, path), 'r', encoding='utf-8',
+                          errors='replace') as f:
+                    text = f.read()
+            except OSError:
+                text = ''
+            if path.endswith('.css'):
+                self.parsed[path] = [(url, 'css' if imported else None, imported)
+                                     for url, imported in css_urls(text)]
+            else:
+                self.parsed[path] = [(url, kind, False) for url, kind, _ in page_resources(text)]
+        return self.parsed[path]
+
+
+class PageWeight:
+    """What one page downloads"""
+
+    def __init__(self, path, section, budget_kb, blocking_budget_kb):
+        self.path = path
+        self.section = section
+        self.budget_kb = budget_kb
+        self.blocking_budget_kb = blocking_budget_kb
+        self.assets = {}      # file -> [kind, blocking, size]
+        self.missing = set()  # local URLs that resolve to nothing
+        self.external = set()
+
+    def add(self, file, kind, blocking, size):
+        self.assets[file] = [kind, blocking, size]
+
+    @property
+    def total(self):
+        return sum(size for _, _, size in self.assets.values())
+
+    @property
+    def blocking(self):
+        return sum(size for _, blocking, size in self.assets.values() if blocking)
+
+    def by_kind(self):
+        totals = {}
+        for kind, _, size in self.assets.values():
+            totals[kind] = totals.get(kind, 0) + size
+        return totals
+
+    def heaviest(self, count):
+        """[(file, kind, size)] of the largest assets, largest first"""
+        ranked = sorted(self.assets.items(), key=lambda item: (-item[1][2], item[0]))
+        return [(file, kind, size) for file, (kind, _, size) in ranked[:count]]
+
+    @property
+    def over_total(self):
+        return self.total > self.budget_kb * 1024
+
+    @property
+    def over_blocking(self):
+        return self.blocking > self.blocking_budget_kb * 1024
+
+    @property
+    def over_budget(self):
+        return self.over_total or self.over_blocking
+
+
+def budget_for(path, budgets=BUDGETS):
+    """(section, total KB, render-blocking KB) for a page"""
+    for pattern, section, total_kb, blocking_kb in budgets:
+        if fnmatch(path, pattern):
+            return section, total_kb, blocking_kb
+    return None, None, None
+
+
+class Resolver:
+    """Turns the URLs on a page into files, recursing into stylesheets"""
+
+    def __init__(self, root='.'):
+        self.site_files = SiteFiles(root)
+        self.sizes = AssetSizes(root)
+        self.stylesheets = Stylesheets(root)
+        self.files = {}
+
+    def file_for(self, url, base_url):
+        """(file, site path); both None for external URLs"""
+        # Root-relative URLs resolve the same from every page
+        key = url if url.startswith('/') and not url.startswith('//') else (url, base_url)
+        if key not in self.files:
+            site_path = internal_path(url, base_url)
+            file = None if site_path is None else self.site_files.file_for(site_path)
+            self.files[key] = file, site_path
+        return self.files[key]
+
+    def add(self, page, url, kind, blocking, base_url):
+        file, site_path = self.file_for(url, base_url)
+        if site_path is None:
+            if url.startswith(('http:', 'https:', '//')):
+                page.external.add(url)
+            return
+        if file is None:
+            page.missing.add(site_path)
+            return
+        if file in page.assets:
+            if blocking and not page.assets[file][1]:
+                page.assets[file][1] = True
+            return
+        kind = kind_of(file) if kind in (None, 'fragment') else kind
+        page.add(file, kind, blocking, self.sizes.size(file))
+        if file.endswith(('.css', '.html')) and file != page.path:
+            file_url = file_path_to_url(file)
+            for child_url, child_kind, imported in self.stylesheets.references(file):
+                self.add(page, child_url, child_kind, blocking and imported, file_url)
+
+
+class BudgetReport:
+    """Findings of one check() run"""
+
+    def __init__(self):
+        self.pages = []     # PageWeight, in path order
+        self.errors = []    # (path, error)
+        self.assets = 0     # distinct local files stat'd
+        self.asset_bytes = 0
+
+    @property
+    def over_budget(self):
+        return [page for page in self.pages if page.over_budget]
+
+    def heaviest(self, count):
+        return sorted(self.pages, key=lambda page: (-page.total, page.path))[:count]
+
+    def sections(self):
+        """{section: [PageWeight]}"""
+        grouped = {}
+        for page in self.pages:
+            grouped.setdefault(page.section, []).append(page)
+        return grouped
+
+
+def check(root='.', workers=1, budgets=BUDGETS, files=None):
+    """Weigh every page under root (or the given files) against budgets"""
+    report = BudgetReport()
+    resolver = Resolver(root)
+    if files is None:
+        files = iter_html_files(root, skip_paths=SKIP_PATHS)
+    files = list(files)
+    for path, size, resources, error in run_parallel(partial(_page_resources, root), files, workers):
+        if error is not None:
+            report.errors.append((path, error))
+            continue
+        section, total_kb, blocking_kb = budget_for(path, budgets)
+        page = PageWeight(path, section, total_kb, blocking_kb)
+        page.add(path, 'html', False, size)
+        page_url = file_path_to_url(path)
+        for url, kind, blocking in resources:
+            resolver.add(page, url.strip(), kind, blocking, page_url)
+        report.pages.append(page)
+    report.pages.sort(key=lambda page: page.path)
+    report.assets = len(resolver.sizes.sizes)
+    report.asset_bytes = resolver.sizes.total
+    return report
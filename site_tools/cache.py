@@ -0,0 +1,201 @@
+"""
+Persistent manifest of per-file content hashes and applied checks.
+
+For every page the manifest remembers its size, mtime and content hash,
+plus the version of each rule or audit that has already run over that
+exact content (and, for audits, the result). A re-run skips a file when its
+content is unchanged and every check it needs is at the current version.
+
+The stat shortcut means unchanged files are never read: only when size or
+mtime differ is the file re-hashed, so a touch or git checkout that leaves
+the bytes alone still counts as unchanged.
+
+Versions come from version_of(), which hashes a rule's pattern/replacement
+or a function's bytecode, so editing a rule or audit invalidates it without
+anyone having to remember to bump a number.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from site_tools.files import rel_path
+
+CACHE_DIR = '.site-cache'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_FORMAT = 1
+
+
+def hash_bytes(data):
+    """Content hash used throughout the manifest"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def hash_file(file_path):
+    """Hash a file's contents without decoding it"""
+    with open(file_path, 'rb') as f:
+        return hash_bytes(f.read())
+
+
+def stat_key(file_path):
+    """(size, mtime_ns) used to decide whether a file needs re-hashing"""
+    st = os.stat(file_path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def check_unchanged(file_path, entry):
+    """
+    True if file_path still has the content recorded in entry ({'stat',
+    'hash'}). When only the mtime moved, entry['stat'] is refreshed in place.
+    Raises OSError if the file is gone.
+    """
+    stat = stat_key(file_path)
+    if stat == entry['stat']:
+        return True
+    # Size or mtime moved: only the content hash can tell us for sure
+    if (stat[0] == entry['stat'][0] and entry['hash'] is not None
+            and hash_file(file_path) == entry['hash']):
+        entry['stat'] = stat
+        return True
+    return False
+
+
+def write_json(path, data):
+    """Write compact JSON atomically (temp file + rename)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _code_fingerprint(code, digest):
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _code_fingerprint(const, digest)
+        else:
+            digest.update(repr(const).encode())
+
+
+def version_of(*parts):
+    """
+    Short version string for a rule or audit. Functions are fingerprinted by
+    their bytecode and constants; everything else by repr().
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        code = getattr(part, '__code__', None)
+        if code is not None:
+            _code_fingerprint(code, digest)
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class Manifest:
+    """JSON manifest stored at <root>/.site-cache/manifest.json"""
+
+    def __init__(self, root='.', path=None, reset=False):
+        self.root = root
+        self.path = path or os.path.join(root, CACHE_DIR, MANIFEST_NAME)
+        self.files = {}
+        self.dirty = reset
+        if not reset:
+            self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('format') == MANIFEST_FORMAT:
+            self.files = data.get('files', {})
+
+    def save(self):
+        """Write the manifest atomically (only if something changed)"""
+        if not self.dirty:
+            return
+        write_json(self.path, {'format': MANIFEST_FORMAT, 'files': self.files})
+        self.dirty = False
+
+    def _entry(self, file_path):
+        """
+        Return the manifest entry for file_path if its content is unchanged
+        since it was recorded, otherwise drop the stale entry and return None.
+        """
+        key = rel_path(file_path, self.root)
+        entry = self.files.get(key)
+        if entry is None:
+            return None
+        stat = entry['stat']
+        try:
+            if check_unchanged(file_path, entry):
+                self.dirty = self.dirty or entry['stat'] is not stat
+                return entry
+        except OSError:
+            pass
+        del self.files[key]
+        self.dirty = True
+        return None
+
+    def is_fresh(self, file_path, versions):
+        """True if every check in versions ({name: version}) already ran on this content"""
+        entry = self._entry(file_path)
+        if entry is None:
+            return False
+        checks = entry['checks']
+        return all(checks.get(name, {}).get('version') == version
+                   for name, version in versions.items())
+
+    def result(self, file_path, name):
+        """Cached result of a check (call is_fresh() first)"""
+        entry = self.files.get(rel_path(file_path, self.root))
+        if entry is None:
+            return None
+        return entry['checks'].get(name, {}).get('result')
+
+    def record(self, file_path, versions, results=None, content=None):
+        """
+        Record that the checks in versions ran on the file's current content.
+        Pass content (bytes) when it is already in memory to avoid a re-read.
+        """
+        digest = hash_bytes(content) if content is not None else hash_file(file_path)
+        self.record_hash(file_path, digest, versions, results)
+
+    def record_unhashed(self, file_path, versions, results=None):
+        """
+        record() for read-only audits that only read part of the file (see
+        headreader.py). Without a hash the entry is trusted only while size
+        and mtime stay exactly the same.
+        """
+        self.record_hash(file_path, None, versions, results)
+
+    def record_hash(self, file_path, digest, versions, results=None):
+        """record() for callers that already know the content hash"""
+        key = rel_path(file_path, self.root)
+        stat = stat_key(file_path)
+        entry = self.files.get(key)
+        if digest is None and entry is not None and entry['stat'] == stat:
+            # Unchanged since it was last recorded: keep the known hash
+            digest = entry['hash']
+        if entry is None or entry['hash'] != digest:
+            entry = {'hash': digest, 'checks': {}}
+            self.files[key] = entry
+        entry['stat'] = stat
+        results = results or {}
+        for name, version in versions.items():
+            check = {'version': version}
+            if name in results:
+                check['result'] = results[name]
+            entry['checks'][name] = check
+        self.dirty = True
+
+
+def add_cache_argument(parser):
+    """Add the shared --no-cache option to an argparse parser"""
+    parser.add_argument('--no-cache', action='store_true',
+                        help=f"re-check every file and rebuild {CACHE_DIR}/")
@@ -0,0 +1,153 @@
+"""
+Blog posts from a local export of the Sanity dataset.
+
+read_export() accepts any of the forms the Sanity tools produce:
+
+  - the tarball from `sanity dataset export` (its data.ndjson is read)
+  - a bare .ndjson export, one document per line
+  - a JSON array of documents
+  - a saved query response ({"result": [...]})
+  - the SQLite snapshot sync-sanity.py keeps (see snapshot.py)
+
+load_posts() turns the published blogPost documents into dicts of the
+shape blog/post.html asks the API for (POST_FIELDS), with category
+references resolved to their titles, so a post looks the same whether it
+came from the live API or from an export. Drafts (ids starting with
+"drafts.") and posts without a slug are left out.
+"""
+import json
+import tarfile
+
+SQLITE_MAGIC = b'SQLite format 3\x00'
+
+# The project the site's scripts in assets/js/ read from
+SANITY_PROJECT_ID = '53m7wbm0'
+SANITY_DATASET = 'production'
+SANITY_API_VERSION = '2024-01-01'
+
+POST_TYPE = 'blogPost'
+CATEGORY_TYPE = 'category'
+
+# The projection blog/post.html queries, in the same order
+POST_FIELDS = ('_id', 'title', 'slug', 'author', 'publishedAt', 'excerpt', 'mainImageRef',
+               'mainImageAlt', 'categories', 'body', 'metaTitle', 'metaDescription')
+
+# Kept alongside the projection so caches can tell revisions apart
+META_FIELDS = ('_rev', '_updatedAt')
+
+CMS_POST_URL = '/blog/post.html?slug={slug}'
+
+
+def _parse_ndjson(lines):
+    docs = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            docs.append(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}") from None
+    return docs
+
+
+def read_export(path):
+    """Every document in the export at path, as a list of dicts"""
+    with open(path, 'rb') as f:
+        if f.read(len(SQLITE_MAGIC)) == SQLITE_MAGIC:
+            from site_tools.snapshot import Snapshot
+            with Snapshot(path) as snapshot:
+                return snapshot.documents()
+    if tarfile.is_tarfile(path):
+        with tarfile.open(path) as tar:
+            member = next((m for m in tar.getmembers()
+                           if m.isfile() and m.name.endswith('data.ndjson')), None)
+            if member is None:
+                raise ValueError(f"{path}: no data.ndjson in the export")
+            return _parse_ndjson(tar.extractfile(member).read().decode('utf-8').splitlines())
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if path.endswith('.ndjson'):
+        return _parse_ndjson(text.splitlines())
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get('result', [])
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of documents")
+    return data
+
+
+def _slug(value):
+    if isinstance(value, dict):
+        return value.get('current')
+    return value
+
+
+def _category_titles(value, categories):
+    titles = []
+    for category in value or ():
+        if isinstance(category, str):
+            titles.append(category)          # already projected
+        elif isinstance(category, dict):
+            ref = category.get('_ref')
+            title = categories.get(ref) if ref else category.get('title')
+            if title:
+                titles.append(title)
+    return titles
+
+
+def post_from_doc(doc, categories):
+    """
+    A blogPost document (raw or already projected) in POST_FIELDS shape;
+    categories maps category ids to titles.
+    """
+    image = doc.get('mainImage') or {}
+    post = {
+        '_id': doc.get('_id'),
+        'title': doc.get('title'),
+        'slug': _slug(doc.get('slug')),
+        'author': doc.get('author'),
+        'publishedAt': doc.get('publishedAt'),
+        'excerpt': doc.get('excerpt'),
+        'mainImageRef': doc.get('mainImageRef') or (image.get('asset') or {}).get('_ref'),
+        'mainImageAlt': doc.get('mainImageAlt') or image.get('alt'),
+        'categories': _category_titles(doc.get('categories'), categories),
+        'body': doc.get('body'),
+        'metaTitle': doc.get('metaTitle'),
+        'metaDescription': doc.get('metaDescription'),
+    }
+    for field in META_FIELDS:
+        post[field] = doc.get(field)
+    return post
+
+
+def load_posts(docs):
+    """Published posts among docs, newest first"""
+    categories = {doc['_id']: doc.get('title') for doc in docs
+                  if doc.get('_type') == CATEGORY_TYPE and '_id' in doc}
+    posts = []
+    for doc in docs:
+        # Projected query results carry no _type; anything with a slug counts
+        if doc.get('_type', POST_TYPE) != POST_TYPE:
+            continue
+        if str(doc.get('_id', '')).startswith('drafts.'):
+            continue
+        post = post_from_doc(doc, categories)
+        if post['slug']:
+            posts.append(post)
+    posts.sort(key=lambda post: (post['publishedAt'] or '', post['slug']), reverse=True)
+    return posts
+
+
+def image_url(ref, width=1200):
+    """Sanity CDN URL for an image asset reference (image-<id>-<w>x<h>-<ext>)"""
+    asset = ref[len('image-'):] if ref.startswith('image-') else ref
+    stem, _, ext = asset.rpartition('-')
+    return (f"https://cdn.sanity.io/images/{SANITY_PROJECT_ID}/{SANITY_DATASET}/"
+            f"{stem}.{ext}?w={width}&auto=format")
+
+
+def post_url(slug):
+    """Site path of a CMS post that has no pre-rendered page"""
+    return CMS_POST_URL.format(slug=slug)
@@ -0,0 +1,419 @@
+"""
+CSS minification and used-selector pruning for assets/site.css.
+
+parse() turns a stylesheet into StyleRule/AtRule nodes in one linear pass
+(strings and escapes are masked first, so braces or semicolons inside them
+never confuse the scanner). serialize() writes the nodes back minified.
+
+SelectorIndex is built once per stylesheet: every selector is reduced to
+the classes, ids and element names a page must contain for it to match.
+Checking a page is then a set comparison per selector, so pruning the
+stylesheet for hundreds of pages never re-parses the CSS.
+
+Pruning is conservative: pseudo-classes, attribute selectors and the
+arguments of :not()/:is()/:where()/:has() are ignored, so a selector is
+only dropped when something it definitely needs is missing from the page.
+"""
+import os
+import re
+
+STRING_PATTERN = r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''
+
+_MASK_RE = re.compile(rf'{STRING_PATTERN}|\\.', re.DOTALL)
+_COMMENT_RE = re.compile(rf'({STRING_PATTERN})|/\*.*?\*/', re.DOTALL)
+
+# At-rules whose block holds style rules that can be pruned one by one.
+# Everything else (@font-face, @keyframes, @page, ...) is kept whole.
+GROUPING_AT_RULES = {'media', 'supports', 'layer', 'container', 'document'}
+
+
+class StyleRule:
+    """selector, selector { declarations }"""
+
+    def __init__(self, selectors, declarations):
+        self.selectors = selectors
+        self.declarations = declarations
+
+
+class AtRule:
+    """@name prelude; or @name prelude { children | declarations }"""
+
+    def __init__(self, name, prelude, children=None, declarations=None):
+        self.name = name
+        self.prelude = prelude
+        self.children = children
+        self.declarations = declarations
+
+
+def strip_comments(text):
+    return _COMMENT_RE.sub(lambda m: m.group(1) or '', text)
+
+
+def _mask(text):
+    """Same-length copy of text with string contents and escapes blanked out"""
+    return _MASK_RE.sub(lambda m: m.group(0)[0] + 'x' * (len(m.group(0)) - 1), text)
+
+
+def _close_brace(masked, start):
+    """Index of the '}' matching the '{' just before start"""
+    depth = 1
+    for i in range(start, len(masked)):
+        char = masked[i]
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unclosed block at offset {start}")
+
+
+def _prelude_end(masked, start):
+    """Index of the first '{', ';' or '}' outside parentheses"""
+    parens = 0
+    for i in range(start, len(masked)):
+        char = masked[i]
+        if char == '(':
+            parens += 1
+        elif char == ')':
+            parens = max(parens - 1, 0)
+        elif parens == 0 and char in '{;}':
+            return i
+    return len(masked)
+
+
+def _split_top_level(text, masked, separator):
+    """Split on separator outside parentheses and brackets"""
+    parts = []
+    depth = 0
+    last = 0
+    for i, char in enumerate(masked):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth = max(depth - 1, 0)
+        elif char == separator and depth == 0:
+            parts.append(text[last:i])
+            last = i + 1
+    parts.append(text[last:])
+    return parts
+
+
+# Minification of the three kinds of text in a stylesheet. Each regex matches
+# strings first and puts them back untouched.
+_WHITESPACE_RE = re.compile(rf'({STRING_PATTERN})|\s+')
+_SELECTOR_RE = re.compile(rf'({STRING_PATTERN})|\s*([,>+~])\s*')
+_VALUE_RE = re.compile(rf'({STRING_PATTERN})|\s*(,)\s*|\s+(!)|(\()\s+|\s+(\))')
+_PRELUDE_RE = re.compile(rf'({STRING_PATTERN})|\s*([,:])\s*|(\()\s+|\s+(\))')
+
+
+def _collapse(text):
+    return _WHITESPACE_RE.sub(lambda m: m.group(1) or ' ', text).strip()
+
+
+def _keep_strings(regex, text):
+    return regex.sub(lambda m: m.group(1) or ''.join(g for g in m.groups()[1:] if g), text)
+
+
+def minify_selector(selector):
+    return _keep_strings(_SELECTOR_RE, _collapse(selector))
+
+
+def minify_value(value):
+    return _keep_strings(_VALUE_RE, _collapse(value))
+
+
+def minify_prelude(prelude):
+    """@media/@supports conditions; the space before '(' after 'and' must stay"""
+    return _keep_strings(_PRELUDE_RE, _collapse(prelude))
+
+
+def parse_declarations(text):
+    """'color: red; margin: 0' -> ['color:red', 'margin:0']"""
+    declarations = []
+    for part in _split_top_level(text, _mask(text), ';'):
+        name, colon, value = part.partition(':')
+        name = name.strip()
+        if not colon or not name:
+            continue
+        declarations.append(f"{name}:{minify_value(value)}")
+    return declarations
+
+
+def _parse(text, masked, warnings, offset=0):
+    nodes = []
+    pos = 0
+    length = len(text)
+    # A stray '}' or ';' becomes part of the next rule's prelude, which makes
+    # it invalid: browsers drop that whole rule, so the parser does too
+    invalid_from = None
+    while pos < length:
+        end = _prelude_end(masked, pos)
+        prelude = text[pos:end].strip()
+        if end >= length:
+            break
+        if masked[end] == '}' or (masked[end] == ';' and not prelude.startswith('@')):
+            if invalid_from is None:
+                invalid_from = offset + end
+            pos = end + 1
+            continue
+
+        if masked[end] == ';':
+            name = re.match(r'@([\w-]+)', prelude)
+            nodes.append(AtRule(name.group(1).lower() if name else '', prelude))
+            pos = end + 1
+            continue
+
+        close = _close_brace(masked, end + 1)
+        body, body_masked = text[end + 1:close], masked[end + 1:close]
+        pos = close + 1
+        if invalid_from is not None:
+            warnings.append(f"stray '{text[invalid_from - offset]}' at offset {invalid_from}: "
+                            f"browsers ignore the following rule ({_collapse(prelude)[:60]})")
+            invalid_from = None
+        elif prelude.startswith('@'):
+            name = re.match(r'@([\w-]+)', prelude)
+            name = name.group(1).lower() if name else ''
+            if '{' in body_masked:
+                children = _parse(body, body_masked, warnings, offset + end + 1)
+                nodes.append(AtRule(name, prelude, children=children))
+            else:
+                nodes.append(AtRule(name, prelude, declarations=parse_declarations(body)))
+        elif prelude:
+            selectors = [minify_selector(s) for s in _split_top_level(prelude, _mask(prelude), ',')]
+            nodes.append(StyleRule([s for s in selectors if s], parse_declarations(body)))
+    return nodes
+
+
+def parse(text, warnings=None):
+    """
+    Parse a stylesheet into a list of StyleRule/AtRule nodes. Problems that
+    make browsers skip a rule are appended to warnings (offsets are into the
+    stylesheet with comments removed).
+    """
+    text = strip_comments(text)
+    return _parse(text, _mask(text), warnings if warnings is not None else [])
+
+
+def serialize(nodes, keep=None):
+    """
+    Minified CSS for a list of nodes. keep(rule) returns the selectors of a
+    prunable StyleRule to emit (None keeps everything); rules and at-rule
+    blocks left empty are dropped.
+    """
+    out = []
+    for node in nodes:
+        if isinstance(node, StyleRule):
+            selectors = node.selectors if keep is None else keep(node)
+            if selectors and node.declarations:
+                out.append(f"{','.join(selectors)}{{{';'.join(node.declarations)}}}")
+        elif node.children is not None:
+            # @keyframes steps and the like are never pruned
+            inner = serialize(node.children, keep if node.name in GROUPING_AT_RULES else None)
+            if inner:
+                out.append(f"{minify_prelude(node.prelude)}{{{inner}}}")
+        elif node.declarations is not None:
+            if node.declarations:
+                out.append(f"{minify_prelude(node.prelude)}{{{';'.join(node.declarations)}}}")
+        else:
+            out.append(f"{minify_prelude(node.prelude)};")
+    return ''.join(out)
+
+
+def minify(text):
+    return serialize(parse(text))
+
+
+_STRING_RE = re.compile(STRING_PATTERN)
+_PARENS_RE = re.compile(r'\([^()]*\)')
+_ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+_PSEUDO_RE = re.compile(r'(?<!\\)::?[\w-]+')
+_CLASS_RE = re.compile(r'\.((?:[\w-]|\\.)+)')
+_ID_RE = re.compile(r'#((?:[\w-]|\\.)+)')
+_TAG_RE = re.compile(r'(?:^|[\s>+~])([a-zA-Z][\w-]*)')
+_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+def selector_requirements(selector):
+    """
+    Classes, ids and element names a page needs for selector to match:
+    '.nav a:not(.active):hover' -> ({'nav'}, set(), {'a'})
+    """
+    simple = _STRING_RE.sub('""', selector)
+    while True:
+        reduced = _PARENS_RE.sub('', simple)
+        if reduced == simple:
+            break
+        simple = reduced
+    simple = _PSEUDO_RE.sub('', _ATTRIBUTE_RE.sub('', simple))
+    classes = frozenset(_ESCAPE_RE.sub(r'\1', name) for name in _CLASS_RE.findall(simple))
+    ids = frozenset(_ESCAPE_RE.sub(r'\1', name) for name in _ID_RE.findall(simple))
+    tags = frozenset(name.lower() for name in _TAG_RE.findall(simple))
+    return classes, ids, tags
+
+
+class Usage:
+    """The classes, ids and element names that appear on a page (or group)"""
+
+    def __init__(self, classes=(), ids=(), tags=()):
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.tags = set(tags)
+
+    def update(self, other):
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.tags |= other.tags
+        return self
+
+    def add_words(self, words):
+        """Names seen in script strings could be a class, an id or a tag"""
+        words = set(words)
+        self.classes |= words
+        self.ids |= words
+        self.tags |= {word.lower() for word in words}
+
+    def allows(self, requirements):
+        classes, ids, tags = requirements
+        return classes <= self.classes and ids <= self.ids and tags <= self.tags
+
+
+_HTML_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)')
+_HTML_CLASS_RE = re.compile(r'''\sclass\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+_HTML_ID_RE = re.compile(r'''\sid\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+_INLINE_SCRIPT_RE = re.compile(r'<script\b[^>]*>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_JS_STRING_RE = re.compile(rf'{STRING_PATTERN}|`[^`]*`')
+_WORD_RE = re.compile(r'[\w-]+')
+
+
+def script_words(source):
+    """Every word inside a JS string literal: class names toggled at runtime"""
+    words = set()
+    for literal in _JS_STRING_RE.findall(source):
+        words.update(_WORD_RE.findall(literal))
+    return words
+
+
+def html_usage(content):
+    """Usage of one HTML document, including names set by its inline scripts"""
+    usage = Usage(tags=(tag.lower() for tag in _HTML_TAG_RE.findall(content)))
+    for match in _HTML_CLASS_RE.finditer(content):
+        usage.classes.update((match.group(1) or match.group(2) or '').split())
+    for match in _HTML_ID_RE.finditer(content):
+        usage.ids.update((match.group(1) or match.group(2) or '').split())
+    for script in _INLINE_SCRIPT_RE.findall(content):
+        usage.add_words(script_words(script))
+    return usage
+
+
+_SCRIPT_SRC_RE = re.compile(r'''<script\b[^>]*\ssrc\s*=\s*["']([^"']+)["']''', re.IGNORECASE)
+_FRAGMENT_RE = re.compile(r'^(/[\w./-]+\.html)(?:[?#].*)?$')
+
+
+def local_path(root, page, url):
+    """File behind a same-site URL referenced from page, or None"""
+    if '//' in url or url.startswith(('data:', 'javascript:')):
+        return None
+    url = url.split('#', 1)[0].split('?', 1)[0]
+    if url.startswith('/'):
+        path = os.path.join(root, url.lstrip('/'))
+    else:
+        path = os.path.join(root, os.path.dirname(page), url)
+    path = os.path.normpath(path)
+    return path if os.path.isfile(path) else None
+
+
+_script_cache = {}
+
+
+def script_usage(root, path):
+    """
+    Names a local script can add at runtime: every word in its string
+    literals, plus the markup of any /....html fragment it fetches (the
+    shared header that header.js injects). Cached per path.
+    """
+    if path not in _script_cache:
+        usage = Usage()
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            source = f.read()
+        words = set()
+        for literal in _JS_STRING_RE.findall(source):
+            words.update(_WORD_RE.findall(literal))
+            fragment = _FRAGMENT_RE.match(literal[1:-1])
+            fragment_path = fragment and local_path(root, '', fragment.group(1))
+            if fragment_path:
+                with open(fragment_path, 'r', encoding='utf-8') as f:
+                    usage.update(html_usage(f.read()))
+        usage.add_words(words)
+        _script_cache[path] = usage
+    return _script_cache[path]
+
+
+def page_usage(root, page, content):
+    """Usage of a page plus everything its local <script src> files can add"""
+    usage = html_usage(content)
+    for src in _SCRIPT_SRC_RE.findall(content):
+        path = local_path(root, page, src)
+        if path:
+            usage.update(script_usage(root, path))
+    return usage
+
+
+class SelectorIndex:
+    """
+    A parsed stylesheet plus the requirements of every prunable selector,
+    built once and shared by every subset() call
+    """
+
+    def __init__(self, text):
+        self.warnings = []
+        self.nodes = parse(text, self.warnings)
+        self.requirements = {}
+        cache = {}
+        for rule in self._prunable_rules(self.nodes):
+            entries = []
+            for selector in rule.selectors:
+                if selector not in cache:
+                    cache[selector] = selector_requirements(selector)
+                entries.append((selector, cache[selector]))
+            self.requirements[id(rule)] = entries
+
+    def _prunable_rules(self, nodes):
+        for node in nodes:
+            if isinstance(node, StyleRule):
+                yield node
+            elif node.children is not None and node.name in GROUPING_AT_RULES:
+                yield from self._prunable_rules(node.children)
+
+    @property
+    def selector_count(self):
+        return sum(len(entries) for entries in self.requirements.values())
+
+    def used_selectors(self, usage):
+        """Set of selectors that can match a page with this usage"""
+        return {selector for entries in self.requirements.values()
+                for selector, requirements in entries if usage.allows(requirements)}
+
+    def subset(self, usage):
+        """Minified stylesheet with only the selectors that can match usage"""
+        def keep(rule):
+            return [selector for selector, requirements in self.requirements[id(rule)]
+                    if usage.allows(requirements)]
+        return serialize(self.nodes, keep)
+
+    def minified(self):
+        return serialize(self.nodes)
+
+
+# Page groups that can get their own pruned stylesheet (directory prefixes)
+PAGE_GROUPS = ('features', 'industries', 'blog')
+
+
+def group_of(path):
+    """'features/scheduling/index.html' -> 'features'; None outside a group"""
+    top = path.split('/', 1)[0]
+    return top if top in PAGE_GROUPS and '/' in path else None
+
+
+def group_stylesheet_path(group):
+    return f"assets/site.{group}.min.css"
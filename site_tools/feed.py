@@ -0,0 +1,445 @@
+"""
+Build blog/feed.xml from the posts in blog/posts/ and, optionally, a local
+export of the CMS (see cms.py).
+
+Each post becomes one rendered <item>. Items are cached in
+.site-cache/feed-items.json: a page is keyed by its path and reused while
+its content is unchanged (the manifest's stat-then-hash check), a CMS post
+by its slug and the hash of its projected fields. Adding one post parses
+that post only; every other item is copied into the feed as cached text.
+
+Where the metadata comes from, for pages:
+
+  title        <title>, without the " — Creative Job Hub" suffix
+  description  meta description
+  pubDate      article:published_time, then the JSON-LD datePublished,
+               then the commit that added the page, then its mtime
+  category     article:section, then the JSON-LD articleSection
+
+A page and a CMS post with the same slug are the same post; the page wins.
+Template pages (placeholder titles) and noindex pages are left out.
+
+FeedWriter streams the items newest first into feed.xml, feed-2.xml, ...
+ITEMS_PER_PAGE at a time. Older pages are linked from feed.xml with RFC
+5005 paged-feed links (first/next/previous/last), so feed readers can walk
+back through a large archive while feed.xml itself stays small. Files are
+only replaced when their content changes, and pages left over from a
+bigger feed are removed.
+"""
+import json
+import os
+import re
+import subprocess
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from site_tools import cms
+from site_tools.cache import CACHE_DIR, check_unchanged, hash_bytes, stat_key, version_of, write_json
+from site_tools.headindex import extract_head_metadata, parse_attrs
+from site_tools.writes import replace_if_changed
+
+POSTS_DIR = 'blog/posts'
+FEED_DIR = 'blog'
+FEED_NAME = 'feed.xml'
+
+# The feed has always been published on the bare host; item guids must not
+# change, or every reader shows every post as new again
+FEED_SITE_URL = 'https://creativejobhub.com'
+
+ITEMS_PER_PAGE = 50
+
+CHANNEL_TITLE = 'Creative Job Hub Blog'
+CHANNEL_DESCRIPTION = ('Field service management insights, tips, and best practices '
+                       'for small teams')
+CHANNEL_CATEGORY = 'Field Service Management'
+AUTHOR_EMAIL = 'hello@creativejobhub.com'
+DEFAULT_AUTHOR = 'Creative Job Hub Team'
+LOGO_URL = f'{FEED_SITE_URL}/assets/logo-white.png'
+
+CACHE_NAME = 'feed-items.json'
+
+_TITLE_SUFFIX_RE = re.compile(r'\s+[—–|-]\s+Creative Job Hub(?: Blog)?\s*$')
+_META_RE = re.compile(r'<meta\b([^>]*)>', re.IGNORECASE)
+_LD_JSON_RE = re.compile(r'<script\b[^>]*application/ld\+json[^>]*>(.*?)</script\s*>',
+                         re.IGNORECASE | re.DOTALL)
+_ARTICLE_TYPES = ('Article', 'BlogPosting', 'NewsArticle')
+_PAGE_NAME_RE = re.compile(r'^feed-(\d+)\.xml$')
+
+
+def parse_date(value):
+    """Timezone-aware datetime for an ISO 8601 date or timestamp, or None"""
+    if not value:
+        return None
+    try:
+        date = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
+
+def rfc822(date):
+    """Sat, 02 Nov 2025 10:00:00 GMT"""
+    return format_datetime(date.astimezone(timezone.utc), usegmt=True)
+
+
+def _ld_articles(content):
+    """Article objects from the page's JSON-LD, including @graph members"""
+    for match in _LD_JSON_RE.finditer(content):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        nodes = data if isinstance(data, list) else [data]
+        for node in nodes:
+            if not isinstance(node, dict):
+                continue
+            for item in [node] + list(node.get('@graph') or ()):
+                types = item.get('@type') if isinstance(item, dict) else None
+                types = types if isinstance(types, list) else [types]
+                if any(t in _ARTICLE_TYPES for t in types):
+                    yield item
+
+
+def post_from_page(content):
+    """
+    Feed metadata of a post page: {'title', 'description', 'date', 'category'},
+    date being None if the page has none. None for pages that are not posts.
+    """
+    head = extract_head_metadata(content)
+    title = head['title'] or ''
+    if not title or '[POST_' in title or 'noindex' in (head['robots'] or '').lower():
+        return None
+    article = {}
+    for match in _META_RE.finditer(content):
+        attrs = parse_attrs(match.group(1))
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        if key.startswith('article:') and key not in article:
+            article[key] = attrs.get('content')
+    ld = next(_ld_articles(content), {})
+
+    date = parse_date(article.get('article:published_time')) or parse_date(ld.get('datePublished'))
+    category = article.get('article:section') or ld.get('articleSection')
+    if isinstance(category, list):
+        category = category[0] if category else None
+    return {
+        'title': _TITLE_SUFFIX_RE.sub('', title),
+        'description': head['description'] or ld.get('description') or '',
+        'date': date.isoformat() if date else None,
+        'category': category,
+    }
+
+
+def git_added_date(root, path):
+    """Date of the commit that added path (relative to root), or None"""
+    try:
+        result = subprocess.run(['git', '-C', root, 'log', '--diff-filter=A', '--format=%cI',
+                                 '--', path], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    dates = result.stdout.split()
+    return parse_date(dates[-1]) if dates else None
+
+
+def render_item(title, link, description, date, categories=(), author=None):
+    """One <item>, indented to sit inside <channel>"""
+    lines = ['    <item>',
+             f'      <title>{escape(title)}</title>',
+             f'      <description>{escape(description)}</description>',
+             f'      <link>{escape(link)}</link>',
+             f'      <guid>{escape(link)}</guid>',
+             f'      <pubDate>{rfc822(date)}</pubDate>',
+             f'      <author>{escape(f"{AUTHOR_EMAIL} ({author or DEFAULT_AUTHOR})")}</author>']
+    lines += [f'      <category>{escape(category)}</category>' for category in categories if category]
+    lines.append('    </item>\n')
+    return '\n'.join(lines)
+
+
+def page_item(root, path, content):
+    """(date, item XML) for the post page at path, or None if it is not a post"""
+    post = post_from_page(content)
+    if post is None:
+        return None
+    date = (parse_date(post['date']) or git_added_date(root, path)
+            or datetime.fromtimestamp(os.path.getmtime(os.path.join(root, path)), timezone.utc))
+    link = f"{FEED_SITE_URL}/{os.path.dirname(path)}/"
+    xml = render_item(post['title'], link, post['description'], date, [post['category']])
+    return date.isoformat(), xml
+
+
+def cms_item(post):
+    """(date, item XML) for a CMS post (cms.load_posts() shape), or None without a date"""
+    date = parse_date(post['publishedAt'])
+    if date is None:
+        return None
+    link = FEED_SITE_URL + cms.post_url(post['slug'])
+    description = post['excerpt'] or post['metaDescription'] or ''
+    xml = render_item(post['title'] or post['slug'], link, description, date,
+                      post['categories'], post['author'])
+    return date.isoformat(), xml
+
+
+# Cached items are re-rendered whenever the metadata or rendering code changes
+FEED_VERSION = version_of(post_from_page, _ld_articles, parse_date, rfc822, render_item,
+                          page_item, cms_item, _TITLE_SUFFIX_RE.pattern, _LD_JSON_RE.pattern,
+                          _ARTICLE_TYPES, FEED_SITE_URL, AUTHOR_EMAIL, DEFAULT_AUTHOR,
+                          cms.post_from_doc, cms.CMS_POST_URL)
+
+
+class ItemCache:
+    """Rendered items by key, stored in .site-cache/feed-items.json"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, CACHE_NAME)
+        self.items = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == FEED_VERSION:
+                self.items = data.get('items', {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup_page(self, path):
+        """Cached entry for the page at path if its content is unchanged"""
+        entry = self.items.get(path)
+        if not entry or 'stat' not in entry:
+            return None
+        try:
+            return entry if check_unchanged(os.path.join(self.root, path), entry) else None
+        except OSError:
+            return None
+
+    def lookup(self, key, digest):
+        entry = self.items.get(key)
+        return entry if entry and entry['hash'] == digest else None
+
+    def store(self, key, digest, date, xml, stat=None):
+        entry = {'hash': digest, 'date': date, 'xml': xml}
+        if stat is not None:
+            entry['stat'] = stat
+        self.items[key] = entry
+        return entry
+
+    def keep_only(self, keys):
+        for key in set(self.items) - set(keys):
+            del self.items[key]
+
+    def save(self):
+        write_json(self.path, {'version': FEED_VERSION, 'items': self.items})
+
+
+def post_pages(root='.'):
+    """Paths of the post pages: blog/posts/<slug>/index.html"""
+    paths = []
+    try:
+        names = sorted(os.listdir(os.path.join(root, POSTS_DIR)))
+    except FileNotFoundError:
+        return paths
+    for name in names:
+        if name.startswith(('_', '.')):
+            continue
+        path = f"{POSTS_DIR}/{name}/index.html"
+        if os.path.isfile(os.path.join(root, path)):
+            paths.append(path)
+    return paths
+
+
+class FeedReport:
+    """What a build did"""
+
+    def __init__(self):
+        self.items = []       # (date, key, xml), newest first
+        self.rendered = 0
+        self.cached = 0
+        self.skipped = []     # (key, reason)
+        self.errors = []
+        self.pages = []       # [{'name', 'items', 'changed'}]
+        self.removed = []
+
+
+def collect_items(root='.', export=None, cache=None, report=None):
+    """
+    Fill report.items from the post pages and, if given, a CMS export
+    path. Items come from cache where they are still current.
+    """
+    report = report or FeedReport()
+    cache = cache or ItemCache(root)
+    seen = []
+    slugs = set()
+
+    for path in post_pages(root):
+        slugs.add(path.split('/')[-2])
+        seen.append(path)
+        entry = cache.lookup_page(path)
+        if entry is not None:
+            report.cached += 1
+        else:
+            try:
+                with open(os.path.join(root, path), 'rb') as f:
+                    data = f.read()
+                digest = hash_bytes(data)
+                item = page_item(root, path, data.decode('utf-8', errors='replace'))
+            except Exception as e:
+                print(f"❌ Error processing {path}: {e}")
+                report.errors.append((path, str(e)))
+                continue
+            report.rendered += 1
+            if item is None:
+                # Remember non-posts too, so they are not parsed again
+                cache.store(path, digest, None, None, stat_key(os.path.join(root, path)))
+                report.skipped.append((path, 'template or noindex page'))
+                continue
+            entry = cache.store(path, digest, item[0], item[1], stat_key(os.path.join(root, path)))
+        if entry['xml'] is None:
+            report.skipped.append((path, 'template or noindex page'))
+        else:
+            report.items.append((entry['date'], path, entry['xml']))
+
+    if export:
+        for post in cms.load_posts(cms.read_export(export)):
+            key = f"cms:{post['slug']}"
+            if post['slug'] in slugs:
+                report.skipped.append((key, 'page in blog/posts'))
+                continue
+            slugs.add(post['slug'])
+            seen.append(key)
+            digest = hash_bytes(json.dumps(post, sort_keys=True).encode('utf-8'))
+            entry = cache.lookup(key, digest)
+            if entry is not None:
+                report.cached += 1
+            else:
+                item = cms_item(post)
+                report.rendered += 1
+                entry = cache.store(key, digest, *(item or (None, None)))
+            if entry['xml'] is None:
+                report.skipped.append((key, 'no publishedAt'))
+            else:
+                report.items.append((entry['date'], key, entry['xml']))
+
+    if not export:
+        # Keep the CMS items for the next run that has an export
+        seen += [key for key in cache.items if key.startswith('cms:')]
+    cache.keep_only(seen)
+    report.items.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    return report
+
+
+def page_name(number):
+    """1 -> feed.xml, 2 -> feed-2.xml, ..."""
+    return FEED_NAME if number == 1 else f"feed-{number}.xml"
+
+
+def _feed_url(number):
+    return f"{FEED_SITE_URL}/{FEED_DIR}/{page_name(number)}"
+
+
+class FeedWriter:
+    """
+    Streams cached <item> text into feed.xml, feed-2.xml, ... per_page
+    items each. The number of items is known up front, so every page can
+    carry its paging links.
+    """
+
+    FOOTER = '  </channel>\n</rss>\n'
+
+    def __init__(self, directory, total, per_page=ITEMS_PER_PAGE, last_build=None):
+        self.directory = directory
+        self.per_page = max(1, per_page)
+        self.page_count = max(1, -(-total // self.per_page))
+        self.last_build = last_build
+        self.pages = []       # [{'name', 'items', 'changed'}]
+        self._file = None
+        self._items = 0
+
+    def _header(self, number):
+        links = [f'    <atom:link href="{_feed_url(number)}" rel="self" type="application/rss+xml" />']
+        if self.page_count > 1:
+            links.append(f'    <atom:link href="{_feed_url(1)}" rel="first" />')
+            if number > 1:
+                links.append(f'    <atom:link href="{_feed_url(number - 1)}" rel="previous" />')
+            if number < self.page_count:
+                links.append(f'    <atom:link href="{_feed_url(number + 1)}" rel="next" />')
+            links.append(f'    <atom:link href="{_feed_url(self.page_count)}" rel="last" />')
+        last_build = (f'    <lastBuildDate>{rfc822(self.last_build)}</lastBuildDate>\n'
+                      if self.last_build else '')
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<?xml-stylesheet type="text/xsl" href="/{FEED_DIR}/feed.xsl"?>\n'
+                '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
+                '  <channel>\n'
+                f'    <title>{escape(CHANNEL_TITLE)}</title>\n'
+                f'    <description>{escape(CHANNEL_DESCRIPTION)}</description>\n'
+                f'    <link>{FEED_SITE_URL}/{FEED_DIR}/</link>\n'
+                + '\n'.join(links) + '\n'
+                '    <language>en-us</language>\n'
+                f'    <managingEditor>{AUTHOR_EMAIL} ({DEFAULT_AUTHOR})</managingEditor>\n'
+                f'    <webMaster>{AUTHOR_EMAIL} ({DEFAULT_AUTHOR})</webMaster>\n'
+                + last_build +
+                f'    <category>{escape(CHANNEL_CATEGORY)}</category>\n'
+                '    <generator>Creative Job Hub</generator>\n'
+                '    <image>\n'
+                f'      <url>{LOGO_URL}</url>\n'
+                f'      <title>{escape(CHANNEL_TITLE)}</title>\n'
+                f'      <link>{FEED_SITE_URL}/{FEED_DIR}/</link>\n'
+                '      <width>144</width>\n'
+                '      <height>144</height>\n'
+                '    </image>\n')
+
+    def _open(self):
+        number = len(self.pages) + 1
+        name = page_name(number)
+        self.pages.append({'name': name, 'items': 0, 'changed': False})
+        self._file = open(os.path.join(self.directory, name + '.tmp'), 'w', encoding='utf-8')
+        self._file.write(self._header(number))
+        self._items = 0
+
+    def _close_page(self):
+        self._file.write(self.FOOTER)
+        self._file.close()
+        self._file = None
+        page = self.pages[-1]
+        path = os.path.join(self.directory, page['name'])
+        page['changed'] = replace_if_changed(path + '.tmp', path)
+
+    def add(self, xml):
+        if self._file is not None and self._items >= self.per_page:
+            self._close_page()
+        if self._file is None:
+            self._open()
+        self._file.write(xml)
+        self._items += 1
+        self.pages[-1]['items'] += 1
+
+    def close(self):
+        """Finish the last page and delete pages left over from a bigger feed"""
+        if self._file is None and not self.pages:
+            self._open()  # an empty but valid feed
+        if self._file is not None:
+            self._close_page()
+        removed = []
+        for name in sorted(os.listdir(self.directory)):
+            match = _PAGE_NAME_RE.match(name)
+            if match and int(match.group(1)) > len(self.pages):
+                os.remove(os.path.join(self.directory, name))
+                removed.append(name)
+        return removed
+
+
+def build(root='.', export=None, per_page=ITEMS_PER_PAGE, use_cache=True):
+    """Collect the items and write the feed pages; returns a FeedReport"""
+    cache = ItemCache(root)
+    if not use_cache:
+        cache.items = {}
+    report = collect_items(root, export, cache)
+
+    last_build = parse_date(report.items[0][0]) if report.items else None
+    writer = FeedWriter(os.path.join(root, FEED_DIR), len(report.items), per_page, last_build)
+    for _, _, xml in report.items:
+        writer.add(xml)
+    report.removed = writer.close()
+    report.pages = writer.pages
+    cache.save()
+    return report
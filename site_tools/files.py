@@ -0,0 +1,54 @@
+"""
+Find the HTML pages the maintenance scripts work on.
+"""
+import os
+from pathlib import Path
+
+# Directories that never contain site pages
+SKIP_DIRS = {
+    '.git',
+    'node_modules',
+    '__pycache__',
+    'creative-job-hub-cms',
+}
+
+
+def iter_html_files(root='.', skip_dirs=SKIP_DIRS, skip_paths=()):
+    """
+    Yield every HTML file under root in sorted order, pruning skipped dirs.
+    skip_paths holds repo-relative directories ('admin', 'blog/drafts') to
+    prune as well.
+    """
+    skip_paths = {path.strip('/') for path in skip_paths}
+    for dirpath, dirs, files in os.walk(root):
+        # Prune in place so os.walk never descends into skipped directories
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs and not d.startswith('.'))
+        if skip_paths:
+            dirs[:] = [d for d in dirs
+                       if rel_path(os.path.join(dirpath, d), root) not in skip_paths]
+        for name in sorted(files):
+            if name.endswith('.html'):
+                yield Path(dirpath) / name
+
+
+def rel_path(path, root='.'):
+    """Return path relative to root using forward slashes (for filters/reports)"""
+    return Path(os.path.relpath(path, root)).as_posix()
+
+
+def iter_files(root='.', suffixes=None, skip_dirs=SKIP_DIRS, skip_paths=()):
+    """
+    Yield the path of every site file under root whose name ends with one
+    of suffixes (every file when None), pruned like iter_html_files().
+    Dotfiles are skipped.
+    """
+    skip_paths = {path.strip('/') for path in skip_paths}
+    suffixes = tuple(suffixes) if suffixes is not None else None
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in skip_dirs and not d.startswith('.'))
+        if skip_paths:
+            dirs[:] = [d for d in dirs
+                       if rel_path(os.path.join(dirpath, d), root) not in skip_paths]
+        for name in sorted(files):
+            if not name.startswith('.') and (suffixes is None or name.lower().endswith(suffixes)):
+                yield os.path.join(dirpath, name)
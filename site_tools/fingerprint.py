@@ -0,0 +1,175 @@
+"""
+Content-hashed asset names instead of hand-bumped ?v=N query strings.
+
+Each asset (site.css, site.min.css, header.js, the other assets/*.js) is
+copied to a name that contains a hash of its bytes, e.g.
+assets/site.css -> assets/site.3f9a1c02be.css. assets/asset-manifest.json
+records the mapping, and a rewrite rule points every page at the current
+names. A page only changes when an asset it references changes, and the
+fingerprinted files can be served with an immutable Cache-Control header.
+"""
+import glob
+import json
+import os
+import re
+
+from site_tools.cache import hash_bytes
+from site_tools.rewrite import Rule
+from site_tools.writes import write_atomic, write_if_changed
+
+# Assets that get fingerprinted (globs relative to the site root)
+ASSET_GLOBS = (
+    'assets/site.css',
+    'assets/site.min.css',
+    'assets/site.*.min.css',  # per-group stylesheets from build-css.py --groups
+    'assets/*.js',
+)
+
+MANIFEST_PATH = 'assets/asset-manifest.json'
+HASH_LENGTH = 10
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# assets/site.3f9a1c02be.css -> ('assets/site', '3f9a1c02be', 'css')
+_FINGERPRINTED_RE = re.compile(rf'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{HASH_LENGTH}}})\.(?P<ext>css|js)$')
+
+
+def is_fingerprinted(path):
+    return _FINGERPRINTED_RE.match(path) is not None
+
+
+def fingerprinted_name(path, data):
+    """assets/site.css + bytes -> assets/site.<hash>.css"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{hash_bytes(data)[:HASH_LENGTH]}{ext}"
+
+
+def find_assets(root='.'):
+    """Repo-relative paths of every source asset to fingerprint, sorted"""
+    found = set()
+    for pattern in ASSET_GLOBS:
+        for path in glob.glob(os.path.join(root, pattern)):
+            rel = os.path.relpath(path, root).replace(os.sep, '/')
+            if not is_fingerprinted(rel):
+                found.add(rel)
+    return sorted(found)
+
+
+def load_manifest(root='.'):
+    try:
+        with open(os.path.join(root, MANIFEST_PATH), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build(root='.', dry_run=False):
+    """
+    Fingerprint every asset. Writes new hashed copies, removes stale ones
+    and saves the manifest. Returns (manifest, changed source paths,
+    removed stale copies).
+    """
+    previous = load_manifest(root)
+    manifest = {}
+    changed = []
+    for source in find_assets(root):
+        with open(os.path.join(root, source), 'rb') as f:
+            data = f.read()
+        target = fingerprinted_name(source, data)
+        manifest[source] = target
+        if previous.get(source) != target:
+            changed.append(source)
+        target_path = os.path.join(root, target)
+        if not dry_run and not os.path.exists(target_path):
+            with open(target_path, 'wb') as f:
+                f.write(data)
+
+    # Hashed copies that no source maps to any more
+    current = set(manifest.values())
+    stale = []
+    for path in glob.glob(os.path.join(root, 'assets', '*.*.*')):
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        match = _FINGERPRINTED_RE.match(rel)
+        if match and rel not in current and f"{match['stem']}.{match['ext']}" in manifest:
+            stale.append(rel)
+            if not dry_run:
+                os.remove(path)
+
+    if not dry_run:
+        write_if_changed(os.path.join(root, MANIFEST_PATH),
+                         json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    return manifest, changed, sorted(stale)
+
+
+class AssetReferenceRewriter:
+    """Rule replacement that maps an asset reference to its fingerprinted name"""
+
+    def __init__(self, manifest):
+        # 'site.min.css' -> 'site.min.3f9a1c02be.css' (names relative to assets/)
+        self.names = {source[len('assets/'):]: target[len('assets/'):]
+                      for source, target in manifest.items()}
+
+    def __call__(self, match):
+        name = f"{match['name']}.{match['ext']}"
+        target = self.names.get(name)
+        if target is None:
+            return match.group(0)
+        return f"{match['prefix']}{target}"
+
+    def __repr__(self):
+        # Part of the rule version, so a new manifest invalidates cached pages
+        return f"AssetReferenceRewriter({sorted(self.names.items())!r})"
+
+
+def reference_rule(manifest):
+    """
+    Rewrite rule for every reference to a manifest asset: plain
+    (/assets/site.css), versioned (?v=31) or previously fingerprinted.
+    """
+    names = sorted((source[len('assets/'):].rsplit('.', 1)[0] for source in manifest),
+                   key=len, reverse=True)
+    if not names:
+        names = [r'(?!)']  # matches nothing
+    pattern = (
+        r'(?P<prefix>(?:https?://(?:www\.)?creativejobhub\.com/|(?<![\w.-])(?:\.\./)*/?)assets/)'
+        rf"(?P<name>{'|'.join(re.escape(name) for name in names)})"
+        rf'(?:\.[0-9a-f]{{{HASH_LENGTH}}})?\.(?P<ext>css|js)'
+        r'(?:\?v=[\w.-]*)?(?![\w.-])'
+    )
+    return Rule(
+        'asset-fingerprint',
+        pattern,
+        AssetReferenceRewriter(manifest),
+        description='asset references -> content-hashed names',
+    )
+
+
+def update_vercel_headers(manifest, vercel_path='vercel.json', dry_run=False):
+    """
+    Replace the immutable Cache-Control entries in vercel.json with one per
+    fingerprinted asset. Returns True if the file changed.
+    """
+    with open(vercel_path, 'r', encoding='utf-8') as f:
+        original = f.read()
+    config = json.loads(original)
+
+    headers = [entry for entry in config.get('headers', [])
+               if not is_fingerprinted(entry.get('source', '').lstrip('/'))]
+    immutable = [
+        {
+            'source': f"/{target}",
+            'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE_CACHE_CONTROL}],
+        }
+        for target in sorted(manifest.values())
+    ]
+    # Keep the site-wide catch-all rule last
+    catch_all = [i for i, entry in enumerate(headers) if entry.get('source') == '/(.*)']
+    insert_at = catch_all[0] if catch_all else len(headers)
+    config['headers'] = headers[:insert_at] + immutable + headers[insert_at:]
+
+    updated = json.dumps(config, indent=2, ensure_ascii=False) + '\n'
+    if updated == original:
+        return False
+    if not dry_run:
+        write_atomic(vercel_path, updated.encode('utf-8'))
+    return True
@@ -0,0 +1,203 @@
+"""
+Inline assets/header.html into every page at build time.
+
+Pages used to carry an empty <div id="site-header"></div> that header.js
+filled by fetching header.html on every page view. inline_header() swaps
+that mount for the header itself, between markers:
+
+  <!-- site-header:start 3f9a1c02be4d -->
+  <header class="site-header" data-inlined>
+  ...
+  <!-- site-header:end -->
+
+The header is rendered per page with the link to the current page marked
+active, the way header.js did it in the browser: only .nav-link anchors
+(not dropdown toggles), compared by path with index.html dropped.
+
+The digest in the start marker covers header.html, the active link and
+the rendering code, so a page whose block is already current is left
+alone and an edit to header.html re-inlines every page on the next run.
+header.html stays the single source of truth; edit it and re-run
+inline-header.py, never the copies in the pages.
+"""
+import os
+import re
+from collections import Counter
+from functools import partial
+from urllib.parse import urljoin, urlsplit
+
+from site_tools import rewrite
+from site_tools.cache import hash_bytes, version_of
+from site_tools.files import iter_html_files, rel_path
+from site_tools.parallel import run_parallel
+from site_tools.rules import HEADER_VERSION_RULE
+from site_tools.writes import TextFile
+
+HEADER_SOURCE = 'assets/header.html'
+
+# Pages under these directories are fragments or admin tools, not site pages
+SKIP_PATHS = ('assets', 'admin')
+
+MOUNT_RE = re.compile(r'<div id="site-header">\s*</div>')
+BLOCK_RE = re.compile(r'<!-- site-header:start (?P<digest>[0-9a-f]+) -->.*?<!-- site-header:end -->',
+                      re.DOTALL)
+_HEADER_TAG_RE = re.compile(r'<header class="site-header"')
+_NAV_LINK_RE = re.compile(r'<a\b[^>]*\bclass="(?P<class>[^"]*)"[^>]*>')
+_HREF_RE = re.compile(r'\bhref="([^"]*)"')
+
+# Inlined pages need a header.js that knows not to fetch the header again
+HEADER_JS_RULESET = rewrite.RuleSet([HEADER_VERSION_RULE])
+
+
+def page_path(path):
+    """URL path of a page as header.js saw it: /pricing/index.html -> /pricing/"""
+    path = '/' + path.lstrip('/')
+    return path[:-len('index.html')] if path.endswith('/index.html') else path
+
+
+def _link_path(href):
+    """Path an href points at, resolved like new URL(href, location.origin)"""
+    path = urlsplit(urljoin('/', href)).path
+    return path[:-len('index.html')] if path.endswith('index.html') else path
+
+
+class Header:
+    """header.html plus the per-page renderings of it"""
+
+    def __init__(self, source):
+        self.source = source
+        self.base = hash_bytes(source.encode('utf-8') + INLINE_VERSION.encode())
+        # (start, end, link path) of every anchor header.js would mark active
+        self.links = []
+        for match in _NAV_LINK_RE.finditer(source):
+            classes = match.group('class').split()
+            href = _HREF_RE.search(match.group(0))
+            if 'nav-link' in classes and 'dropdown-toggle' not in classes and href:
+                self.links.append((match.start('class'), match.end('class'),
+                                   _link_path(href.group(1))))
+        self._blocks = {}
+
+    @classmethod
+    def read(cls, root='.'):
+        with open(os.path.join(root, HEADER_SOURCE), 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def active_links(self, path):
+        """Indexes of the links marked active on the page at URL path"""
+        return tuple(i for i, (_, _, link) in enumerate(self.links) if link == path)
+
+    def block(self, path):
+        """(digest, marked-up block) for the page at URL path"""
+        active = self.active_links(path)
+        if active not in self._blocks:
+            html = self.source
+            for i in reversed(active):
+                start, end, _ = self.links[i]
+                html = html[:start] + html[start:end] + ' active' + html[end:]
+            html = _HEADER_TAG_RE.sub(r'\g<0> data-inlined', html.strip(), count=1)
+            digest = hash_bytes(f"{self.base}:{active}".encode())[:12]
+            self._blocks[active] = (digest, f"<!-- site-header:start {digest} -->\n"
+                                            f"{html}\n<!-- site-header:end -->")
+        return self._blocks[active]
+
+
+def inline_header(content, header, path):
+    """
+    Return (new content, status) for the page at site path (pricing/index.html).
+    status is 'inlined' (mount replaced), 'updated' (stale block replaced),
+    'current' or None for pages without a mount or block.
+    """
+    digest, block = header.block(page_path(path))
+    existing = BLOCK_RE.search(content)
+    if existing:
+        if existing.group('digest') == digest:
+            return content, 'current'
+        status = 'updated'
+        new_content = content[:existing.start()] + block + content[existing.end():]
+    else:
+        mount = MOUNT_RE.search(content)
+        if not mount:
+            return content, None
+        status = 'inlined'
+        new_content = content[:mount.start()] + block + content[mount.end():]
+    new_content, _ = HEADER_JS_RULESET.apply(new_content, path)
+    return new_content, status
+
+
+INLINE_VERSION = version_of(page_path, _link_path, Header.__init__, Header.active_links,
+                            Header.block, inline_header, MOUNT_RE.pattern, BLOCK_RE.pattern)
+
+
+class InlineReport:
+    """What a run did, per status"""
+
+    def __init__(self):
+        self.files_scanned = 0
+        self.files_cached = 0
+        self.statuses = Counter()
+        self.errors = []
+
+    def print_summary(self, dry_run=False):
+        print(f"\n{'=' * 50}")
+        print(f"Scanned {self.files_scanned} files ({self.files_cached} unchanged since last run)")
+        would = 'would be ' if dry_run else ''
+        print(f"  🧩 {self.statuses['inlined']} mounts {would}replaced by the header")
+        print(f"  🔁 {self.statuses['updated']} stale headers {would}re-inlined")
+        print(f"  ✓ {self.statuses['current']} headers already current")
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} file(s) could not be processed")
+
+
+def _inline_one(header, root, dry_run, diff, file_path):
+    """run_parallel() worker: returns (status, content hash, diff, error)"""
+    patch = ''
+    try:
+        page = TextFile.read(file_path)
+        path = rel_path(file_path, root)
+        new_content, status = inline_header(page.text, header, path)
+        if status in ('inlined', 'updated'):
+            if diff:
+                patch = page.diff(new_content, path)
+            page.write(new_content, dry_run=dry_run)
+            verb = {'inlined': 'Inlined', 'updated': 'Re-inlined'}[status]
+            print(f"✓ {'Would be ' + verb.lower() if dry_run else verb}: {path}")
+    except Exception as e:
+        print(f"❌ Error processing {file_path}: {e}")
+        return None, None, '', str(e)
+    return status, hash_bytes(page.data), patch, None
+
+
+def run(root='.', files=None, dry_run=False, workers=1, manifest=None, diffs=None):
+    """
+    Inline the header into every page under root (or the given files).
+    With a cache.Manifest, pages already inlined with the current header
+    are skipped without being read; with a writes.DiffSet, every change is
+    added to it as a unified diff.
+    """
+    header = Header.read(root)
+    check = {'header-inline': header.base}
+    report = InlineReport()
+    if files is None:
+        files = iter_html_files(root, skip_paths=SKIP_PATHS)
+    files = list(files)
+    report.files_scanned = len(files)
+    if manifest is not None:
+        stale = [file_path for file_path in files if not manifest.is_fresh(file_path, check)]
+        report.files_cached = len(files) - len(stale)
+        files = stale
+
+    worker = partial(_inline_one, header, root, dry_run, diffs is not None)
+    for file_path, (status, digest, patch, error) in zip(files, run_parallel(worker, files, workers)):
+        if error is not None:
+            report.errors.append((file_path, error))
+            continue
+        if diffs is not None:
+            diffs.add(patch)
+        if status:
+            report.statuses[status] += 1
+        if manifest is not None and not dry_run:
+            manifest.record_hash(file_path, digest, check)
+
+    if manifest is not None:
+        manifest.save()
+    return report
@@ -0,0 +1,243 @@
+"""
+Persistent index of <head> metadata for every page.
+
+HeadIndex.refresh() extracts title, description, canonical, OG/Twitter images, asset
+versions and script order from each page once and stores them in
+.site-cache/head-index.json. Later refreshes only re-extract pages whose
+size/mtime (and then content hash) changed, so audits can query the index
+instead of regex-scanning the HTML every time:
+
+    index = HeadIndex().refresh()
+    index.where(title_before_gtm=False)
+    index.canonical_mismatches(sitemap_urls)
+"""
+import html
+import json
+import os
+import re
+
+from site_tools.cache import (CACHE_DIR, check_unchanged, hash_bytes, stat_key,
+                              version_of, write_json)
+from site_tools.files import iter_html_files, rel_path
+from site_tools.urls import is_file_url, url_to_file_path
+
+INDEX_NAME = 'head-index.json'
+
+# Fields stored per page, in display order
+FIELDS = (
+    'title',
+    'description',
+    'canonical',
+    'robots',
+    'og_image',
+    'twitter_image',
+    'css_version',
+    'header_js_version',
+    'scripts',
+    'has_gtm',
+    'title_before_gtm',
+)
+
+_HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+_TAG_RE = re.compile(
+    r'<!--.*?-->'
+    r'|<title\b[^>]*>(?P<title>.*?)</title\s*>'
+    r'|<(?P<tag>meta|link|script)\b(?P<attrs>[^>]*)>',
+    re.IGNORECASE | re.DOTALL,
+)
+_ATTR_RE = re.compile(r'''([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+_SCRIPT_BODY_RE = re.compile(r'(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+_CSS_VERSION_RE = re.compile(r'/site(?:\.min)?\.css\?v=(\d+)')
+_HEADER_JS_VERSION_RE = re.compile(r'/header\.js\?v=(\d+)')
+_GTM_MARKER = '<!-- Google Tag Manager -->'
+
+
+def parse_attrs(attr_text):
+    """Parse a tag's attribute string into a lowercase-keyed dict"""
+    attrs = {}
+    for match in _ATTR_RE.finditer(attr_text):
+        value = next((v for v in match.groups()[1:] if v is not None), '')
+        attrs[match.group(1).lower()] = html.unescape(value)
+    return attrs
+
+
+def _inline_script_kind(attrs, body):
+    """Short label for an inline script so script order stays readable"""
+    script_type = attrs.get('type', '').lower()
+    if script_type == 'application/ld+json':
+        return 'inline:ld+json'
+    if 'googletagmanager.com/gtm.js' in body:
+        return 'inline:gtm'
+    if 'gtag(' in body:
+        return 'inline:gtag'
+    return 'inline'
+
+
+def extract_head_metadata(content):
+    """Extract the indexed fields from a page's HTML"""
+    head_end = _HEAD_END_RE.search(content)
+    head = content[:head_end.start()] if head_end else content
+
+    record = dict.fromkeys(FIELDS)
+    scripts = []
+    title_pos = gtm_pos = None
+
+    for match in _TAG_RE.finditer(head):
+        if match.group('title') is not None:
+            if record['title'] is None:
+                record['title'] = html.unescape(match.group('title').strip())
+                title_pos = match.start()
+            continue
+        tag = (match.group('tag') or '').lower()
+        if not tag:
+            # Comment: only the GTM marker matters for ordering
+            if gtm_pos is None and match.group(0).startswith(_GTM_MARKER):
+                gtm_pos = match.start()
+            continue
+        attrs = parse_attrs(match.group('attrs'))
+
+        if tag == 'meta':
+            key = (attrs.get('name') or attrs.get('property') or '').lower()
+            if key == 'description' and record['description'] is None:
+                record['description'] = attrs.get('content')
+            elif key == 'robots' and record['robots'] is None:
+                record['robots'] = attrs.get('content')
+            elif key == 'og:image' and record['og_image'] is None:
+                record['og_image'] = attrs.get('content')
+            elif key == 'twitter:image' and record['twitter_image'] is None:
+                record['twitter_image'] = attrs.get('content')
+        elif tag == 'link':
+            if attrs.get('rel', '').lower() == 'canonical' and record['canonical'] is None:
+                record['canonical'] = attrs.get('href')
+        elif tag == 'script':
+            if 'src' in attrs:
+                scripts.append(attrs['src'])
+                if gtm_pos is None and 'googletagmanager.com/gtm.js' in attrs['src']:
+                    gtm_pos = match.start()
+            else:
+                body = _SCRIPT_BODY_RE.match(head, match.end())
+                kind = _inline_script_kind(attrs, body.group(1) if body else '')
+                scripts.append(kind)
+                if gtm_pos is None and kind == 'inline:gtm':
+                    gtm_pos = match.start()
+
+    # Asset versions can be referenced anywhere (header.js loads from <body>)
+    css = _CSS_VERSION_RE.search(content)
+    header_js = _HEADER_JS_VERSION_RE.search(content)
+    record['css_version'] = int(css.group(1)) if css else None
+    record['header_js_version'] = int(header_js.group(1)) if header_js else None
+    record['scripts'] = scripts
+    record['has_gtm'] = gtm_pos is not None
+    if gtm_pos is not None:
+        record['title_before_gtm'] = title_pos is not None and title_pos < gtm_pos
+    return record
+
+
+# Stored entries are re-extracted whenever the extractor changes
+EXTRACTOR_VERSION = version_of(extract_head_metadata, _inline_script_kind, parse_attrs,
+                               _TAG_RE.pattern, _ATTR_RE.pattern, FIELDS)
+
+
+class HeadIndex:
+    """The on-disk head metadata index plus its query API"""
+
+    def __init__(self, root='.', path=None):
+        self.root = root
+        self.path = path or os.path.join(root, CACHE_DIR, INDEX_NAME)
+        self.pages = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == EXTRACTOR_VERSION:
+            self.pages = data.get('pages', {})
+
+    def save(self):
+        write_json(self.path, {'version': EXTRACTOR_VERSION, 'pages': self.pages})
+
+    def refresh(self, files=None):
+        """
+        Bring the index up to date with the tree (or just the given files).
+        Returns self; self.refreshed lists the pages that were re-extracted.
+        """
+        full_scan = files is None
+        if full_scan:
+            files = iter_html_files(self.root)
+
+        seen = set()
+        self.refreshed = []
+        changed = False
+        for file_path in files:
+            key = rel_path(file_path, self.root)
+            seen.add(key)
+            entry = self.pages.get(key)
+            try:
+                if entry is not None:
+                    stat = entry['stat']
+                    if check_unchanged(file_path, entry):
+                        changed = changed or entry['stat'] is not stat
+                        continue
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                stat = stat_key(file_path)
+            except OSError:
+                changed = changed or self.pages.pop(key, None) is not None
+                continue
+            head = extract_head_metadata(data.decode('utf-8', errors='replace'))
+            self.pages[key] = {'stat': stat, 'hash': hash_bytes(data), 'head': head}
+            self.refreshed.append(key)
+            changed = True
+
+        if full_scan:
+            # Pages deleted since the last run drop out of the index
+            for key in set(self.pages) - seen:
+                del self.pages[key]
+                changed = True
+        if changed:
+            self.save()
+        return self
+
+    def get(self, path):
+        """Metadata dict for one page, or None if it isn't indexed"""
+        entry = self.pages.get(path)
+        return entry['head'] if entry else None
+
+    def items(self):
+        """(path, metadata) pairs in path order"""
+        return [(path, self.pages[path]['head']) for path in sorted(self.pages)]
+
+    def where(self, predicate=None, **equals):
+        """
+        Pages matching a predicate(path, metadata) and/or field=value filters,
+        e.g. where(title_before_gtm=False) or where(css_version=30).
+        """
+        unknown = set(equals) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+        return [
+            (path, head) for path, head in self.items()
+            if all(head.get(field) == value for field, value in equals.items())
+            and (predicate is None or predicate(path, head))
+        ]
+
+    def canonical_mismatches(self, urls):
+        """
+        Compare sitemap URLs with indexed canonicals.
+        Returns (url, path, canonical) for pages whose canonical differs
+        (canonical is None when the page has no tag, path is None when the
+        page is not on disk). URLs with a query string have no file of their
+        own and are skipped.
+        """
+        mismatches = []
+        for url in filter(is_file_url, urls):
+            path = url_to_file_path(url)
+            head = self.get(path)
+            if head is None:
+                mismatches.append((url, None, None))
+            elif head['canonical'] != url:
+                mismatches.append((url, path, head['canonical']))
+        return mismatches
@@ -0,0 +1,426 @@
+"""
+Reorder the elements of a page's <head> into a declarative order.
+
+HEAD_ORDER lists the element classes top to bottom: meta charset,
+viewport, title, description, canonical, preconnects, CSS, everything
+else, then third-party scripts. tokenize_head() splits the head into
+elements in one linear scan (raw-text elements like <script> and <style>
+are skipped with a single search for their end tag), so there is no
+backtracking however the markup is spaced.
+
+Executable scripts never change their order relative to each other: a
+local script after a CDN library may depend on it, so each script ranks
+at least as late as the script before it.
+
+Elements that are already in order stay where they are, blank lines and
+all; only the rest are lifted out and re-inserted. That is the longest
+run of elements whose classes already ascend, so the diff is as small as
+the order allows. Comments travel with the element they label, and an
+"End ..." comment stays with the element it closes.
+
+reorder-head.py runs this over every page; fix-feature-titles.py,
+fix-industry-pages.py and fix-affordable-page.py are kept as narrower
+entry points that only move the TITLE_ORDER elements to the top.
+"""
+import re
+from bisect import bisect_right
+from collections import Counter
+from functools import partial
+
+from site_tools.cache import hash_bytes, version_of
+from site_tools.files import iter_html_files, rel_path
+from site_tools.headindex import parse_attrs
+from site_tools.parallel import run_parallel
+from site_tools.urls import SITE_HOSTS
+from site_tools.writes import TextFile
+
+_HEAD_START_RE = re.compile(r'<head\b[^>]*>', re.IGNORECASE)
+_HEAD_END_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+# A start tag with quoted attribute values; unambiguous, so linear
+_START_TAG_RE = re.compile(r'''<([a-zA-Z][\w-]*)([^>"']*(?:(?:"[^"]*"|'[^']*')[^>"']*)*)>''')
+_RAW_TEXT_ELEMENTS = ('script', 'style', 'title', 'noscript', 'template')
+_END_TAG_RES = {tag: re.compile(rf'</{tag}\s*>', re.IGNORECASE) for tag in _RAW_TEXT_ELEMENTS}
+
+# Inline scripts that belong to (or call into) a third-party tag
+THIRD_PARTY_MARKERS = ('googletagmanager.com', 'gtag(', 'dataLayer', 'hs-scripts.com',
+                       'hsforms', 'hotjar', 'fbq(')
+
+
+class Element:
+    """One top-level head token: a tag (with its raw-text body) or a comment"""
+
+    def __init__(self, start, end, tag, attrs, body):
+        self.start = start
+        self.end = end
+        self.tag = tag          # lowercase tag name, '!--' for comments, '#text' for text
+        self.attrs = attrs
+        self.body = body
+
+
+def tokenize_head(content, start, end):
+    """Yield the top-level elements of content[start:end] in a single pass"""
+    pos = start
+    while pos < end:
+        lt = content.find('<', pos, end)
+        if lt < 0:
+            lt = end
+        if content[pos:lt].strip():
+            yield Element(pos, lt, '#text', {}, content[pos:lt])
+        if lt >= end:
+            return
+
+        if content.startswith('<!--', lt):
+            close = content.find('-->', lt + 4, end)
+            close = end if close < 0 else close + 3
+            yield Element(lt, close, '!--', {}, content[lt + 4:close - 3])
+            pos = close
+            continue
+
+        match = _START_TAG_RE.match(content, lt, end)
+        if not match:
+            # Stray '<' or an end tag: keep it as text
+            gt = content.find('>', lt, end)
+            close = end if gt < 0 else gt + 1
+            yield Element(lt, close, '#text', {}, content[lt:close])
+            pos = close
+            continue
+
+        tag = match.group(1).lower()
+        attrs = parse_attrs(match.group(2))
+        close = match.end()
+        body = ''
+        if tag in _RAW_TEXT_ELEMENTS and not match.group(0).endswith('/>'):
+            end_tag = _END_TAG_RES[tag].search(content, close, end)
+            if end_tag:
+                body = content[close:end_tag.start()]
+                close = end_tag.end()
+        yield Element(lt, close, tag, attrs, body)
+        pos = close
+
+
+def _is_third_party_url(url):
+    url = url.strip().lower()
+    if url.startswith('//'):
+        url = 'https:' + url
+    if not url.startswith(('http://', 'https://')):
+        return False
+    host = url.split('/', 3)[2]
+    return host not in SITE_HOSTS
+
+
+def _rels(element):
+    return element.attrs.get('rel', '').lower().split()
+
+
+def _is_third_party(element):
+    if element.tag == 'script':
+        if 'src' in element.attrs:
+            return _is_third_party_url(element.attrs['src'])
+        if element.attrs.get('type', '').lower() == 'application/ld+json':
+            return False
+        return any(marker in element.body for marker in THIRD_PARTY_MARKERS)
+    if element.tag == 'noscript':
+        return 'googletagmanager.com' in element.body
+    return False
+
+
+def _is_charset(e):
+    return e.tag == 'meta' and 'charset' in e.attrs
+
+
+def _is_viewport(e):
+    return e.tag == 'meta' and e.attrs.get('name', '').lower() == 'viewport'
+
+
+def _is_title(e):
+    return e.tag == 'title'
+
+
+def _is_description(e):
+    return e.tag == 'meta' and e.attrs.get('name', '').lower() == 'description'
+
+
+def _is_canonical(e):
+    return e.tag == 'link' and 'canonical' in _rels(e)
+
+
+def _is_preconnect(e):
+    return e.tag == 'link' and bool({'preconnect', 'dns-prefetch'} & set(_rels(e)))
+
+
+def _is_css(e):
+    return e.tag == 'style' or (e.tag == 'link' and 'stylesheet' in _rels(e))
+
+
+# Top-to-bottom order of a <head>. The class with a None test collects
+# every element the other tests do not claim. Tests are module-level
+# functions so an order can be sent to worker processes.
+HEAD_ORDER = (
+    ('charset', _is_charset),
+    ('viewport', _is_viewport),
+    ('title', _is_title),
+    ('description', _is_description),
+    ('canonical', _is_canonical),
+    ('preconnect', _is_preconnect),
+    ('css', _is_css),
+    ('other', None),
+    ('third-party', _is_third_party),
+)
+
+# Only charset, viewport, title, description and canonical move; the rest
+# of the head keeps its order
+TITLE_ORDER = HEAD_ORDER[:5] + (('other', None),)
+
+# <script type> values browsers execute
+_SCRIPT_TYPES = ('', 'text/javascript', 'application/javascript', 'module')
+
+
+def classify(element, order=HEAD_ORDER):
+    """Index into order of the first class whose test claims element"""
+    fallback = None
+    for rank, (_, test) in enumerate(order):
+        if test is None:
+            fallback = rank
+        elif test(element):
+            return rank
+    return fallback if fallback is not None else len(order)
+
+
+def _is_executable_script(element):
+    return (element.tag == 'script'
+            and element.attrs.get('type', '').strip().lower() in _SCRIPT_TYPES)
+
+
+def _script_ranks(units, ranks):
+    """Raise each executable script's rank to at least the previous script's"""
+    latest = None
+    ranks = list(ranks)
+    for i, unit in enumerate(units):
+        if _is_executable_script(unit.main):
+            if latest is not None and ranks[i] < latest:
+                ranks[i] = latest
+            latest = ranks[i]
+    return ranks
+
+
+def describe(element):
+    """Short label for reports: <title>, <link rel=canonical>, inline:gtm, ..."""
+    if element.tag == 'script':
+        if 'src' in element.attrs:
+            return f"<script src={element.attrs['src'][:60]}>"
+        if 'googletagmanager.com/gtm.js' in element.body:
+            return 'inline:gtm'
+        if 'gtag(' in element.body:
+            return 'inline:gtag'
+        return 'inline script'
+    if element.tag == 'meta':
+        for key in ('charset', 'name', 'property', 'http-equiv'):
+            if key in element.attrs:
+                return f"<meta {key}={element.attrs[key]}>" if key != 'charset' else '<meta charset>'
+    if element.tag == 'link':
+        return f"<link rel={element.attrs.get('rel', '')}>"
+    if element.tag == '!--':
+        return f"<!-- {element.body.strip()[:40]} -->"
+    if element.tag == '#text':
+        return 'text'
+    return f"<{element.tag}>"
+
+
+class Unit:
+    """An element plus the comments that label or close it; moved as one"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.start = elements[0].start
+        self.end = elements[-1].end
+        main = next((e for e in elements if e.tag != '!--'), elements[0])
+        self.main = main
+
+
+def _units(elements):
+    units = []
+    pending = []
+    for element in elements:
+        if element.tag == '!--':
+            if element.body.strip().lower().startswith('end') and units and not pending:
+                # <!-- End Google Tag Manager --> closes the previous unit
+                units[-1] = Unit(units[-1].elements + [element])
+            else:
+                pending.append(element)
+            continue
+        units.append(Unit(pending + [element]))
+        pending = []
+    # Comments after the last element label nothing in the head; they stay
+    # put as part of the text before </head>
+    return units
+
+
+def _kept(ranks):
+    """Indexes of the longest non-decreasing subsequence of ranks"""
+    tails = []       # tails[k]: index ending the best run of length k + 1
+    tail_ranks = []
+    previous = [None] * len(ranks)
+    for i, rank in enumerate(ranks):
+        k = bisect_right(tail_ranks, rank)
+        previous[i] = tails[k - 1] if k else None
+        if k == len(tails):
+            tails.append(i)
+            tail_ranks.append(rank)
+        else:
+            tails[k] = i
+            tail_ranks[k] = rank
+    kept = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        kept.add(i)
+        i = previous[i]
+    return kept
+
+
+def _indent(content, pos):
+    line_start = content.rfind('\n', 0, pos) + 1
+    prefix = content[line_start:pos]
+    return prefix if not prefix.strip() else ''
+
+
+def reorder_head(content, order=HEAD_ORDER):
+    """
+    Return (new content, moves). moves lists (label, class name) for every
+    element that had to move; content is returned unchanged when the head
+    is already in order or missing.
+    """
+    head_start = _HEAD_START_RE.search(content)
+    if not head_start:
+        return content, []
+    head_end = _HEAD_END_RE.search(content, head_start.end())
+    end = head_end.start() if head_end else len(content)
+
+    units = _units(list(tokenize_head(content, head_start.end(), end)))
+    ranks = _script_ranks(units, [classify(unit.main, order) for unit in units])
+    kept = _kept(ranks)
+    if len(kept) == len(units):
+        return content, []
+
+    # Each moved unit goes right after the last kept unit ranked at or below it
+    kept_indexes = sorted(kept)
+    kept_ranks = [ranks[i] for i in kept_indexes]
+    kept_scripts = [k for k, i in enumerate(kept_indexes) if _is_executable_script(units[i].main)]
+    inserted = {}
+    moves = []
+    for i, unit in enumerate(units):
+        if i in kept:
+            continue
+        slot = bisect_right(kept_ranks, ranks[i]) - 1
+        if _is_executable_script(unit.main):
+            # Stay ahead of the next kept script (ranked the same or later)
+            later = next((k for k in kept_scripts if kept_indexes[k] > i), None)
+            if later is not None:
+                slot = min(slot, later - 1)
+        anchor = kept_indexes[slot] if slot >= 0 else None
+        inserted.setdefault(anchor, []).append((ranks[i], i))
+        moves.append((describe(unit.main), order[ranks[i]][0] if ranks[i] < len(order) else 'other'))
+
+    def placed(entries):
+        for _, i in sorted(entries):
+            unit = units[i]
+            yield '\n' + _indent(content, unit.start) + content[unit.start:unit.end]
+
+    parts = [content[:head_start.end()]]
+    parts.extend(placed(inserted.get(None, ())))
+    for i in kept_indexes:
+        unit = units[i]
+        # A kept unit keeps its own leading whitespace; moved units take
+        # theirs with them
+        previous_end = units[i - 1].end if i else head_start.end()
+        parts.append(content[previous_end:unit.end])
+        parts.extend(placed(inserted.get(i, ())))
+    parts.append(content[units[-1].end:])
+    return ''.join(parts), moves
+
+
+def order_check(order=HEAD_ORDER):
+    """Manifest check: pages already in order are skipped until this code or order changes"""
+    return {'head-order': version_of(
+        reorder_head, tokenize_head, classify, _units, _kept, _is_third_party,
+        _script_ranks, _is_executable_script, _SCRIPT_TYPES, THIRD_PARTY_MARKERS,
+        *(part for entry in order for part in entry))}
+
+
+HEAD_ORDER_CHECK = order_check(HEAD_ORDER)
+
+
+class ReorderReport:
+    """What a run moved, per file and per element class"""
+
+    def __init__(self):
+        self.files_scanned = 0
+        self.files_cached = 0
+        self.files_changed = 0
+        self.moves = Counter()
+        self.errors = []
+
+    def print_summary(self):
+        print(f"\n{'=' * 50}")
+        print(f"Scanned {self.files_scanned} files, reordered {self.files_changed}"
+              f" ({self.files_cached} unchanged since last run)")
+        for name, count in sorted(self.moves.items(), key=lambda item: -item[1]):
+            print(f"  {name:<14} {count:>5} moved")
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} file(s) could not be processed")
+
+
+def _reorder_one(root, dry_run, diff, order, file_path):
+    """run_parallel() worker: returns (moves, content hash, diff, error)"""
+    patch = ''
+    try:
+        page = TextFile.read(file_path)
+        path = rel_path(file_path, root)
+        new_content, moves = reorder_head(page.text, order)
+        if moves:
+            if diff:
+                patch = page.diff(new_content, path)
+            page.write(new_content, dry_run=dry_run)
+            print(f"✓ {'Would reorder' if dry_run else 'Reordered'}: {path}")
+            for label, name in moves:
+                print(f"    {label} -> {name}")
+    except Exception as e:
+        print(f"❌ Error processing {file_path}: {e}")
+        return None, None, '', str(e)
+    return moves, hash_bytes(page.data), patch, None
+
+
+def run(root='.', files=None, dry_run=False, workers=1, manifest=None, diffs=None,
+        order=HEAD_ORDER):
+    """
+    Reorder the head of every HTML file under root (or the given files)
+    into order.
+    With a cache.Manifest, files already checked in their current state
+    are skipped without being read; with a writes.DiffSet, every change is
+    added to it as a unified diff.
+    """
+    report = ReorderReport()
+    files = list(iter_html_files(root) if files is None else files)
+    report.files_scanned = len(files)
+    check = HEAD_ORDER_CHECK if order is HEAD_ORDER else order_check(order)
+    if manifest is not None:
+        stale = [file_path for file_path in files
+                 if not manifest.is_fresh(file_path, check)]
+        report.files_cached = len(files) - len(stale)
+        files = stale
+
+    worker = partial(_reorder_one, root, dry_run, diffs is not None, order)
+    for file_path, (moves, digest, patch, error) in zip(files, run_parallel(worker, files, workers)):
+        if error is not None:
+            report.errors.append((file_path, error))
+            continue
+        if diffs is not None:
+            diffs.add(patch)
+        if moves:
+            report.files_changed += 1
+            report.moves.update(name for _, name in moves)
+        if manifest is not None and not dry_run:
+            manifest.record_hash(file_path, digest, check)
+
+    if manifest is not None:
+        manifest.save()
+    return report
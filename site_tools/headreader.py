@@ -0,0 +1,40 @@
+"""
+Read only the <head> of a page.
+
+Canonical, title and OG tags always live in <head>, but some pages
+(admin/index.html, industries/*/index.html) are mostly <body>. read_head()
+streams the file in chunks and stops at </head>, so read-only audits touch
+a few KB per page instead of the whole file.
+"""
+import re
+
+CHUNK_SIZE = 16 * 1024
+
+_HEAD_END = b'</head'
+_HEAD_END_RE = re.compile(rb'</head\s*>', re.IGNORECASE)
+
+
+def read_head_bytes(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Return the raw bytes up to and including </head>. Files without a
+    </head> are returned whole.
+    """
+    buffer = bytearray()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return bytes(buffer)
+            # Re-scan a few bytes of the previous chunk in case the tag is split
+            search_from = max(0, len(buffer) - len(_HEAD_END) - 8)
+            buffer += chunk
+            if _HEAD_END not in buffer[search_from:].lower():
+                continue
+            match = _HEAD_END_RE.search(buffer, search_from)
+            if match:
+                return bytes(buffer[:match.end()])
+
+
+def read_head(file_path, chunk_size=CHUNK_SIZE):
+    """Text of the document up to and including </head>"""
+    return read_head_bytes(file_path, chunk_size).decode('utf-8', errors='replace')
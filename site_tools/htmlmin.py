@@ -0,0 +1,340 @@
+"""
+HTML minification for the deploy copy of the site.
+
+minify_html() makes one pass over a page with a tokenizer that knows
+which elements hold raw text:
+
+  <pre>, <textarea>   copied exactly (only the opening tag is tidied)
+  preserved elements any element with a data-preserve-whitespace
+                     attribute or an inline white-space: pre* style is
+                     copied exactly, like <pre>; add the attribute to
+                     elements a stylesheet gives white-space: pre
+  <script>           copied exactly, except JSON-LD, which is re-serialized
+                     compactly (left alone if it does not parse)
+  <style>            minified with css.minify() (left alone if it fails)
+  comments           dropped, except IE conditionals and <!--! ... -->
+  whitespace         runs collapse to one space (one newline if the run had
+                     one); whitespace-only text inside <head> and around
+                     <html>/<head>/<body> is dropped
+
+Whitespace between body elements is collapsed, never removed, because a
+single space still renders between inline and inline-block elements.
+Attribute values are never touched; only the whitespace between
+attributes is collapsed.
+
+run() writes the minified pages and a copy of every other site file to a
+separate deploy directory, so the source tree stays as the maintenance
+scripts expect it.
+"""
+import json
+import os
+import re
+import shutil
+from functools import partial
+
+from site_tools import css
+from site_tools.cache import hash_bytes, version_of
+from site_tools.files import iter_files, iter_html_files, rel_path
+from site_tools.parallel import run_parallel
+from site_tools.writes import decode, write_if_changed
+
+_QUOTED = r'"[^"]*"|\'[^\']*\''
+_TOKEN_RE = re.compile(rf'''
+    (?P<raw><(?P<rawtag>pre|textarea|script|style)(?=[\s>/])(?:{_QUOTED}|[^'">])*>)
+  | (?P<comment><!--.*?-->)
+  | (?P<tag></?[a-zA-Z](?:{_QUOTED}|[^'">])*>|<![a-zA-Z][^>]*>)
+''', re.DOTALL | re.IGNORECASE | re.VERBOSE)
+_TAG_NAME_RE = re.compile(r'<(/?[a-zA-Z][\w-]*|!\w+)')
+_TAG_SPACE_RE = re.compile(rf'({_QUOTED})|[ \t\n\r\f]+')
+_TAG_END_SPACE_RE = re.compile(r'[ \t\n\r\f]+(/?>)$')
+_TYPE_RE = re.compile(r'\btype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+# Start tags whose content keeps its whitespace: the opt-out attribute, or
+# an inline style that makes the browser render it
+PRESERVE_ATTRIBUTE = 'data-preserve-whitespace'
+_PRESERVE_RE = re.compile(rf'\s{PRESERVE_ATTRIBUTE}(?=[\s=/>])'
+                          r'|\bstyle\s*=\s*["\'][^"\']*white-space\s*:\s*(?:pre|break-spaces)',
+                          re.IGNORECASE)
+# Python's \s would also match &nbsp; characters, which must stay
+_SPACE_RE = re.compile(r'[ \t\n\r\f]+')
+
+# Whitespace-only text next to these tags never renders
+_EDGE_TAGS = {'!doctype', 'html', '/html', 'head', '/head', 'body', '/body'}
+
+# Comments kept in the output
+_KEPT_COMMENTS = ('<!--[if', '<![endif]', '<!--<![endif]', '<!--!')
+
+_CLOSE_RES = {name: re.compile(rf'</{name}\s*>', re.IGNORECASE)
+              for name in ('pre', 'textarea', 'script', 'style')}
+
+
+def _tidy_tag(tag):
+    """Collapse the whitespace between attributes; quoted values stay as they are"""
+    tag = _TAG_SPACE_RE.sub(lambda m: m.group(1) or ' ', tag)
+    return _TAG_END_SPACE_RE.sub(r'\1', tag)
+
+
+def _collapse(text):
+    return _SPACE_RE.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+def _tag_name(tag):
+    match = _TAG_NAME_RE.match(tag)
+    return match.group(1).lower() if match else ''
+
+
+def _minify_json(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    # '</' can only appear inside strings; escape it so it cannot close the script
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+
+def _minify_style(body):
+    try:
+        return css.minify(body)
+    except Exception:
+        return body
+
+
+def _raw_element(content, match):
+    """(minified element, end offset) for a <pre>/<textarea>/<script>/<style> at match"""
+    name = match.group('rawtag').lower()
+    close = _CLOSE_RES[name].search(content, match.end())
+    end = close.start() if close else len(content)
+    after = close.end() if close else len(content)
+    opening = _tidy_tag(match.group('raw'))
+    body = content[match.end():end]
+    closing = f'</{name}>' if close else ''
+    if name == 'style':
+        body = _minify_style(body)
+    elif name == 'script':
+        script_type = _TYPE_RE.search(opening)
+        if script_type and script_type.group(1).lower() == 'application/ld+json':
+            body = _minify_json(body)
+    return opening + body + closing, after
+
+
+def _preserved_element(content, match, name):
+    """
+    (element copied as is, end offset) for a start tag at match that keeps
+    its whitespace, or None when it has no end tag (void or unclosed)
+    """
+    nested = re.compile(rf'<(/?){re.escape(name)}(?=[\s>/])', re.IGNORECASE)
+    depth = 1
+    for tag in nested.finditer(content, match.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            close = content.find('>', tag.end())
+            end = len(content) if close < 0 else close + 1
+            return _tidy_tag(match.group('tag')) + content[match.end():end], end
+    return None
+
+
+def minify_html(content):
+    """Return content minified (see the module docstring for what is safe)"""
+    out = []
+    text = []          # text since the last kept token; dropped comments don't split it
+    in_head = False
+    previous = ''      # name of the last tag written
+    pos = 0
+
+    def flush(next_tag):
+        chunk = ''.join(text)
+        text.clear()
+        if not chunk:
+            return
+        if not chunk.strip(' \t\n\r\f') and (in_head or previous in _EDGE_TAGS
+                                              or next_tag in _EDGE_TAGS):
+            return
+        out.append(_collapse(chunk))
+
+    while True:
+        match = _TOKEN_RE.search(content, pos)
+        if match is None:
+            text.append(content[pos:])
+            flush('')
+            break
+        text.append(content[pos:match.start()])
+        if match.group('comment'):
+            comment = match.group('comment')
+            pos = match.end()
+            if comment.startswith(_KEPT_COMMENTS):
+                flush('!--')
+                out.append(comment)
+            continue
+        if match.group('raw'):
+            flush(match.group('rawtag').lower())
+            element, pos = _raw_element(content, match)
+            out.append(element)
+            previous = match.group('rawtag').lower()
+            continue
+        tag = match.group('tag')
+        name = _tag_name(tag)
+        flush(name)
+        preserved = None
+        if name[:1].isalpha() and not tag.endswith('/>') and _PRESERVE_RE.search(tag):
+            preserved = _preserved_element(content, match, name)
+        if preserved is not None:
+            element, pos = preserved
+            out.append(element)
+            previous = f'/{name}'
+            continue
+        out.append(_tidy_tag(tag))
+        previous = name
+        if name == 'head':
+            in_head = True
+        elif name in ('/head', 'body'):
+            in_head = False
+        pos = match.end()
+    return ''.join(out)
+
+
+MINIFY_VERSION = version_of(minify_html, _raw_element, _preserved_element, _tidy_tag, _collapse,
+                            _tag_name, _minify_json, _minify_style, _TOKEN_RE.pattern,
+                            _PRESERVE_RE.pattern, _SPACE_RE.pattern,
+                            sorted(_EDGE_TAGS), _KEPT_COMMENTS, css.minify, css.serialize)
+MINIFY_CHECK = {'minify-html': MINIFY_VERSION}
+
+# Default deploy directory; a dot directory, so iter_html_files() and the
+# maintenance scripts never mistake the copies for site pages
+DEPLOY_DIR = '.deploy'
+
+# Siblings precompress.py writes next to deployed files; not stale while their file exists
+PRECOMPRESSED_SUFFIXES = ('.gz', '.br')
+
+
+def _out_skip_paths(root, out):
+    """skip_paths that keep the deploy directory out of its own input"""
+    out_rel = rel_path(out, root)
+    return (out_rel,) if not out_rel.startswith('..') else ()
+
+
+def _minify_one(root, out, file_path):
+    """run_parallel() worker: returns (bytes before, bytes after, content hash, error)"""
+    path = rel_path(file_path, root)
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        text, encoding, _, _ = decode(data)
+        minified = minify_html(text).encode(encoding)
+        target = os.path.join(out, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        write_if_changed(target, minified)
+    except Exception as e:
+        print(f"❌ Error processing {file_path}: {e}")
+        return None, None, None, str(e)
+    return len(data), len(minified), hash_bytes(data), None
+
+
+def _copy_if_changed(source, target):
+    """Copy source to target (with its mtime) unless size and mtime already match"""
+    try:
+        src, dst = os.stat(source), os.stat(target)
+        if src.st_size == dst.st_size and src.st_mtime_ns == dst.st_mtime_ns:
+            return False
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.copy2(source, target)
+    return True
+
+
+class MinifyReport:
+    """Byte savings per page plus what the deploy copy needed"""
+
+    def __init__(self):
+        self.pages = []         # (path, before, after, cached)
+        self.copied = 0
+        self.unchanged = 0
+        self.stale = []
+        self.pruned = False
+        self.errors = []
+
+    @property
+    def before(self):
+        return sum(before for _, before, _, _ in self.pages)
+
+    @property
+    def after(self):
+        return sum(after for _, _, after, _ in self.pages)
+
+    def print_summary(self, verbose=False):
+        for path, before, after, cached in self.pages:
+            if verbose or not cached:
+                saved = before - after
+                print(f"📄 {path}: {before:,} -> {after:,} bytes "
+                      f"(-{saved:,}, {saved / before if before else 0:.1%})")
+        cached = sum(1 for page in self.pages if page[3])
+        print(f"\n{'=' * 50}")
+        print(f"Minified {len(self.pages)} pages ({cached} unchanged since last run)")
+        saved = self.before - self.after
+        print(f"📦 {self.before:,} -> {self.after:,} bytes "
+              f"(saved {saved:,}, {saved / self.before if self.before else 0:.1%})")
+        print(f"📁 Copied {self.copied} other files ({self.unchanged} already up to date)")
+        if self.stale:
+            what = 'Removed' if self.pruned else 'Found'
+            print(f"🧹 {what} {len(self.stale)} files in the deploy directory that are no longer "
+                  f"in the site{'' if self.pruned else ' (--prune removes them)'}")
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} file(s) could not be processed")
+
+
+def run(root='.', out=DEPLOY_DIR, workers=1, manifest=None, prune=False):
+    """
+    Write a minified copy of the site under root to out. With a
+    cache.Manifest, pages minified before (whose output still exists) are
+    not minified again. prune deletes files in out that are no longer in
+    the site.
+    """
+    report = MinifyReport()
+    skip_paths = _out_skip_paths(root, out)
+    pages = list(iter_html_files(root, skip_paths=skip_paths))
+
+    todo = []
+    for file_path in pages:
+        path = rel_path(file_path, root)
+        sizes = None
+        if manifest is not None and manifest.is_fresh(file_path, MINIFY_CHECK) \
+                and os.path.exists(os.path.join(out, path)):
+            sizes = manifest.result(file_path, 'minify-html')
+        if sizes:
+            report.pages.append((path, sizes[0], sizes[1], True))
+        else:
+            todo.append(file_path)
+
+    worker = partial(_minify_one, root, out)
+    for file_path, (before, after, digest, error) in zip(todo, run_parallel(worker, todo, workers)):
+        if error is not None:
+            report.errors.append((file_path, error))
+            continue
+        report.pages.append((rel_path(file_path, root), before, after, False))
+        if manifest is not None:
+            manifest.record_hash(file_path, digest, MINIFY_CHECK, {'minify-html': [before, after]})
+    report.pages.sort()
+
+    wanted = {path for path, _, _, _ in report.pages}
+    for file_path in iter_files(root, skip_paths=skip_paths):
+        path = rel_path(file_path, root)
+        if path.endswith('.html'):
+            continue
+        wanted.add(path)
+        if _copy_if_changed(file_path, os.path.join(out, path)):
+            report.copied += 1
+        else:
+            report.unchanged += 1
+
+    report.pruned = prune
+    for dirpath, dirs, files in os.walk(out):
+        for name in files:
+            path = rel_path(os.path.join(dirpath, name), out)
+            source = path[:-3] if path.endswith(PRECOMPRESSED_SUFFIXES) else path
+            if source not in wanted and not name.startswith('.'):
+                report.stale.append(path)
+                if prune:
+                    os.remove(os.path.join(dirpath, name))
+
+    if manifest is not None:
+        manifest.save()
+    return report
@@ -0,0 +1,336 @@
+"""
+Responsive image variants for assets/illustrations.
+
+optimize_image() turns one source PNG/JPEG into resized WebP (and AVIF when
+the installed Pillow can write it) variants at a set of widths, plus a
+compressed copy in the source format as the <img> fallback. OG/social card
+images get a single compressed JPEG at card size instead, since not every
+social network accepts WebP.
+
+Results are cached by source hash in .site-cache/images.json, so re-runs
+only touch new or edited images. picture_rule() rewrites <img> tags into
+<picture>/srcset markup from the variants that exist.
+
+Pillow is optional for the rest of the tools, so it is imported lazily.
+"""
+import html
+import json
+import os
+import re
+from urllib.parse import quote, unquote
+
+from site_tools.cache import CACHE_DIR, hash_file, version_of, write_json
+from site_tools.rewrite import Rule
+from site_tools.urls import SITE_URL
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  (registers the AVIF plugin on older Pillow)
+except ImportError:
+    pass
+
+SOURCE_DIR = 'assets/illustrations'
+OUTPUT_SUBDIR = 'optimized'
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Variant widths in px; widths at or above the source width are dropped and
+# the source width itself is always kept
+WIDTHS = (480, 960, 1440)
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+JPEG_QUALITY = 82
+
+# Social cards: 1200x630 is what Facebook/LinkedIn/X render; stay a JPEG
+OG_PREFIX = 'og-image'
+OG_SIZE = (1200, 630)
+OG_QUALITY = 85
+
+CACHE_NAME = 'images.json'
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+def pillow_available():
+    return Image is not None
+
+
+def avif_supported():
+    """True if the installed Pillow (or pillow-avif-plugin) can write AVIF"""
+    if Image is None:
+        return False
+    Image.init()
+    return 'AVIF' in Image.SAVE
+
+
+def is_og_image(path):
+    return os.path.basename(path).startswith(OG_PREFIX)
+
+
+def find_images(root='.', source_dir=SOURCE_DIR):
+    """Repo-relative source images in source_dir (not the generated variants)"""
+    base = os.path.join(root, source_dir)
+    images = []
+    for name in sorted(os.listdir(base)):
+        path = os.path.join(base, name)
+        if os.path.isfile(path) and name.lower().endswith(SOURCE_EXTENSIONS):
+            images.append(os.path.relpath(path, root).replace(os.sep, '/'))
+    return images
+
+
+def variant_path(source, width, ext):
+    """assets/illustrations/x.png, 960, 'webp' -> assets/illustrations/optimized/x-960.webp"""
+    directory, name = os.path.split(source)
+    stem = os.path.splitext(name)[0]
+    return f"{directory}/{OUTPUT_SUBDIR}/{stem}-{width}.{ext}"
+
+
+def _target_widths(width):
+    return sorted({w for w in WIDTHS if w < width} | {width})
+
+
+def _save(image, path, fmt, **options):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    image.save(tmp_path, fmt, **options)
+    os.replace(tmp_path, path)
+
+
+def _flatten(image):
+    """JPEG has no alpha: composite onto white"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[-1])
+        return background
+    return image.convert('RGB')
+
+
+def optimize_image(root, source, avif=False):
+    """
+    Write every variant for one source image.
+    Returns {'source', 'bytes', 'width', 'height', 'variants': [{path, format,
+    width, bytes}]} with paths relative to root.
+    """
+    resample = getattr(Image, 'Resampling', Image).LANCZOS
+    source_path = os.path.join(root, source)
+    variants = []
+
+    def record(path, fmt, width):
+        variants.append({'path': path, 'format': fmt, 'width': width,
+                         'bytes': os.path.getsize(os.path.join(root, path))})
+
+    with Image.open(source_path) as image:
+        image.load()
+        width, height = image.size
+
+        if is_og_image(source):
+            card = _flatten(image)
+            if card.size != OG_SIZE:
+                # Cover-crop to the card aspect ratio, then scale
+                target_ratio = OG_SIZE[0] / OG_SIZE[1]
+                if width / height > target_ratio:
+                    crop_w = round(height * target_ratio)
+                    left = (width - crop_w) // 2
+                    card = card.crop((left, 0, left + crop_w, height))
+                else:
+                    crop_h = round(width / target_ratio)
+                    top = (height - crop_h) // 2
+                    card = card.crop((0, top, width, top + crop_h))
+                card = card.resize(OG_SIZE, resample)
+            path = variant_path(source, OG_SIZE[0], 'jpg')
+            _save(card, os.path.join(root, path), 'JPEG', quality=OG_QUALITY,
+                  optimize=True, progressive=True)
+            record(path, 'jpg', OG_SIZE[0])
+        else:
+            fallback_ext = 'png' if source.lower().endswith('.png') else 'jpg'
+            for target_width in _target_widths(width):
+                if target_width == width:
+                    resized = image
+                else:
+                    resized = image.resize(
+                        (target_width, round(height * target_width / width)), resample)
+
+                path = variant_path(source, target_width, 'webp')
+                _save(resized, os.path.join(root, path), 'WEBP',
+                      quality=WEBP_QUALITY, method=6)
+                record(path, 'webp', target_width)
+
+                if avif:
+                    path = variant_path(source, target_width, 'avif')
+                    _save(resized, os.path.join(root, path), 'AVIF', quality=AVIF_QUALITY)
+                    record(path, 'avif', target_width)
+
+                path = variant_path(source, target_width, fallback_ext)
+                if fallback_ext == 'png':
+                    _save(resized, os.path.join(root, path), 'PNG', optimize=True)
+                else:
+                    _save(_flatten(resized), os.path.join(root, path), 'JPEG',
+                          quality=JPEG_QUALITY, optimize=True, progressive=True)
+                record(path, fallback_ext, target_width)
+
+    return {
+        'source': source,
+        'bytes': os.path.getsize(source_path),
+        'width': width,
+        'height': height,
+        'variants': variants,
+    }
+
+
+# Cached results are rebuilt whenever the settings or the encoder code change
+SETTINGS_VERSION = version_of(WIDTHS, WEBP_QUALITY, AVIF_QUALITY, JPEG_QUALITY,
+                              OG_SIZE, OG_QUALITY, optimize_image, _flatten)
+
+
+class ImageCache:
+    """Source hash -> generated variants, stored in .site-cache/images.json"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, CACHE_NAME)
+        self.images = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == SETTINGS_VERSION:
+                self.images = data.get('images', {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, source, digest, avif):
+        """Cached result if the source is unchanged and every variant still exists"""
+        entry = self.images.get(source)
+        if not entry or entry['hash'] != digest or entry['avif'] != avif:
+            return None
+        result = entry['result']
+        if all(os.path.exists(os.path.join(self.root, v['path'])) for v in result['variants']):
+            return result
+        return None
+
+    def store(self, source, digest, avif, result):
+        self.images[source] = {'hash': digest, 'avif': avif, 'result': result}
+
+    def save(self):
+        write_json(self.path, {'version': SETTINGS_VERSION, 'images': self.images})
+
+
+def variants_by_url(results):
+    """
+    Map each source's site path ('/assets/illustrations/x.png') to its
+    variants grouped by format: {'webp': [(url, width), ...], ...}
+    """
+    table = {}
+    for result in results:
+        if is_og_image(result['source']):
+            continue
+        formats = {}
+        for variant in result['variants']:
+            formats.setdefault(variant['format'], []).append(
+                ('/' + quote(variant['path']), variant['width']))
+        for entries in formats.values():
+            entries.sort(key=lambda entry: entry[1])
+        table['/' + result['source']] = formats
+    return table
+
+
+_SRC_RE = re.compile(r'''\ssrc\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+_WIDTH_RE = re.compile(r'''\swidth\s*=\s*["']?(\d+)''', re.IGNORECASE)
+_SIZES_RE = re.compile(r'''\ssizes\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+
+
+class PictureRewriter:
+    """Rule replacement: wrap a local <img> in <picture> with srcset sources"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __call__(self, match):
+        tag = match.group('img')
+        if tag is None:
+            # <picture>, <script> or a comment: leave untouched
+            return match.group(0)
+        src_match = _SRC_RE.search(tag)
+        if not src_match:
+            return tag
+        src = unquote(html.unescape(src_match.group(1) or src_match.group(2) or ''))
+        if src.startswith(SITE_URL):
+            src = src[len(SITE_URL):]
+        formats = self.table.get(src.split('?')[0])
+        if not formats:
+            return tag
+
+        sizes_match = _SIZES_RE.search(tag)
+        width_match = _WIDTH_RE.search(tag)
+        if sizes_match:
+            sizes = sizes_match.group(1) or sizes_match.group(2)
+        elif width_match:
+            sizes = f"(max-width: {width_match.group(1)}px) 100vw, {width_match.group(1)}px"
+        else:
+            sizes = '100vw'
+
+        sources = []
+        for fmt in ('avif', 'webp'):
+            if fmt in formats:
+                srcset = ', '.join(f"{url} {width}w" for url, width in formats[fmt])
+                sources.append(f'<source type="{MIME_TYPES[fmt]}" '
+                               f'srcset="{html.escape(srcset)}" sizes="{html.escape(sizes)}">')
+        if not sources:
+            return tag
+        fallback = next((formats[fmt] for fmt in ('png', 'jpg') if fmt in formats), None)
+        if fallback:
+            # Browsers without AVIF/WebP still get the compressed copy
+            url = html.escape(fallback[-1][0])
+            tag = f"{tag[:src_match.start()]} src=\"{url}\"{tag[src_match.end():]}"
+        return f"<picture>{''.join(sources)}{tag}</picture>"
+
+    def __repr__(self):
+        return f"PictureRewriter({sorted(self.table.items())!r})"
+
+
+def picture_rule(results):
+    """
+    Rewrite rule turning <img src="/assets/illustrations/x.png"> into
+    <picture> markup. Existing <picture> blocks, scripts and comments are
+    matched first and left alone so nothing is wrapped twice.
+    """
+    return Rule(
+        'responsive-images',
+        r'(?P<skip><picture\b.*?</picture\s*>|<script\b.*?</script\s*>|<!--.*?-->)'
+        r'|(?P<img><img\b[^>]*>)',
+        PictureRewriter(variants_by_url(results)),
+        flags=re.IGNORECASE | re.DOTALL,
+        description='<img> -> <picture> with AVIF/WebP srcset',
+    )
+
+
+class OgImageRewriter:
+    """Rule replacement: point og:image/twitter:image at the compressed card"""
+
+    def __init__(self, cards):
+        self.cards = cards
+
+    def __call__(self, match):
+        url = match.group('url')
+        card = self.cards.get(url.replace(SITE_URL, ''))
+        return match.group(0) if card is None else match.group(0).replace(url, SITE_URL + card)
+
+    def __repr__(self):
+        return f"OgImageRewriter({sorted(self.cards.items())!r})"
+
+
+def og_image_rule(results):
+    """Rewrite rule for og:image / twitter:image meta tags"""
+    cards = {'/' + result['source']: '/' + quote(result['variants'][0]['path'])
+             for result in results if is_og_image(result['source']) and result['variants']}
+    return Rule(
+        'og-image-cards',
+        r'''<meta\s+(?:property|name)=["'](?:og:image|twitter:image)["']\s+content=["'](?P<url>[^"']+)["']''',
+        OgImageRewriter(cards),
+        flags=re.IGNORECASE,
+        description='og:image/twitter:image -> compressed social card',
+    )
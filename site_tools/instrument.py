@@ -0,0 +1,586 @@
+"""
+Where does a maintenance script spend its time?
+
+    python3 -m site_tools.instrument update-css-version.py -j 4
+    python3 -m site_tools.instrument --json stats.json --top 20 fix-feature-titles.py
+    python3 -m site_tools.instrument --profile rewrite.prof release-rewrite.py
+    python3 -m site_tools.instrument --sample 5 audit-all-canonicals.py -j 1
+
+Runs the script unchanged and records, for the whole run and for every
+function the script defines (update_file, fix_head_section,
+get_canonical_from_file, ...) plus the per-file workers in site_tools:
+
+  - wall time and calls
+  - bytes read and written through open(), and the files touched
+  - matches per regex (re.sub/search/... calls, and each rewrite Rule)
+  - time spent walking the tree for HTML files
+  - the slowest files
+
+Work done in run_parallel() workers is sent back with each result, so
+the numbers are the same with -j 1 or -j 8. The summary is printed after
+the script's own output; --json writes the same data. --profile (cProfile)
+and --sample (a stack sampler) cover the main process only, so use -j 1
+to include the per-file work.
+
+Nothing is recorded unless the script runs under this module: the hooks
+in site_tools check `enabled` and cost nothing otherwise.
+"""
+import argparse
+import ast
+import builtins
+import cProfile
+import functools
+import io
+import json
+import os
+import re
+import signal
+import sys
+import sysconfig
+import time
+from collections import Counter
+
+enabled = False
+
+_stats = None
+_active = []        # names of traced functions currently running, outermost first
+_file_active = []   # file arguments of the traced calls currently running
+
+# Per-file workers in site_tools; scripts' own functions are found automatically
+LIBRARY_FUNCTIONS = (
+    ('site_tools.rewrite', '_rewrite_one'),
+    ('site_tools.headorder', '_reorder_one'),
+    ('site_tools.header', '_inline_one'),
+    ('site_tools.htmlmin', '_minify_one'),
+    ('site_tools.precompress', 'compress_file'),
+    ('site_tools.feed', 'page_item'),
+    ('site_tools.prerender', '_render_one'),
+    ('site_tools.linkgraph', '_page_references'),
+    ('site_tools.budget', '_page_resources'),
+    ('site_tools.assetgc', '_scan'),
+    ('site_tools.watch', '_parse_one'),
+)
+
+_REGEX_FUNCTIONS = ('sub', 'subn', 'search', 'match', 'fullmatch', 'findall', 'finditer')
+
+_real_open = builtins.open
+_real_regex = {name: getattr(re, name) for name in _REGEX_FUNCTIONS}
+
+# re calls made by the standard library (argparse, multiprocessing) are not counted
+_STDLIB = sysconfig.get_paths()['stdlib']
+
+
+def _new_stats():
+    return {
+        'functions': {},    # name -> {calls, seconds, bytes_read, bytes_written, files}
+        'files': {},        # path -> {seconds, function, bytes_read, bytes_written}
+        'regex': {},        # label -> [calls, matches]
+        'bytes_read': 0,
+        'bytes_written': 0,
+        'touched': set(),
+        'walk_seconds': 0.0,
+    }
+
+
+def reset():
+    """Start a fresh set of numbers (workers do this before each task)"""
+    global _stats
+    _stats = _new_stats()
+
+
+def take():
+    """The numbers recorded since reset(), which start over"""
+    stats = _stats
+    reset()
+    return stats
+
+
+def merge(stats):
+    """Add numbers recorded elsewhere (a worker process) to this process's"""
+    for name, entry in stats['functions'].items():
+        mine = _function_entry(name)
+        for key in ('calls', 'seconds', 'bytes_read', 'bytes_written'):
+            mine[key] += entry[key]
+        mine['files'] |= entry['files']
+    for path, entry in stats['files'].items():
+        mine = _file_entry(path)
+        for key in ('seconds', 'bytes_read', 'bytes_written'):
+            mine[key] += entry[key]
+        mine['function'] = mine['function'] or entry['function']
+    for label, (calls, matches) in stats['regex'].items():
+        count_regex(label, matches, calls)
+    for key in ('bytes_read', 'bytes_written', 'walk_seconds'):
+        _stats[key] += stats[key]
+    _stats['touched'] |= stats['touched']
+
+
+def _function_entry(name):
+    entry = _stats['functions'].get(name)
+    if entry is None:
+        entry = _stats['functions'][name] = {
+            'calls': 0, 'seconds': 0.0, 'bytes_read': 0, 'bytes_written': 0, 'files': set()}
+    return entry
+
+
+def _file_entry(path):
+    entry = _stats['files'].get(path)
+    if entry is None:
+        entry = _stats['files'][path] = {
+            'seconds': 0.0, 'function': None, 'bytes_read': 0, 'bytes_written': 0}
+    return entry
+
+
+def _display_path(path):
+    path = os.fspath(path)
+    if isinstance(path, bytes):
+        path = os.fsdecode(path)
+    return os.path.relpath(path) if os.path.isabs(path) else os.path.normpath(path)
+
+
+def count_regex(label, matches, calls=1):
+    """Record calls and matches for a regex (or a rewrite rule)"""
+    entry = _stats['regex'].get(label)
+    if entry is None:
+        _stats['regex'][label] = [calls, matches]
+    else:
+        entry[0] += calls
+        entry[1] += matches
+
+
+def count_io(path, bytes_read=0, bytes_written=0):
+    """Attribute I/O on path to the run, the running functions and the file"""
+    _stats['bytes_read'] += bytes_read
+    _stats['bytes_written'] += bytes_written
+    path = _display_path(path)
+    _stats['touched'].add(path)
+    for name in dict.fromkeys(_active):
+        entry = _function_entry(name)
+        entry['bytes_read'] += bytes_read
+        entry['bytes_written'] += bytes_written
+        entry['files'].add(path)
+    entry = _file_entry(path)
+    entry['bytes_read'] += bytes_read
+    entry['bytes_written'] += bytes_written
+
+
+def _file_argument(args):
+    """The first argument that looks like a file path, for per-file timings"""
+    for arg in args:
+        if isinstance(arg, os.PathLike) or (
+                isinstance(arg, str) and '\n' not in arg and '://' not in arg
+                and len(arg) < 1024 and os.path.splitext(arg)[1]):
+            return _display_path(arg)
+    return None
+
+
+def traced(func, name=None):
+    """Wrap func so its calls are timed while instrumentation is enabled"""
+    name = name or func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        path = _file_argument(args)
+        outer_file = path is not None and not _file_active
+        _active.append(name)
+        if path is not None:
+            _file_active.append(path)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _active.pop()
+            if path is not None:
+                _file_active.pop()
+            entry = _function_entry(name)
+            entry['calls'] += 1
+            if name not in _active:
+                # Recursive calls only count once
+                entry['seconds'] += elapsed
+            if path is not None:
+                entry['files'].add(path)
+            if outer_file:
+                file_entry = _file_entry(path)
+                file_entry['seconds'] += elapsed
+                file_entry['function'] = file_entry['function'] or name
+
+    wrapper.__wrapped_by_instrument__ = True
+    return wrapper
+
+
+def timed_walk(func):
+    """Wrap a file-walking generator function to record time spent inside it"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        iterator = iter(func(*args, **kwargs))
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                if enabled:
+                    _stats['walk_seconds'] += time.perf_counter() - start
+                return
+            if enabled:
+                _stats['walk_seconds'] += time.perf_counter() - start
+            yield item
+
+    return wrapper
+
+
+class _CountedFile:
+    """
+    A file object from open() that reports how many bytes it moved when
+    closed. The count is the change in OS file position, so it is what
+    actually came off (or went to) disk, read-ahead included.
+    """
+
+    def __init__(self, file, path, writing):
+        self._file = file
+        self._path = path
+        self._writing = writing
+        self._start = self._position()
+        self._counted = False
+
+    def _position(self):
+        try:
+            return os.lseek(self._file.fileno(), 0, os.SEEK_CUR)
+        except (OSError, ValueError, io.UnsupportedOperation):
+            return 0
+
+    def _count(self):
+        if self._counted:
+            return
+        self._counted = True
+        if not self._file.closed:
+            if self._writing:
+                self._file.flush()
+            moved = max(0, self._position() - self._start)
+        else:
+            moved = 0
+        if enabled:
+            if self._writing:
+                count_io(self._path, bytes_written=moved)
+            else:
+                count_io(self._path, bytes_read=moved)
+
+    def close(self):
+        self._count()
+        self._file.close()
+
+    def __enter__(self):
+        self._file.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._count()
+        return self._file.__exit__(*exc_info)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __next__(self):
+        return next(self._file)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __del__(self):
+        try:
+            self._count()
+        except Exception:
+            pass
+
+
+def _counting_open(file, mode='r', *args, **kwargs):
+    handle = _real_open(file, mode, *args, **kwargs)
+    if not enabled or isinstance(file, int):
+        return handle
+    writing = any(char in mode for char in 'wax+')
+    return _CountedFile(handle, file, writing)
+
+
+def _regex_label(pattern):
+    text = pattern.pattern if isinstance(pattern, re.Pattern) else pattern
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', 'replace')
+    text = ' '.join(str(text).split())
+    return text if len(text) <= 60 else text[:57] + '...'
+
+
+def _counting_regex(name, func):
+    @functools.wraps(func)
+    def wrapper(pattern, *args, **kwargs):
+        if not enabled or sys._getframe(1).f_code.co_filename.startswith(_STDLIB):
+            return func(pattern, *args, **kwargs)
+        label = _regex_label(pattern)
+        if name == 'sub':
+            result, matches = _real_regex['subn'](pattern, *args, **kwargs)
+        elif name == 'finditer':
+            return _counted_iter(label, func(pattern, *args, **kwargs))
+        else:
+            result = func(pattern, *args, **kwargs)
+            if name == 'subn':
+                matches = result[1]
+            elif name == 'findall':
+                matches = len(result)
+            else:
+                matches = 1 if result is not None else 0
+        count_regex(label, matches)
+        return result
+
+    return wrapper
+
+
+def _counted_iter(label, iterator):
+    matches = 0
+    for match in iterator:
+        matches += 1
+        yield match
+    count_regex(label, matches)
+
+
+def install():
+    """Turn recording on and hook open() and the re module functions"""
+    global enabled
+    reset()
+    enabled = True
+    builtins.open = io.open = _counting_open
+    for name, func in _real_regex.items():
+        setattr(re, name, _counting_regex(name, func))
+
+    # Before any other site_tools module binds it with "from ... import"
+    from site_tools import files
+    files.iter_html_files = timed_walk(files.iter_html_files)
+
+
+def trace_module(module, names=None):
+    """Wrap the module's own functions (or just names) with traced()"""
+    for name, value in list(vars(module).items()):
+        if names is not None and name not in names:
+            continue
+        if (callable(value) and getattr(value, '__module__', None) == module.__name__
+                and type(value).__name__ == 'function'
+                and not getattr(value, '__wrapped_by_instrument__', False)
+                and name != 'main'):
+            setattr(module, name, traced(value))
+
+
+def trace_library():
+    for module_name, function in LIBRARY_FUNCTIONS:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            trace_module(module, {function})
+
+
+class Sampler:
+    """Counts the stack every interval of CPU time (main thread only)"""
+
+    def __init__(self, interval_ms):
+        self.interval = interval_ms / 1000
+        self.leaf = Counter()
+        self.inclusive = Counter()
+        self.samples = 0
+
+    def _sample(self, signum, frame):
+        self.samples += 1
+        seen = set()
+        leaf = True
+        while frame is not None:
+            code = frame.f_code
+            key = f"{code.co_name} ({_display_path(code.co_filename)}:{code.co_firstlineno})"
+            if leaf:
+                self.leaf[key] += 1
+                leaf = False
+            if key not in seen:
+                seen.add(key)
+                self.inclusive[key] += 1
+            frame = frame.f_back
+
+    def start(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+
+def _split_main_block(tree):
+    """(module body, trailing "if __name__ == '__main__':" block or None)"""
+    body = list(tree.body)
+    if body and isinstance(body[-1], ast.If):
+        test = body[-1].test
+        if (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+                and test.left.id == '__name__'):
+            return body[:-1], body[-1]
+    return body, None
+
+
+def run_script(script, args):
+    """
+    Execute script as __main__ with its functions traced; returns the exit
+    status. Functions are wrapped after the module body has run and before
+    its "if __name__ == '__main__'" block does.
+    """
+    path = os.path.abspath(script)
+    with _real_open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    tree = ast.parse(source, path)
+    body, main_block = _split_main_block(tree)
+
+    module = type(sys)('__main__')
+    module.__file__ = path
+    module.__builtins__ = builtins
+    sys.modules['__main__'] = module
+    sys.argv = [script] + list(args)
+    sys.path.insert(0, os.path.dirname(path))
+
+    try:
+        exec(compile(ast.Module(body, []), path, 'exec'), module.__dict__)
+        trace_module(module)
+        trace_library()
+        if main_block is not None:
+            exec(compile(ast.Module([main_block], []), path, 'exec'), module.__dict__)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        if isinstance(e.code, int):
+            return e.code
+        print(e.code, file=sys.stderr)
+        return 1
+    return 0
+
+
+def format_bytes(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def summary(script, status, seconds, top=10):
+    """The recorded numbers as a JSON-ready dict"""
+    functions = sorted(_stats['functions'].items(), key=lambda item: -item[1]['seconds'])
+    files = sorted(_stats['files'].items(), key=lambda item: -item[1]['seconds'])
+    return {
+        'script': script,
+        'exit': status,
+        'seconds': round(seconds, 4),
+        'walk_seconds': round(_stats['walk_seconds'], 4),
+        'bytes_read': _stats['bytes_read'],
+        'bytes_written': _stats['bytes_written'],
+        'files_touched': len(_stats['touched']),
+        'files_written': sum(1 for entry in _stats['files'].values() if entry['bytes_written']),
+        'functions': [{
+            'name': name,
+            'calls': entry['calls'],
+            'seconds': round(entry['seconds'], 4),
+            'bytes_read': entry['bytes_read'],
+            'bytes_written': entry['bytes_written'],
+            'files': len(entry['files']),
+        } for name, entry in functions],
+        'regex': [{'pattern': label, 'calls': calls, 'matches': matches}
+                  for label, (calls, matches) in sorted(_stats['regex'].items(),
+                                                          key=lambda item: -item[1][1])],
+        'slowest_files': [{
+            'path': path,
+            'seconds': round(entry['seconds'], 5),
+            'function': entry['function'],
+            'bytes_read': entry['bytes_read'],
+            'bytes_written': entry['bytes_written'],
+        } for path, entry in files[:top] if entry['seconds']],
+    }
+
+
+def print_summary(data, top=10):
+    print("\n" + "=" * 60)
+    print(f"⏱️  {data['script']}: {data['seconds']:.2f}s (exit {data['exit']}), "
+          f"{data['walk_seconds']:.3f}s walking the tree")
+    print(f"📖 Read {format_bytes(data['bytes_read'])}, wrote "
+          f"{format_bytes(data['bytes_written'])} to {data['files_written']} files "
+          f"({data['files_touched']} files touched)")
+    print("=" * 60)
+    if data['functions']:
+        print(f"  {'function':<28} {'calls':>7} {'seconds':>8} {'read':>9} {'written':>9} {'files':>6}")
+        for entry in data['functions'][:top]:
+            print(f"  {entry['name']:<28} {entry['calls']:>7} {entry['seconds']:>8.3f} "
+                  f"{format_bytes(entry['bytes_read']):>9} "
+                  f"{format_bytes(entry['bytes_written']):>9} {entry['files']:>6}")
+    if data['regex']:
+        print(f"\n  {'regex / rule':<62} {'calls':>7} {'matches':>8}")
+        for entry in data['regex'][:top]:
+            print(f"  {entry['pattern']:<62} {entry['calls']:>7} {entry['matches']:>8}")
+    if data['slowest_files']:
+        print("\n  Slowest files:")
+        for entry in data['slowest_files']:
+            print(f"  {entry['seconds'] * 1000:>8.1f} ms  {entry['path']} ({entry['function']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python3 -m site_tools.instrument',
+        description="Run a maintenance script and report where its time goes")
+    parser.add_argument('--json', metavar='FILE', help="also write the numbers as JSON")
+    parser.add_argument('--top', type=int, default=10, help="rows per table (default: 10)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="write cProfile stats for the main process (read with python3 -m pstats)")
+    parser.add_argument('--sample', type=float, metavar='MS',
+                        help="sample the main process's stack every MS milliseconds of CPU")
+    parser.add_argument('script', help="script to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="arguments for the script")
+    args = parser.parse_args()
+
+    install()
+    profiler = cProfile.Profile() if args.profile else None
+    sampler = Sampler(args.sample) if args.sample else None
+
+    start = time.perf_counter()
+    if sampler:
+        sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        status = run_script(args.script, args.args)
+    finally:
+        if profiler:
+            profiler.disable()
+        if sampler:
+            sampler.stop()
+    elapsed = time.perf_counter() - start
+    sys.stdout.flush()
+
+    data = summary(args.script, status, elapsed, args.top)
+    if sampler:
+        data['samples'] = {
+            'interval_ms': args.sample,
+            'count': sampler.samples,
+            'leaf': sampler.leaf.most_common(args.top),
+            'inclusive': sampler.inclusive.most_common(args.top),
+        }
+    print_summary(data, args.top)
+    if sampler and sampler.samples:
+        print(f"\n  Sampled stacks ({sampler.samples} samples, self time):")
+        for key, count in sampler.leaf.most_common(args.top):
+            print(f"  {count / sampler.samples:>6.1%}  {key}")
+
+    if profiler:
+        profiler.dump_stats(args.profile)
+        print(f"\n📄 Wrote {args.profile} (python3 -m pstats {args.profile})")
+    if args.json:
+        with _real_open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+        print(f"📄 Wrote {args.json}")
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    # Go through the imported module so the hooks in site_tools see the
+    # same `enabled` flag and numbers as this run
+    from site_tools import instrument
+    instrument.main()
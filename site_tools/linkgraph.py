@@ -0,0 +1,231 @@
+"""
+Internal link graph: every href/src/srcset/og:image reference on every
+page, resolved against the file tree and the redirect rules.
+
+SiteFiles is built from one walk of the tree and maps a URL path to the
+file a static host would serve for it, so resolving a reference is a
+couple of dict lookups however big the site is. extract_references()
+reads a page once and skips <script>/<style> bodies and comments, where
+URL-looking strings are usually templates.
+
+check() returns a LinkReport with broken references, references that
+only work through a redirect, redirect chains and loops, and orphan
+pages that no other page links to.
+"""
+import os
+import re
+from bisect import bisect_right
+from functools import partial
+from urllib.parse import unquote, urljoin, urlsplit
+
+from site_tools.files import SKIP_DIRS, iter_html_files, rel_path
+from site_tools.parallel import run_parallel
+from site_tools.redirects import RedirectTable, load_redirects, local_path
+from site_tools.urls import SITE_HOSTS, file_path_to_url
+
+# Pages injected into every other page at runtime: their links count as
+# links from every page
+SHARED_FRAGMENTS = ('assets/header.html',)
+
+# Comments are skipped whole; <script>/<style> only contribute their start tag
+_TAG_RE = re.compile(
+    r'''<!--.*?-->'''
+    r'''|<(?P<tag>[a-zA-Z][\w-]*)(?P<attrs>(?:[^>"']|"[^"]*"|'[^']*')*)>''',
+    re.IGNORECASE | re.DOTALL,
+)
+_RAW_END_RES = {'script': re.compile(r'</script\s*>', re.IGNORECASE),
+                'style': re.compile(r'</style\s*>', re.IGNORECASE)}
+_ATTR_RE = re.compile(r'''([\w:.-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''')
+
+URL_ATTRIBUTES = ('href', 'src', 'poster', 'data-src')
+META_URL_KEYS = ('og:image', 'og:url', 'twitter:image', 'og:video', 'og:image:secure_url')
+
+
+class Reference:
+    """One URL found on a page"""
+
+    def __init__(self, source, line, attribute, url):
+        self.source = source
+        self.line = line
+        self.attribute = attribute
+        self.url = url
+
+    def where(self):
+        return f"{self.source}:{self.line}"
+
+
+def _urls_in_tag(tag, attr_text):
+    attrs = {}
+    for match in _ATTR_RE.finditer(attr_text):
+        value = next((v for v in match.groups()[1:] if v is not None), '')
+        attrs[match.group(1).lower()] = value
+    for name in URL_ATTRIBUTES:
+        if name in attrs:
+            yield name, attrs[name]
+    if 'srcset' in attrs:
+        for candidate in attrs['srcset'].split(','):
+            candidate = candidate.strip()
+            if candidate:
+                yield 'srcset', candidate.split()[0]
+    if tag == 'meta':
+        key = (attrs.get('property') or attrs.get('name') or '').lower()
+        if key in META_URL_KEYS and 'content' in attrs:
+            yield key, attrs['content']
+
+
+def extract_references(content, source):
+    """Every URL in tag attributes of content, outside scripts/styles/comments"""
+    newlines = [m.start() for m in re.finditer('\n', content)]
+    references = []
+    pos = 0
+    while True:
+        match = _TAG_RE.search(content, pos)
+        if match is None:
+            break
+        pos = match.end()
+        tag = (match.group('tag') or '').lower()
+        if not tag:
+            continue
+        line = bisect_right(newlines, match.start()) + 1
+        for attribute, url in _urls_in_tag(tag, match.group('attrs')):
+            references.append(Reference(source, line, attribute, url.strip()))
+        if tag in _RAW_END_RES:
+            # Skip the body: URL-like strings in scripts are usually templates
+            end = _RAW_END_RES[tag].search(content, pos)
+            pos = end.end() if end else len(content)
+    return references
+
+
+def _page_references(root, file_path):
+    """run_parallel() worker: (path, references, error)"""
+    path = rel_path(file_path, root)
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return path, extract_references(f.read(), path), None
+    except Exception as e:
+        return path, [], str(e)
+
+
+class SiteFiles:
+    """Every file in the tree, looked up the way a static host serves URLs"""
+
+    def __init__(self, root='.', skip_dirs=SKIP_DIRS):
+        self.files = set()
+        for dirpath, dirs, files in os.walk(root):
+            dirs[:] = [d for d in dirs if d not in skip_dirs and not d.startswith('.')]
+            for name in files:
+                self.files.add(rel_path(os.path.join(dirpath, name), root))
+
+    def file_for(self, path):
+        """'/pricing/' -> 'pricing/index.html'; None if nothing is served there"""
+        relative = unquote(path).lstrip('/')
+        if relative == '' or relative.endswith('/'):
+            candidate = relative + 'index.html'
+            return candidate if candidate in self.files else None
+        if relative in self.files:
+            return relative
+        candidate = relative + '/index.html'
+        return candidate if candidate in self.files else None
+
+
+def internal_path(url, page_url):
+    """
+    Site path ('/pricing/') for a reference on page_url, or None for
+    external URLs, fragments, mailto:, data: and template placeholders.
+    """
+    if not url or url.startswith('#') or any(marker in url for marker in ('{', '[', '$', '<')):
+        return None
+    parts = urlsplit(urljoin(page_url, url))
+    if parts.scheme not in ('http', 'https') or parts.hostname not in SITE_HOSTS:
+        return None
+    return parts.path or '/'
+
+
+class Resolution:
+    """What a site path ends up serving"""
+
+    def __init__(self, path, file=None, hops=(), loop=False):
+        self.path = path
+        self.file = file
+        self.hops = list(hops)   # Redirect rules followed, in order
+        self.loop = loop
+
+    @property
+    def target(self):
+        return self.hops[-1].destination if self.hops else self.path
+
+
+def resolve(path, site_files, table):
+    """Follow redirects from path until a file (or nothing) is served"""
+    hops, loop = table.follow(path, exists=lambda current: site_files.file_for(current) is not None)
+    if loop:
+        return Resolution(path, None, hops, loop=True)
+    if not hops:
+        return Resolution(path, site_files.file_for(path))
+    target = local_path(hops[-1].destination)
+    if target is None:
+        # Leaves the site: treat as served
+        return Resolution(path, hops[-1].destination, hops)
+    return Resolution(path, site_files.file_for(target), hops)
+
+
+class LinkReport:
+    """Findings of one check() run"""
+
+    def __init__(self):
+        self.pages = 0
+        self.references = 0
+        self.internal = 0
+        self.broken = []        # (Reference, Resolution)
+        self.redirected = []    # (Reference, Resolution)
+        self.chains = {}        # path -> Resolution with more than one hop
+        self.loops = {}         # path -> Resolution
+        self.orphans = []       # page paths
+        self.errors = []        # (path, error)
+
+
+def check(root='.', workers=1, pages=None, redirects=None):
+    """
+    Extract every reference from every page and resolve it. pages lists
+    the repo-relative pages that should be linked from somewhere (for the
+    orphan check); by default every HTML file.
+    """
+    report = LinkReport()
+    site_files = SiteFiles(root)
+    table = RedirectTable(load_redirects(root) if redirects is None else redirects)
+
+    files = list(iter_html_files(root))
+    report.pages = len(files)
+    inbound = {}
+    resolved = {}
+    for path, references, error in run_parallel(partial(_page_references, root), files, workers):
+        if error is not None:
+            report.errors.append((path, error))
+            continue
+        page_url = file_path_to_url(path)
+        report.references += len(references)
+        for reference in references:
+            site_path = internal_path(reference.url, page_url)
+            if site_path is None:
+                continue
+            report.internal += 1
+            if site_path not in resolved:
+                resolved[site_path] = resolve(site_path, site_files, table)
+            resolution = resolved[site_path]
+
+            if resolution.loop:
+                report.loops[site_path] = resolution
+            elif len(resolution.hops) > 1:
+                report.chains[site_path] = resolution
+            if resolution.file is None:
+                report.broken.append((reference, resolution))
+                continue
+            if resolution.hops:
+                report.redirected.append((reference, resolution))
+            if resolution.file != path and reference.attribute == 'href':
+                inbound.setdefault(resolution.file, set()).add(path)
+
+    candidates = pages if pages is not None else [rel_path(f, root) for f in files]
+    report.orphans = [path for path in candidates
+                      if path not in SHARED_FRAGMENTS and not inbound.get(path)]
+    return report
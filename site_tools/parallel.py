@@ -0,0 +1,81 @@
+"""
+Fan per-file work out across a process pool.
+
+Every maintenance script handles files independently, so the per-file
+function (update_file, get_canonical_from_file, ...) can run in worker
+processes. Anything the function prints is captured in the worker and
+replayed in input order, so the console report is the same as a serial run.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+
+from site_tools import instrument
+
+
+def default_workers():
+    """Number of worker processes to use when none is configured"""
+    return os.cpu_count() or 1
+
+
+def add_workers_argument(parser):
+    """Add the shared -j/--workers option to an argparse parser"""
+    parser.add_argument(
+        '-j', '--workers', type=int, default=default_workers(),
+        help=f"worker processes (default: {default_workers()}, 1 = serial)")
+
+
+def _start_worker():
+    """
+    Pool initializer: turn recording on in a worker that did not inherit it
+    (spawn/forkserver start methods import a fresh interpreter)
+    """
+    if not instrument.enabled:
+        instrument.install()
+
+
+def _call_captured(func, item):
+    """
+    Run func(item) in a worker, returning (result, printed output,
+    instrumentation numbers or None)
+    """
+    if instrument.enabled:
+        instrument.reset()
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = func(item)
+    return result, buffer.getvalue(), instrument.take() if instrument.enabled else None
+
+
+def run_parallel(func, items, workers=None, chunksize=None):
+    """
+    Call func(item) for every item and return the results in input order.
+
+    func must be a module-level function (or a functools.partial of one) so
+    it can be pickled. workers=1 runs serially in this process.
+    """
+    items = list(items)
+    workers = default_workers() if workers is None else workers
+
+    if workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+
+    if chunksize is None:
+        # A few chunks per worker keeps the pool busy without per-file IPC
+        chunksize = max(1, len(items) // (workers * 4))
+
+    results = []
+    initializer = _start_worker if instrument.enabled else None
+    with ProcessPoolExecutor(max_workers=min(workers, len(items)),
+                             initializer=initializer) as executor:
+        # map() yields in submission order, so output replays deterministically
+        for result, output, stats in executor.map(partial(_call_captured, func), items,
+                                                  chunksize=chunksize):
+            if output:
+                print(output, end='')
+            if stats is not None:
+                instrument.merge(stats)
+            results.append(result)
+    return results
@@ -0,0 +1,147 @@
+"""
+Precompressed .gz and .br siblings for every compressible file.
+
+compress_file() writes <file>.gz (gzip -9) and <file>.br (Brotli quality
+11, the slowest, smallest setting) next to a file, so a server that
+supports precompressed assets never compresses on the fly. A sibling is
+only kept when it is smaller than the file by at least MIN_SAVING;
+otherwise any old one is removed.
+
+Results are cached by content hash in .site-cache/precompress.json. The
+high-ratio settings are slow, so a file is only compressed again when
+its bytes, the settings or the available formats change, or a sibling
+has gone missing. Siblings of files that no longer exist are removed.
+
+The brotli module is optional (pip install brotli); without it only .gz
+siblings are written, and the .br ones follow on the first run after it
+is installed.
+"""
+import gzip
+import json
+import os
+
+from site_tools.cache import CACHE_DIR, check_unchanged, hash_bytes, stat_key, version_of, write_json
+from site_tools.files import iter_files, rel_path
+from site_tools.writes import write_atomic
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.mjs', '.json', '.svg', '.xml', '.xsl',
+                         '.txt', '.webmanifest', '.map')
+
+# Files smaller than this gain nothing once headers are counted
+MIN_SIZE = 256
+
+# Keep a sibling only if it saves at least this fraction of the file
+MIN_SAVING = 0.05
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+BROTLI_WINDOW = 22
+
+CACHE_NAME = 'precompress.json'
+
+
+def brotli_available():
+    return brotli is not None
+
+
+def formats():
+    """Sibling suffixes this environment can write"""
+    return ('gz', 'br') if brotli is not None else ('gz',)
+
+
+def _compress(data, fmt):
+    if fmt == 'gz':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY,
+                           lgwin=BROTLI_WINDOW)
+
+
+def compress_file(root, path, fmts):
+    """
+    Write the siblings of one file (path relative to root).
+    Returns (content hash, file bytes, {format: sibling bytes}) where
+    formats that did not save enough are missing.
+    """
+    file_path = os.path.join(root, path)
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    sizes = {}
+    for fmt in fmts:
+        sibling = f"{file_path}.{fmt}"
+        compressed = _compress(data, fmt)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            write_atomic(sibling, compressed)
+            sizes[fmt] = len(compressed)
+        elif os.path.exists(sibling):
+            os.remove(sibling)
+    return hash_bytes(data), len(data), sizes
+
+
+# Cached results are rebuilt whenever the settings or the compression code change
+SETTINGS_VERSION = version_of(COMPRESSIBLE_SUFFIXES, MIN_SIZE, MIN_SAVING, GZIP_LEVEL,
+                              BROTLI_QUALITY, BROTLI_WINDOW, _compress, compress_file)
+
+
+def find_files(root='.'):
+    """Repo-relative paths of every file that should get siblings"""
+    paths = []
+    for file_path in iter_files(root, COMPRESSIBLE_SUFFIXES):
+        if os.path.getsize(file_path) >= MIN_SIZE:
+            paths.append(rel_path(file_path, root))
+    return paths
+
+
+class CompressionCache:
+    """Path -> content hash and sibling sizes, stored in .site-cache/precompress.json"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, CACHE_NAME)
+        self.files = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == SETTINGS_VERSION:
+                self.files = data.get('files', {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, path, fmts):
+        """Cached entry if the file is unchanged and was compressed to every format in fmts"""
+        entry = self.files.get(path)
+        if not entry or entry['formats'] != list(fmts):
+            return None
+        file_path = os.path.join(self.root, path)
+        try:
+            if not check_unchanged(file_path, entry):
+                return None
+        except OSError:
+            return None
+        if all(os.path.exists(f"{file_path}.{fmt}") for fmt in entry['sizes']):
+            return entry
+        return None
+
+    def store(self, path, digest, fmts, size, sizes):
+        self.files[path] = {'hash': digest, 'stat': stat_key(os.path.join(self.root, path)),
+                            'formats': list(fmts), 'bytes': size, 'sizes': sizes}
+
+    def forget_missing(self, paths):
+        """Drop entries (and remove the siblings) of files not in paths; returns their count"""
+        removed = 0
+        for path in sorted(set(self.files) - set(paths)):
+            for fmt in self.files.pop(path)['sizes']:
+                sibling = os.path.join(self.root, f"{path}.{fmt}")
+                if os.path.exists(sibling):
+                    os.remove(sibling)
+            removed += 1
+        return removed
+
+    def save(self):
+        write_json(self.path, {'version': SETTINGS_VERSION, 'files': self.files})
@@ -0,0 +1,432 @@
+"""
+Pre-render CMS blog posts into static pages.
+
+render_post() fills blog/post-template.html with one post (cms.load_posts()
+shape) the way blog/post.html and blog-system.js do in the browser, but at
+build time, so the page is complete on first paint and for crawlers:
+
+  [POST_TITLE], [POST_DESCRIPTION], ...   the placeholders blog/README.md
+                                          lists; JSON-escaped inside JSON-LD
+  #post-title, #post-excerpt, #post-date, the elements the scripts fill in;
+  #read-time, #post-category, #post-image  they get the post's values
+  #post-content                           the body, portable text to HTML
+  article:section                         the post's first category
+
+blog-system.js is dropped from the page: it would try to load the post
+from /blog/posts/<slug>/index.md and replace the content with an error.
+
+Pages go to blog/posts/<slug>/index.html and start with GENERATED_MARKER.
+A page without the marker was written by hand and is never overwritten.
+The post and template hashes are cached in .site-cache/prerender.json, so
+a run only renders posts whose content or template changed, or whose page
+has been deleted. Later build steps may edit the pages (inline-header.py
+inlines the header); that does not make a post render again.
+"""
+import html
+import json
+import math
+import os
+import re
+from datetime import datetime
+from functools import partial
+
+from site_tools import cms
+from site_tools.cache import CACHE_DIR, hash_bytes, version_of, write_json
+from site_tools.parallel import run_parallel
+from site_tools.rules import OG_IMAGE_URL
+from site_tools.writes import write_if_changed
+
+TEMPLATE_PATH = 'blog/post-template.html'
+POSTS_DIR = 'blog/posts'
+CACHE_NAME = 'prerender.json'
+
+GENERATED_MARKER = '<!-- Generated by prerender-posts.py from the CMS; edit the post there, not here -->'
+
+WORDS_PER_MINUTE = 200
+
+# Slugs become directory names
+_SLUG_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]*$')
+_PLACEHOLDER_RE = re.compile(r'\[([A-Z_]+)\]')
+_IMAGE_URL_RE = re.compile(r'https?://[^"\s<>]*\[POST_IMAGE\]')
+_LD_JSON_RE = re.compile(r'(<script\b[^>]*application/ld\+json[^>]*>)(.*?)(</script\s*>)',
+                         re.IGNORECASE | re.DOTALL)
+_BLOG_SYSTEM_RE = re.compile(r'[ \t]*(?:<!--[^>]*[Bb]log system[^>]*-->\s*)?'
+                             r'<script\b[^>]*src="/assets/blog-system\.js[^"]*"[^>]*>\s*</script>\n?')
+_SECTION_RE = re.compile(r'(<meta\s+property="article:section"\s+content=")[^"]*(")')
+_DOCTYPE_RE = re.compile(r'<!doctype html>\n?', re.IGNORECASE)
+_STYLE_HIDDEN_RE = re.compile(r'\s*style="display:\s*none;?"')
+
+# Portable text: span marks and block styles the site's CSS has rules for
+_MARK_TAGS = {'strong': 'strong', 'em': 'em', 'code': 'code', 'underline': 'u',
+              'strike-through': 's'}
+_BLOCK_TAGS = {'h1': 'h1', 'h2': 'h2', 'h3': 'h3', 'h4': 'h4', 'h5': 'h5', 'h6': 'h6',
+               'blockquote': 'blockquote', 'normal': 'p'}
+_LIST_TAGS = {'bullet': 'ul', 'number': 'ol'}
+
+
+def _spans_to_html(block):
+    """A block's children as inline HTML, with marks and link annotations"""
+    links = {d.get('_key'): d.get('href') for d in block.get('markDefs') or ()
+             if d.get('_type') == 'link'}
+    out = []
+    for child in block.get('children') or ():
+        text = html.escape(child.get('text') or '', quote=False).replace('\n', '<br>')
+        for mark in child.get('marks') or ():
+            if mark in _MARK_TAGS:
+                tag = _MARK_TAGS[mark]
+                text = f"<{tag}>{text}</{tag}>"
+            elif links.get(mark):
+                text = f'<a href="{html.escape(links[mark])}">{text}</a>'
+        out.append(text)
+    return ''.join(out)
+
+
+def blocks_to_html(blocks):
+    """Portable text (a post body) as HTML; list items are grouped into (nested) lists"""
+    out = []
+    open_lists = []        # list tags currently open, outermost first; each has an open <li>
+
+    def close_list():
+        out.append(f"</li></{open_lists.pop()}>")
+
+    for block in blocks or ():
+        if not isinstance(block, dict):
+            continue
+        list_type = block.get('listItem') if block.get('_type') == 'block' else None
+        if not list_type:
+            while open_lists:
+                close_list()
+        else:
+            depth = max(1, int(block.get('level') or 1))
+            tag = _LIST_TAGS.get(list_type, 'ul')
+            while len(open_lists) > depth:
+                close_list()
+            if len(open_lists) == depth and open_lists[-1] != tag:
+                close_list()
+            if len(open_lists) == depth:
+                out.append('</li>')
+            while len(open_lists) < depth:
+                open_lists.append(tag)
+                out.append(f"<{tag}>")
+            out.append(f"<li>{_spans_to_html(block)}")
+            continue
+
+        if block.get('_type') == 'block':
+            tag = _BLOCK_TAGS.get(block.get('style') or 'normal', 'p')
+            out.append(f"<{tag}>{_spans_to_html(block)}</{tag}>")
+        elif block.get('_type') == 'image' and (block.get('asset') or {}).get('_ref'):
+            src = cms.image_url(block['asset']['_ref'])
+            alt = html.escape(block.get('alt') or '')
+            out.append(f'<img src="{html.escape(src)}" alt="{alt}" loading="lazy" />')
+    while open_lists:
+        close_list()
+    return '\n'.join(out)
+
+
+def _plain_text(blocks):
+    return ' '.join(child.get('text') or '' for block in blocks or () if isinstance(block, dict)
+                    for child in block.get('children') or () if isinstance(child, dict))
+
+
+def _format_date(value):
+    try:
+        date = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return value or ''
+    return f"{date:%B} {date.day}, {date.year}"
+
+
+def post_values(post):
+    """Placeholder name -> text for one post"""
+    description = post['metaDescription'] or post['excerpt'] or ''
+    published = post['publishedAt'] or ''
+    words = len(_plain_text(post['body']).split())
+    return {
+        'POST_TITLE': post['title'] or post['slug'],
+        'POST_DESCRIPTION': description,
+        'POST_EXCERPT': post['excerpt'] or description,
+        'POST_SLUG': post['slug'],
+        'POST_IMAGE': (cms.image_url(post['mainImageRef']) if post['mainImageRef']
+                       else OG_IMAGE_URL),
+        'PUBLISH_DATE': published,
+        'MODIFIED_DATE': post['_updatedAt'] or published,
+        'PUBLISH_DATE_FORMATTED': _format_date(published),
+        'READ_TIME': str(max(1, math.ceil(words / WORDS_PER_MINUTE))),
+        'CATEGORY': (post['categories'] or ['Field Service Management'])[0],
+        'TAGS': ', '.join(post['categories']),
+    }
+
+
+# The template placeholders post_values() fills (see blog/README.md)
+PLACEHOLDERS = ('POST_TITLE', 'POST_DESCRIPTION', 'POST_EXCERPT', 'POST_SLUG', 'POST_IMAGE',
+                'PUBLISH_DATE', 'MODIFIED_DATE', 'PUBLISH_DATE_FORMATTED', 'READ_TIME',
+                'CATEGORY', 'TAGS')
+
+
+def _fill(content, element_id, inner=None, attrs=None):
+    """
+    Replace the contents of the element with id element_id (nested elements
+    of the same name are matched up) and/or add attrs to its opening tag.
+    """
+    opening = re.search(rf'<([a-zA-Z][\w-]*)\b[^>]*\bid="{re.escape(element_id)}"[^>]*>', content)
+    if not opening:
+        return content
+    name = opening.group(1)
+    start_tag = opening.group(0)
+    if attrs:
+        start_tag = _STYLE_HIDDEN_RE.sub('', start_tag)
+        for attr, value in attrs.items():
+            text = f'{attr}="{html.escape(value)}"'
+            start_tag, count = re.subn(rf'\b{attr}="[^"]*"', lambda m: text, start_tag)
+            if not count:
+                start_tag = re.sub(r'\s*/?>$', lambda m: f' {text}{m.group(0)}', start_tag)
+    if inner is None or start_tag.endswith('/>') or name.lower() == 'img':
+        return content[:opening.start()] + start_tag + content[opening.end():]
+
+    tag_re = re.compile(rf'<(/?){name}\b[^>]*>', re.IGNORECASE)
+    depth = 1
+    pos = opening.end()
+    while depth:
+        match = tag_re.search(content, pos)
+        if match is None:
+            return content
+        depth += -1 if match.group(1) else 1
+        pos = match.end()
+    return content[:opening.start()] + start_tag + inner + match.group(0) + content[pos:]
+
+
+_SLOT_RE = re.compile('\x00(\\d+)\x00')
+
+
+def _html_text(value):
+    return html.escape(value)
+
+
+def _json_text(value):
+    # Inside a JSON string literal in a <script>: '</' must not close it
+    return json.dumps(value, ensure_ascii=False)[1:-1].replace('</', '<\\/')
+
+
+class PostTemplate:
+    """
+    blog/post-template.html split once into static text and slots, so
+    rendering a post is a join rather than a dozen passes over the page
+    """
+
+    def __init__(self, text):
+        self.slots = []     # (value name, escape function or None for raw HTML)
+
+        def slot(name, escape=_html_text):
+            self.slots.append((name, escape))
+            return f"\x00{len(self.slots) - 1}\x00"
+
+        def fill(part, escape):
+            part = _IMAGE_URL_RE.sub(lambda m: slot('POST_IMAGE', escape), part)
+            return _PLACEHOLDER_RE.sub(lambda m: slot(m.group(1), escape)
+                                       if m.group(1) in PLACEHOLDERS else m.group(0), part)
+
+        page = _BLOG_SYSTEM_RE.sub('', text)
+        parts = []
+        pos = 0
+        for match in _LD_JSON_RE.finditer(page):
+            parts.append(fill(page[pos:match.start()], _html_text))
+            parts.append(match.group(1) + fill(match.group(2), _json_text) + match.group(3))
+            pos = match.end()
+        parts.append(fill(page[pos:], _html_text))
+        page = ''.join(parts)
+
+        page = _SECTION_RE.sub(lambda m: m.group(1) + slot('CATEGORY') + m.group(2), page)
+        page = _fill(page, 'post-title', slot('POST_TITLE'))
+        page = _fill(page, 'post-excerpt', slot('POST_EXCERPT'))
+        page = _fill(page, 'post-date', slot('PUBLISH_DATE_FORMATTED'))
+        page = _fill(page, 'read-time', slot('READ_TIME') + ' min read')
+        page = _fill(page, 'post-category', slot('CATEGORY'))
+        page = _fill(page, 'post-content', '\n' + slot('BODY', None) + '\n')
+        image = re.search(r'<img\b[^>]*\bid="post-image"[^>]*>', page)
+        self.image_tag = image.group(0) if image else None
+        if image:
+            page = page[:image.start()] + slot('IMAGE_TAG', None) + page[image.end():]
+
+        doctype = _DOCTYPE_RE.match(page)
+        split = doctype.end() if doctype else 0
+        page = page[:split] + GENERATED_MARKER + '\n' + page[split:]
+        self.parts = _SLOT_RE.split(page)   # text, slot number, text, ...
+
+    def render(self, post):
+        """The page for post (cms.load_posts() shape)"""
+        values = post_values(post)
+        values['BODY'] = blocks_to_html(post['body'])
+        if self.image_tag and post['mainImageRef']:
+            values['IMAGE_TAG'] = _fill(self.image_tag, 'post-image', attrs={
+                'src': values['POST_IMAGE'], 'alt': post['mainImageAlt'] or values['POST_TITLE']})
+        else:
+            values['IMAGE_TAG'] = self.image_tag or ''
+        out = []
+        for i, part in enumerate(self.parts):
+            if i % 2 == 0:
+                out.append(part)
+            else:
+                name, escape = self.slots[int(part)]
+                out.append(escape(values[name]) if escape else values[name])
+        return ''.join(out)
+
+
+def render_post(template, post):
+    """The page for post, from the text of blog/post-template.html"""
+    return PostTemplate(template).render(post)
+
+
+# Cached pages are re-rendered whenever the rendering code changes
+RENDER_VERSION = version_of(PostTemplate.__init__, PostTemplate.render, post_values, blocks_to_html,
+                            _spans_to_html, _fill, _plain_text, _format_date, _html_text, _json_text,
+                            _MARK_TAGS, _BLOCK_TAGS, _LIST_TAGS, _BLOG_SYSTEM_RE.pattern,
+                            _PLACEHOLDER_RE.pattern, _IMAGE_URL_RE.pattern, PLACEHOLDERS,
+                            GENERATED_MARKER, OG_IMAGE_URL, cms.post_from_doc, cms.image_url)
+
+
+def post_digest(post):
+    return hash_bytes(json.dumps(post, sort_keys=True).encode('utf-8'))
+
+
+def page_path(slug):
+    return f"{POSTS_DIR}/{slug}/index.html"
+
+
+def is_generated(file_path):
+    """True if the page at file_path was written by this module (or does not exist)"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return GENERATED_MARKER in f.read(4096)
+    except FileNotFoundError:
+        return True
+
+
+class PrerenderCache:
+    """slug -> post hash and template hash, in .site-cache/prerender.json"""
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.path = os.path.join(root, CACHE_DIR, CACHE_NAME)
+        self.posts = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == RENDER_VERSION:
+                self.posts = data.get('posts', {})
+        except (OSError, ValueError):
+            pass
+
+    def is_fresh(self, slug, digest, template_digest):
+        entry = self.posts.get(slug)
+        return (entry is not None and entry['hash'] == digest and entry['template'] == template_digest
+                and os.path.exists(os.path.join(self.root, page_path(slug))))
+
+    def store(self, slug, digest, template_digest):
+        self.posts[slug] = {'hash': digest, 'template': template_digest}
+
+    def save(self):
+        write_json(self.path, {'version': RENDER_VERSION, 'posts': self.posts})
+
+
+def _render_one(template, root, post):
+    """run_parallel() worker (template is a PostTemplate): returns (page written, error)"""
+    path = page_path(post['slug'])
+    file_path = os.path.join(root, path)
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        written = write_if_changed(file_path, template.render(post))
+        if written:
+            print(f"✓ Rendered: {path}")
+        return written, None
+    except Exception as e:
+        print(f"❌ Error processing {path}: {e}")
+        return False, str(e)
+
+
+class PrerenderReport:
+    """What a run rendered, reused and left alone"""
+
+    def __init__(self):
+        self.posts = 0
+        self.rendered = 0
+        self.written = 0
+        self.cached = 0
+        self.skipped = []     # (slug, reason)
+        self.stale = []       # generated pages whose post is gone
+        self.pruned = False
+        self.errors = []
+
+    def print_summary(self):
+        print(f"\n{'=' * 50}")
+        print(f"{self.posts} CMS posts: {self.rendered} rendered ({self.written} pages changed), "
+              f"{self.cached} unchanged since last run")
+        for slug, reason in self.skipped:
+            print(f"  ○ {slug}: {reason}")
+        if self.stale:
+            what = 'Removed' if self.pruned else 'Found'
+            print(f"🧹 {what} {len(self.stale)} pre-rendered pages whose post is gone"
+                  f"{'' if self.pruned else ' (--prune removes them)'}")
+            for path in self.stale:
+                print(f"  - {path}")
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} post(s) could not be rendered")
+
+
+def run(root, posts, workers=1, use_cache=True, prune=False):
+    """
+    Render posts (cms.load_posts() shape) into blog/posts/. Only posts whose
+    content or template changed since the last run are rendered.
+    """
+    report = PrerenderReport()
+    with open(os.path.join(root, TEMPLATE_PATH), 'r', encoding='utf-8') as f:
+        template = f.read()
+    template_digest = hash_bytes(template.encode('utf-8'))
+    cache = PrerenderCache(root)
+    if not use_cache:
+        cache.posts = {}
+
+    todo = []
+    digests = {}
+    for post in posts:
+        slug = post['slug']
+        if slug in digests:
+            report.skipped.append((slug, 'duplicate slug'))
+            continue
+        if not _SLUG_RE.match(slug):
+            report.skipped.append((slug, 'slug is not a safe directory name'))
+            continue
+        digests[slug] = post_digest(post)
+        report.posts += 1
+        if cache.is_fresh(slug, digests[slug], template_digest):
+            report.cached += 1
+        elif not is_generated(os.path.join(root, page_path(slug))):
+            report.skipped.append((slug, f'{page_path(slug)} was written by hand'))
+        else:
+            todo.append(post)
+
+    worker = partial(_render_one, PostTemplate(template), root)
+    for post, (written, error) in zip(todo, run_parallel(worker, todo, workers)):
+        if error is not None:
+            report.errors.append((post['slug'], error))
+            continue
+        report.rendered += 1
+        report.written += written
+        cache.store(post['slug'], digests[post['slug']], template_digest)
+
+    report.pruned = prune
+    for slug in sorted(set(cache.posts) - set(digests)):
+        path = page_path(slug)
+        file_path = os.path.join(root, path)
+        if os.path.exists(file_path) and is_generated(file_path):
+            report.stale.append(path)
+            if not prune:
+                continue
+            os.remove(file_path)
+            try:
+                os.rmdir(os.path.dirname(file_path))
+            except OSError:
+                pass
+        del cache.posts[slug]
+
+    cache.save()
+    return report
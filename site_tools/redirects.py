@@ -0,0 +1,389 @@
+"""
+Redirect rules from _redirects (Netlify-style) and vercel.json, compiled
+into one lookup table.
+
+Vercel is the live host, so its rules apply before the file system. Rules
+from _redirects follow Netlify semantics: an existing file shadows them
+unless the status is forced ("301!"). In both, the first matching rule wins.
+
+Sources without parameters go in a dict; sources with parameters
+(Netlify "/blog/*" and "/:year/:slug", Vercel "/blog/:path*") go in a
+trie keyed by path segment. resolve() is one dict lookup plus a walk as
+deep as the path, however many rules there are.
+
+    table = RedirectTable(load_redirects('.'))
+    hit = table.resolve('/pricing.html', exists=False)
+    hit.destination  # '/pricing/'
+
+analyze() reports conflicting, duplicate and shadowed rules, chains,
+loops and rules that only one of the two files has; to_netlify() and
+to_vercel() write either format from the same rules.
+"""
+import json
+import os
+import re
+from urllib.parse import urlsplit
+
+from site_tools.urls import SITE_HOSTS
+
+NETLIFY_FILE = '_redirects'
+VERCEL_FILE = 'vercel.json'
+
+# Redirect hops followed before a path is reported as a loop
+MAX_HOPS = 10
+
+# Vercel source segments this module can compile: literals, ":name" and
+# ":name*"; regex groups and optional parameters are reported instead
+_PARAM_RE = re.compile(r':(\w+)([*+]?)$')
+
+LITERAL, PARAM, SPLAT = 'literal', 'param', 'splat'
+
+
+class Redirect:
+    """One rule: source path -> destination with its status and origin"""
+
+    def __init__(self, source, destination, status=301, force=False, origin='', line=None):
+        self.source = source
+        self.destination = destination
+        self.status = status
+        self.force = force
+        self.origin = origin
+        self.line = line
+
+    @property
+    def location(self):
+        """Where the rule is defined, for reports: '_redirects:12'"""
+        return f"{self.origin}:{self.line}" if self.line else self.origin
+
+    @property
+    def permanent(self):
+        return self.status in (301, 308)
+
+    def expand(self, path, params):
+        """This rule applied to path: placeholders in the destination filled in"""
+        destination = self.destination
+        for name in sorted(params, key=len, reverse=True):
+            destination = destination.replace(f':{name}', params[name])
+        return Redirect(path, destination, self.status, self.force, self.origin, self.line)
+
+    def __repr__(self):
+        return f"Redirect({self.source!r} -> {self.destination!r}, {self.status})"
+
+
+def parse_netlify(path):
+    """Rules from a Netlify _redirects file (comments and blank lines skipped)"""
+    redirects = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            parts = line.split('#', 1)[0].split()
+            if len(parts) < 2:
+                continue
+            status, force = 301, False
+            if len(parts) > 2:
+                code = parts[2]
+                force = code.endswith('!')
+                status = int(code.rstrip('!')) if code.rstrip('!').isdigit() else 301
+            redirects.append(Redirect(parts[0], parts[1], status, force,
+                                      os.path.basename(path), number))
+    return redirects
+
+
+def parse_vercel(path):
+    """Rules from the "redirects" array of vercel.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    redirects = []
+    for entry in config.get('redirects', []):
+        status = entry.get('statusCode') or (308 if entry.get('permanent', True) else 307)
+        redirects.append(Redirect(entry['source'], entry['destination'], status, True,
+                                  os.path.basename(path)))
+    return redirects
+
+
+def load_redirects(root='.'):
+    """vercel.json rules first (they win), then _redirects"""
+    redirects = []
+    vercel_path = os.path.join(root, VERCEL_FILE)
+    if os.path.exists(vercel_path):
+        redirects.extend(parse_vercel(vercel_path))
+    netlify_path = os.path.join(root, NETLIFY_FILE)
+    if os.path.exists(netlify_path):
+        redirects.extend(parse_netlify(netlify_path))
+    return redirects
+
+
+def compile_source(source):
+    """
+    A source as a list of (kind, value) segments, or None if it has no
+    parameters (an exact match). Raises ValueError for sources the trie
+    can't represent.
+    """
+    segments = source.split('?', 1)[0].split('/')[1:]
+    compiled = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '*':
+            if not last:
+                raise ValueError(f"'*' must be the last segment: {source}")
+            compiled.append((SPLAT, 'splat'))
+        elif segment.startswith(':'):
+            match = _PARAM_RE.match(segment)
+            if not match:
+                raise ValueError(f"unsupported parameter {segment!r}: {source}")
+            if match.group(2):
+                if not last:
+                    raise ValueError(f"{segment!r} must be the last segment: {source}")
+                compiled.append((SPLAT, match.group(1)))
+            else:
+                compiled.append((PARAM, match.group(1)))
+        elif any(char in segment for char in '()*?+'):
+            raise ValueError(f"regex sources are not supported: {source}")
+        else:
+            compiled.append((LITERAL, segment))
+    if all(kind == LITERAL for kind, _ in compiled):
+        return None
+    return compiled
+
+
+def local_path(destination):
+    """Site path of a redirect destination, or None if it leaves the site"""
+    if destination.startswith(('http://', 'https://')):
+        parts = urlsplit(destination)
+        if parts.hostname not in SITE_HOSTS:
+            return None
+        destination = parts.path or '/'
+    return destination.split('?', 1)[0].split('#', 1)[0]
+
+
+class _Node:
+    __slots__ = ('literals', 'param', 'splats', 'rules')
+
+    def __init__(self):
+        self.literals = {}   # segment -> _Node
+        self.param = None    # _Node for any one segment
+        self.splats = []     # (index, Redirect, names): match the rest of the path
+        self.rules = []      # (index, Redirect, names): match ending here
+
+
+class RedirectTable:
+    """
+    Compiled lookup over redirect rules. Rules keep their file order as
+    priority: vercel.json before _redirects, then line order.
+    """
+
+    def __init__(self, redirects):
+        self.redirects = list(redirects)
+        self.exact = {}         # source -> [(index, Redirect)] in priority order
+        self.root = _Node()
+        self.patterns = 0
+        self.unsupported = []   # (Redirect, reason)
+        for index, redirect in enumerate(self.redirects):
+            try:
+                compiled = compile_source(redirect.source)
+            except ValueError as e:
+                self.unsupported.append((redirect, str(e)))
+                continue
+            if compiled is None:
+                self.exact.setdefault(redirect.source.split('?', 1)[0], []).append((index, redirect))
+            else:
+                self._insert(compiled, index, redirect)
+
+    def _insert(self, compiled, index, redirect):
+        node = self.root
+        names = []
+        for kind, value in compiled:
+            if kind == LITERAL:
+                node = node.literals.setdefault(value, _Node())
+            elif kind == PARAM:
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+                names.append(value)
+            else:
+                node.splats.append((index, redirect, names + [value]))
+                self.patterns += 1
+                return
+        node.rules.append((index, redirect, names))
+        self.patterns += 1
+
+    def _pattern_matches(self, segments):
+        """Every (index, Redirect, params) whose pattern matches the segments"""
+        matches = []
+        stack = [(self.root, 0, ())]
+        while stack:
+            node, depth, values = stack.pop()
+            for index, redirect, names in node.splats:
+                rest = '/'.join(segments[depth:])
+                matches.append((index, redirect, dict(zip(names, values + (rest,)))))
+            if depth == len(segments):
+                for index, redirect, names in node.rules:
+                    matches.append((index, redirect, dict(zip(names, values))))
+                continue
+            segment = segments[depth]
+            child = node.literals.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1, values))
+            if node.param is not None and segment:
+                stack.append((node.param, depth + 1, values + (segment,)))
+        return matches
+
+    def matches(self, path):
+        """Every rule matching path as (index, Redirect, params), best first"""
+        path = path.split('?', 1)[0]
+        found = [(index, redirect, {}) for index, redirect in self.exact.get(path, ())]
+        if self.patterns:
+            found.extend(self._pattern_matches(path.split('/')[1:]))
+        found.sort(key=lambda match: match[0])
+        return found
+
+    def resolve(self, path, exists=False):
+        """
+        The rule that applies to path with its placeholders filled in, or
+        None. exists says whether a file is served at path; only forced
+        rules redirect an existing file.
+        """
+        path = path.split('?', 1)[0]
+        best = None
+        for index, redirect in self.exact.get(path, ()):
+            if redirect.force or not exists:
+                best = (index, redirect, None)
+                break
+        if self.patterns:
+            for index, redirect, params in self._pattern_matches(path.split('/')[1:]):
+                if (redirect.force or not exists) and (best is None or index < best[0]):
+                    best = (index, redirect, params)
+        if best is None:
+            return None
+        index, redirect, params = best
+        return redirect.expand(path, params) if params else redirect
+
+    def follow(self, path, exists=None):
+        """
+        Redirects applied from path until one doesn't redirect again:
+        (hops, loop). exists(path) says whether a file is served there.
+        """
+        hops = []
+        seen = {path}
+        current = path
+        while True:
+            redirect = self.resolve(current, exists=exists(current) if exists else False)
+            if redirect is None:
+                return hops, False
+            hops.append(redirect)
+            destination = local_path(redirect.destination)
+            if destination is None:
+                return hops, False
+            if destination in seen or len(hops) > MAX_HOPS:
+                return hops, True
+            seen.add(destination)
+            current = destination
+
+
+class RedirectReport:
+    """Findings of analyze()"""
+
+    def __init__(self):
+        self.conflicts = []     # (winning Redirect, ignored Redirect) with different targets
+        self.duplicates = []    # (first Redirect, repeated Redirect) in the same file
+        self.shadowed = []      # (Redirect, earlier pattern Redirect that always wins)
+        self.chains = []        # hop lists longer than one, one per starting rule
+        self.loops = []         # hop lists that come back to a path already visited
+        self.unsupported = []   # (Redirect, reason)
+        self.only_in = {}       # origin -> rules no other file has
+
+
+def _key(redirect):
+    return (redirect.source, redirect.destination, redirect.permanent)
+
+
+def analyze(table, exists=None):
+    """Check the rules in table; exists(path) is as for RedirectTable.follow()"""
+    report = RedirectReport()
+    report.unsupported = list(table.unsupported)
+
+    by_source = {}
+    for redirect in table.redirects:
+        by_source.setdefault(redirect.source, []).append(redirect)
+    for source, rules in by_source.items():
+        first = rules[0]
+        for other in rules[1:]:
+            if (other.destination, other.permanent) != (first.destination, first.permanent):
+                report.conflicts.append((first, other))
+            elif other.origin == first.origin:
+                report.duplicates.append((first, other))
+
+    for source, entries in table.exact.items():
+        index, redirect = entries[0]
+        for match_index, match, params in table.matches(source):
+            if match_index >= index:
+                break
+            if match.force or not redirect.force:
+                report.shadowed.append((redirect, match))
+                break
+
+    for source in table.exact:
+        hops, loop = table.follow(source, exists)
+        if loop:
+            report.loops.append(hops)
+        elif len(hops) > 1:
+            report.chains.append(hops)
+
+    origins = {redirect.origin for redirect in table.redirects}
+    if len(origins) > 1:
+        keys = {}
+        for redirect in table.redirects:
+            keys.setdefault(_key(redirect), set()).add(redirect.origin)
+        for origin in sorted(origins):
+            report.only_in[origin] = [r for r in table.redirects
+                                      if r.origin == origin and keys[_key(r)] == {origin}]
+    return report
+
+
+def _netlify_pattern(source, destination):
+    """Vercel ':name*' sources become Netlify '*' with ':splat' in the destination"""
+    segments = source.split('/')
+    last = _PARAM_RE.match(segments[-1])
+    if last and last.group(2):
+        segments[-1] = '*'
+        destination = re.sub(rf':{last.group(1)}\b', ':splat', destination)
+    return '/'.join(segments), destination
+
+
+def _vercel_pattern(source, destination):
+    """Netlify '*' sources become Vercel ':splat*'"""
+    if source.endswith('/*'):
+        source = source[:-1] + ':splat*'
+    return source, destination
+
+
+def to_netlify(redirects, header=()):
+    """_redirects file content for the rules, one per line"""
+    lines = [f"# {line}" if line else '#' for line in header]
+    for redirect in redirects:
+        source, destination = _netlify_pattern(redirect.source, redirect.destination)
+        # Vercel rules apply before the file system, which Netlify spells "!"
+        status = f"{redirect.status}{'!' if redirect.force else ''}"
+        lines.append(f"{source} {destination} {status}")
+    return '\n'.join(lines) + '\n'
+
+
+def to_vercel(redirects):
+    """The "redirects" array of vercel.json for the rules"""
+    entries = []
+    for redirect in redirects:
+        source, destination = _vercel_pattern(redirect.source, redirect.destination)
+        entry = {'source': source, 'destination': destination}
+        if redirect.status in (301, 302, 303):
+            entry['statusCode'] = redirect.status
+        else:
+            entry['permanent'] = redirect.permanent
+        entries.append(entry)
+    return entries
+
+
+def vercel_config_with(path, redirects):
+    """vercel.json content with its "redirects" replaced, other keys untouched"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['redirects'] = to_vercel(redirects)
+    return json.dumps(config, indent=2, ensure_ascii=False) + '\n'
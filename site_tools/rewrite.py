@@ -0,0 +1,206 @@
+"""
+Single-pass rewrite engine for site-wide HTML updates.
+
+Each one-off update (CSS version bump, OG image swap, ...) is a Rule: a
+regex, a replacement and a file filter. A RuleSet runs every rule that
+applies to a file over the text in memory, so each file is read once and
+written at most once no matter how many rules run.
+
+Rules run in registration order, each over the previous rule's output.
+Separate compiled regexes are much faster than one combined alternation:
+each one can skip ahead to its literal prefix instead of trying every
+branch at every position.
+"""
+import re
+from fnmatch import fnmatch
+from functools import partial
+
+from site_tools import instrument
+from site_tools.cache import hash_bytes, version_of
+from site_tools.files import iter_html_files, rel_path
+from site_tools.parallel import run_parallel
+from site_tools.writes import TextFile
+
+
+class Rule:
+    """A named pattern/replacement pair plus the files it applies to"""
+
+    def __init__(self, name, pattern, replacement, flags=0,
+                 include=('*',), exclude=(), description=''):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.flags = flags
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.description = description or name
+        self.regex = re.compile(pattern, flags)
+        # Changes whenever the pattern, replacement or file filter changes
+        self.version = version_of(pattern, flags, replacement, self.include, self.exclude)
+
+    def applies_to(self, path):
+        """Check the rule's include/exclude globs against a repo-relative path"""
+        if not any(fnmatch(path, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch(path, pattern) for pattern in self.exclude)
+
+    def expand(self, match):
+        """Build the replacement text for a match of this rule's own regex"""
+        if callable(self.replacement):
+            return self.replacement(match)
+        return match.expand(self.replacement)
+
+    def __repr__(self):
+        return f'Rule({self.name!r})'
+
+
+class RuleSet:
+    """An ordered collection of rules, applied one after another"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {', '.join(sorted(duplicates))}")
+
+    def rules_for(self, path):
+        """Return the indexes of the rules that apply to a repo-relative path"""
+        return tuple(i for i, rule in enumerate(self.rules) if rule.applies_to(path))
+
+    def versions_for(self, path):
+        """{manifest check name: version} for the rules that apply to path"""
+        return {f'rule:{self.rules[i].name}': self.rules[i].version
+                for i in self.rules_for(path)}
+
+    def apply(self, content, path):
+        """
+        Run every applicable rule over content, in order.
+        Returns (new_content, hits) where hits maps rule name -> replacements
+        that actually changed the text.
+        """
+        hits = {}
+        for i in self.rules_for(path):
+            rule = self.rules[i]
+            changed = 0
+
+            def replace(match):
+                nonlocal changed
+                new_text = rule.expand(match)
+                if new_text != match.group(0):
+                    changed += 1
+                return new_text
+
+            content, matches = rule.regex.subn(replace, content)
+            if instrument.enabled:
+                instrument.count_regex(f'rule:{rule.name}', matches)
+            if changed:
+                hits[rule.name] = changed
+        return content, hits
+
+
+class RewriteReport:
+    """Per-run totals: files scanned/changed and hit counts per rule"""
+
+    def __init__(self, rules):
+        self.files_scanned = 0
+        self.files_cached = 0
+        self.files_changed = []
+        self.errors = []
+        self.hits = {rule.name: 0 for rule in rules}
+        self.files_per_rule = {rule.name: 0 for rule in rules}
+
+    def add(self, path, hits):
+        self.files_scanned += 1
+        if hits:
+            self.files_changed.append(path)
+        for name, count in hits.items():
+            self.hits[name] += count
+            self.files_per_rule[name] += 1
+
+    def print_summary(self, ruleset):
+        print("\n" + "=" * 60)
+        print(f"📄 Scanned {self.files_scanned} files, changed {len(self.files_changed)}")
+        if self.files_cached:
+            print(f"⏭️  Skipped {self.files_cached} unchanged files (already up to date)")
+        print("=" * 60)
+        for rule in ruleset.rules:
+            print(f"  {rule.name:<20} {self.hits[rule.name]:>5} hits in "
+                  f"{self.files_per_rule[rule.name]:>4} files  ({rule.description})")
+        if self.errors:
+            print(f"\n❌ {len(self.errors)} file(s) could not be processed")
+
+
+def _apply_to_file(ruleset, file_path, root, dry_run, diff=False):
+    """
+    Rewrite one file; returns (hits, bytes now on disk, unified diff or '').
+    The file is only written when its bytes change.
+    """
+    page = TextFile.read(file_path)
+    path = rel_path(file_path, root)
+    new_content, hits = ruleset.apply(page.text, path)
+    patch = page.diff(new_content, path) if diff else ''
+    page.write(new_content, dry_run=dry_run)
+    return hits, page.data, patch
+
+
+def rewrite_file(ruleset, file_path, root='.', dry_run=False):
+    """Read a file once, apply the rule set, write it back only if it changed"""
+    return _apply_to_file(ruleset, file_path, root, dry_run)[0]
+
+
+def _rewrite_one(ruleset, root, dry_run, verbose, diff, file_path):
+    """Per-file worker for run(): returns (hits, content hash, diff, error)"""
+    try:
+        hits, data, patch = _apply_to_file(ruleset, file_path, root, dry_run, diff)
+    except Exception as e:
+        print(f"❌ Error processing {file_path}: {e}")
+        return None, None, '', str(e)
+    if hits and verbose:
+        applied = ', '.join(f"{name} x{count}" for name, count in hits.items())
+        print(f"✓ {'Would update' if dry_run else 'Updated'}: {file_path} ({applied})")
+    return hits, hash_bytes(data), patch, None
+
+
+def run(rules, root='.', files=None, dry_run=False, verbose=True, workers=1,
+        manifest=None, diffs=None):
+    """
+    Apply rules to every HTML file under root (or the given files) in one pass.
+    With workers > 1 the files are spread over a process pool; the report
+    and console output stay in path order. With a writes.DiffSet as diffs,
+    every change is added to it as a unified diff.
+
+    With a cache.Manifest, files whose content already went through the
+    current version of every applicable rule are skipped without being read.
+    """
+    ruleset = rules if isinstance(rules, RuleSet) else RuleSet(rules)
+    report = RewriteReport(ruleset.rules)
+
+    if files is None:
+        files = iter_html_files(root)
+    files = list(files)
+
+    if manifest is not None:
+        stale = []
+        for file_path in files:
+            if manifest.is_fresh(file_path, ruleset.versions_for(rel_path(file_path, root))):
+                report.files_cached += 1
+            else:
+                stale.append(file_path)
+        files = stale
+
+    worker = partial(_rewrite_one, ruleset, root, dry_run, verbose, diffs is not None)
+    for file_path, (hits, digest, patch, error) in zip(files, run_parallel(worker, files, workers)):
+        if error is not None:
+            report.errors.append((file_path, error))
+            continue
+        report.add(file_path, hits)
+        if diffs is not None:
+            diffs.add(patch)
+        if manifest is not None and not dry_run:
+            manifest.record_hash(file_path, digest,
+                                 ruleset.versions_for(rel_path(file_path, root)))
+
+    if manifest is not None:
+        manifest.save()
+    return report
@@ -0,0 +1,83 @@
+"""
+Registered rewrite rules for release updates.
+
+Each rule replaces one of the old one-off scripts (update-css-version.py,
+update-header-version.py, fix-logo-paths.py, update-og-images.py,
+fix-sanity-cdn.py). Bump the version constants here, then run
+release-rewrite.py to apply every rule in a single pass over the site.
+"""
+import re
+
+from site_tools.rewrite import Rule
+
+# Current asset versions
+CSS_VERSION = 31
+HEADER_JS_VERSION = 5
+
+# Base URL for the social card image
+OG_IMAGE_URL = "https://www.creativejobhub.com/assets/illustrations/og-image-main.png"
+
+# Old OG/Twitter image locations (various formats)
+OLD_OG_PATTERNS = [
+    r'https?://(?:www\.)?creativejobhub\.com/assets/og-dark\.jpg',
+    r'https?://(?:www\.)?creativejobhub\.com/assets/og-[a-z-]+\.jpg',
+    r'https?://(?:www\.)?creativejobhub\.com/assets/og-images/[a-z-]+\.jpg',
+    r'/assets/images/blog/default-hero-1200\.svg',
+]
+
+OLD_SANITY_CDN = 'https://cdn.jsdelivr.net/npm/@sanity/client@6.22.7/dist/index.browser.js'
+NEW_SANITY_CDN = 'https://cdn.jsdelivr.net/npm/@sanity/client@6.22.7/dist/sanityClient.browser.min.js'
+
+CSS_VERSION_RULE = Rule(
+    'css-version',
+    r'site\.(?P<min>min\.)?css\?v=\d+',
+    rf'site.\g<min>css?v={CSS_VERSION}',
+    description=f'site.css/site.min.css -> v={CSS_VERSION}',
+)
+
+HEADER_VERSION_RULE = Rule(
+    'header-version',
+    r'header\.js\?v=\d+',
+    f'header.js?v={HEADER_JS_VERSION}',
+    description=f'header.js -> v={HEADER_JS_VERSION}',
+)
+
+LOGO_PATH_RULE = Rule(
+    'logo-path',
+    r'/assets/CJH_circle_logo\.png',
+    '/assets/illustrations/CJH_Circle_Logo.png',
+    flags=re.IGNORECASE,
+    description='CJH_circle_logo.png -> illustrations/CJH_Circle_Logo.png',
+)
+
+OG_IMAGE_RULE = Rule(
+    'og-image',
+    '|'.join(OLD_OG_PATTERNS),
+    OG_IMAGE_URL,
+    exclude=(
+        'industries/*', '*/industries/*',  # Already updated, at any depth
+        'blog/post-template.html',  # Template file
+        'blog/posts/_template.html',  # Template file
+        'assets/og-images/generator.html',  # Generator tool
+    ),
+    description='old OG/Twitter images -> og-image-main.png',
+)
+
+SANITY_CDN_RULE = Rule(
+    'sanity-cdn',
+    re.escape(OLD_SANITY_CDN),
+    NEW_SANITY_CDN,
+    exclude=('admin/*', '*/admin/*'),
+    description='Sanity client index.browser.js -> sanityClient.browser.min.js',
+)
+
+# Every rule a release runs, in the order they run
+RELEASE_RULES = [
+    CSS_VERSION_RULE,
+    HEADER_VERSION_RULE,
+    LOGO_PATH_RULE,
+    OG_IMAGE_RULE,
+    SANITY_CDN_RULE,
+]
+
+RULES_BY_NAME = {rule.name: rule for rule in RELEASE_RULES}
@@ -0,0 +1,407 @@
+"""
+Build sitemap.xml (and sitemap-index.xml) from the pages in the tree.
+
+collect_pages() walks the site once, pruning node_modules and the
+directories robots.txt disallows, and keeps every page that:
+
+  - has a canonical URL on this site that maps back to the page itself
+    (backups and copies that point their canonical elsewhere drop out, as
+    do templates with placeholder canonicals)
+  - is not marked noindex
+  - is not matched by EXCLUDE
+
+Canonicals and robots tags come from the persistent head index, so only
+pages edited since the last run are read.
+
+CMS posts with no pre-rendered page in blog/posts/<slug>/ are only served
+by blog/post.html?slug=...; cms_pages() lists them from a Sanity export or
+the snapshot sync-sanity.py keeps (the default when it exists), with the
+post's _updatedAt as lastmod. The snapshot answers that with one indexed
+query (Snapshot.updated()) instead of loading every document. lastmod comes from the last
+commit that touched each page (one `git log` for the whole tree, stopped
+as soon as every page has a date); pages with uncommitted changes, or
+outside git, use their mtime.
+
+SitemapWriter streams <url> entries to disk and starts a new shard when
+the next entry would break the protocol limits (50,000 URLs or 50 MB per
+file). Files are only replaced when their content changes.
+"""
+import os
+import re
+import subprocess
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from site_tools import cms
+from site_tools.files import iter_html_files, rel_path
+from site_tools.headindex import HeadIndex
+from site_tools.snapshot import SNAPSHOT_PATH, Snapshot
+from site_tools.urls import SITE_URL, url_to_file_path
+from site_tools.writes import replace_if_changed
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+# Protocol limits per sitemap file
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+
+SITEMAP_NAME = 'sitemap.xml'
+INDEX_NAME = 'sitemap-index.xml'
+# Hand-maintained sitemaps that are listed in the index as they are
+EXTRA_SITEMAPS = ('video-sitemap.xml',)
+
+# Pages never listed even though they have a self-canonical
+EXCLUDE = (
+    'thanks.html',
+    'assets/*',
+    'billing/*',
+    '*-test.html',
+    '*-preview.html',
+    '*-old.html',
+    '*-old-backup.html',
+    '*template*.html',
+)
+
+# (glob, changefreq, priority); first match wins
+PAGE_HINTS = (
+    ('cms:*', 'monthly', '0.8'),
+    ('index.html', 'weekly', '1.0'),
+    ('blog/index.html', 'weekly', '0.7'),
+    ('blog/posts/*', 'yearly', '0.5'),
+    ('features/*', 'monthly', '0.9'),
+    ('industries/*', 'monthly', '0.9'),
+    ('field-service-management/*', 'monthly', '0.9'),
+    ('*-software/index.html', 'monthly', '0.9'),
+    ('compare/index.html', 'monthly', '0.7'),
+    ('compare/*', 'monthly', '0.6'),
+    ('contact.html', 'yearly', '0.6'),
+    ('privacy.html', 'yearly', '0.3'),
+    ('terms.html', 'yearly', '0.3'),
+    ('*', 'monthly', '0.8'),
+)
+
+# Both hosts serve the site; canonicals are compared on the www form
+_HOST_RE = re.compile(r'^https?://(?:www\.)?creativejobhub\.com(?=/|$)')
+
+
+def robots_disallowed(root='.'):
+    """Path prefixes disallowed for every crawler ('User-agent: *')"""
+    prefixes = []
+    try:
+        with open(os.path.join(root, 'robots.txt'), 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return prefixes
+    agents = []
+    in_rules = False
+    for line in lines:
+        line = line.split('#', 1)[0].strip()
+        if not line or ':' not in line:
+            continue
+        key, value = (part.strip() for part in line.split(':', 1))
+        key = key.lower()
+        if key == 'user-agent':
+            if in_rules:
+                agents = []
+                in_rules = False
+            agents.append(value)
+        else:
+            in_rules = True
+            if key == 'disallow' and value and '*' in agents:
+                prefixes.append(value)
+    return prefixes
+
+
+def normalize_url(url):
+    """Canonical URL in its www form, or None if it is not on this site"""
+    if not url:
+        return None
+    url = url.strip()
+    if not _HOST_RE.match(url):
+        return None
+    return _HOST_RE.sub(SITE_URL, url)
+
+
+def page_hints(path):
+    for pattern, changefreq, priority in PAGE_HINTS:
+        if fnmatch(path, pattern):
+            return changefreq, priority
+    return None, None
+
+
+class Page:
+    """One sitemap entry"""
+
+    def __init__(self, path, url, lastmod=None):
+        self.path = path
+        self.url = url
+        self.lastmod = lastmod
+        self.changefreq, self.priority = page_hints(path)
+
+
+def collect_pages(root='.', index=None):
+    """
+    Walk the tree and return (pages, skipped): Page objects in path order,
+    and (path, reason) for every HTML file left out.
+    """
+    disallowed = robots_disallowed(root)
+    prune = [prefix.strip('/') for prefix in disallowed if prefix.endswith('/')]
+    files = list(iter_html_files(root, skip_paths=prune))
+    index = (index or HeadIndex(root)).refresh(files)
+
+    pages = []
+    skipped = []
+    seen = {}
+    for file_path in files:
+        path = rel_path(file_path, root)
+        head = index.get(path) or {}
+        url = normalize_url(head.get('canonical'))
+        robots = (head.get('robots') or '').lower()
+        if any(fnmatch(path, pattern) for pattern in EXCLUDE):
+            skipped.append((path, 'excluded'))
+        elif 'noindex' in robots:
+            skipped.append((path, 'noindex'))
+        elif url is None:
+            skipped.append((path, 'no canonical on this site'))
+        elif url_to_file_path(url) != path:
+            skipped.append((path, f"canonical is {url}"))
+        elif any(url[len(SITE_URL):].startswith(prefix) for prefix in disallowed):
+            skipped.append((path, 'disallowed by robots.txt'))
+        elif url in seen:
+            skipped.append((path, f"duplicate of {seen[url]}"))
+        else:
+            seen[url] = path
+            pages.append(Page(path, url))
+    return pages, skipped
+
+
+def post_dates(export):
+    """{slug: _updatedAt (or publishedAt)} of the published posts in an export or snapshot"""
+    with open(export, 'rb') as f:
+        if f.read(len(cms.SQLITE_MAGIC)) == cms.SQLITE_MAGIC:
+            with Snapshot(export) as store:
+                return store.updated()
+    return {post['slug']: post['_updatedAt'] or post['publishedAt']
+            for post in cms.load_posts(cms.read_export(export))}
+
+
+def cms_pages(root, dates, seen=()):
+    """
+    Page objects ('cms:<slug>') for the posts in dates ({slug: timestamp})
+    that have no page in blog/posts/, and no URL in seen, in slug order
+    """
+    pages = []
+    for slug in sorted(dates):
+        if os.path.exists(os.path.join(root, 'blog', 'posts', slug, 'index.html')):
+            continue
+        url = SITE_URL + cms.post_url(quote(slug))
+        if url not in seen:
+            pages.append(Page(f'cms:{slug}', url, (dates[slug] or '')[:10] or None))
+    return pages
+
+
+def _mtime_date(path):
+    mtime = os.path.getmtime(path)
+    return datetime.fromtimestamp(mtime, timezone.utc).strftime('%Y-%m-%d')
+
+
+def _git_prefix(root):
+    """root's path inside its git checkout ('' at the top); raises outside git"""
+    return subprocess.run(['git', '-C', root, 'rev-parse', '--show-prefix'],
+                          capture_output=True, text=True, check=True).stdout.strip()
+
+
+def git_dates(root, paths):
+    """
+    {path: YYYY-MM-DD of the last commit touching it} for the given
+    repo-relative paths. Reads `git log` newest first and stops once every
+    path has a date. Returns {} outside a git checkout.
+    """
+    wanted = set(paths)
+    dates = {}
+    if not wanted:
+        return dates
+    try:
+        prefix = _git_prefix(root)
+        log = subprocess.Popen(
+            ['git', '-C', root, '-c', 'core.quotepath=off', 'log', '--format=%x00%cI',
+             '--name-only', '--no-renames', '--', '.'],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, encoding='utf-8', errors='replace')
+    except (OSError, subprocess.CalledProcessError):
+        return dates
+    date = None
+    with log:
+        for line in log.stdout:
+            line = line.rstrip('\n')
+            if line.startswith('\0'):
+                date = line[1:11]
+            elif line and date:
+                path = line[len(prefix):] if line.startswith(prefix) else line
+                if path in wanted and path not in dates:
+                    dates[path] = date
+                    if len(dates) == len(wanted):
+                        log.kill()
+                        break
+    return dates
+
+
+def git_dirty(root):
+    """Repo-relative paths with uncommitted changes (or untracked)"""
+    try:
+        prefix = _git_prefix(root)
+        result = subprocess.run(
+            ['git', '-C', root, 'status', '--porcelain', '-z', '--untracked-files=all', '--', '.'],
+            capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return set()
+    dirty = set()
+    entries = iter(result.stdout.split('\0'))
+    for entry in entries:
+        if len(entry) < 4:
+            continue
+        if entry[0] in 'RC':
+            next(entries, None)  # rename source
+        path = entry[3:]
+        dirty.add(path[len(prefix):] if path.startswith(prefix) else path)
+    return dirty
+
+
+def assign_lastmod(pages, root='.', source='git'):
+    """Fill in Page.lastmod from git history ('git') or file mtimes ('mtime')"""
+    dates = {}
+    if source == 'git':
+        dirty = git_dirty(root)
+        dates = git_dates(root, [page.path for page in pages if page.path not in dirty])
+    for page in pages:
+        page.lastmod = dates.get(page.path) or _mtime_date(os.path.join(root, page.path))
+
+
+def shard_name(number):
+    """1 -> sitemap.xml, 2 -> sitemap-2.xml, ..."""
+    return SITEMAP_NAME if number == 1 else f"sitemap-{number}.xml"
+
+
+class SitemapWriter:
+    """
+    Streams <url> entries into sitemap.xml, sitemap-2.xml, ... starting a
+    new shard before either protocol limit is reached.
+    """
+
+    HEADER = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_NS}">\n'
+    FOOTER = '</urlset>\n'
+
+    def __init__(self, directory='.', max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.shards = []      # [{'name', 'urls', 'lastmod', 'changed'}]
+        self._file = None
+        self._urls = 0
+        self._bytes = 0
+
+    def _open(self):
+        name = shard_name(len(self.shards) + 1)
+        self.shards.append({'name': name, 'urls': 0, 'lastmod': None, 'changed': False})
+        self._file = open(os.path.join(self.directory, name + '.tmp'), 'wb')
+        header = self.HEADER.encode('utf-8')
+        self._file.write(header)
+        self._urls = 0
+        self._bytes = len(header)
+
+    def _close_shard(self):
+        self._file.write(self.FOOTER.encode('utf-8'))
+        self._file.close()
+        self._file = None
+        shard = self.shards[-1]
+        path = os.path.join(self.directory, shard['name'])
+        shard['changed'] = replace_if_changed(path + '.tmp', path)
+
+    def add(self, url, lastmod=None, changefreq=None, priority=None):
+        entry = f"  <url>\n    <loc>{escape(url)}</loc>\n"
+        if lastmod:
+            entry += f"    <lastmod>{lastmod}</lastmod>\n"
+        if changefreq:
+            entry += f"    <changefreq>{changefreq}</changefreq>\n"
+        if priority:
+            entry += f"    <priority>{priority}</priority>\n"
+        data = (entry + "  </url>\n").encode('utf-8')
+
+        if self._file is not None and (self._urls >= self.max_urls or
+                                       self._bytes + len(data) + len(self.FOOTER) > self.max_bytes):
+            self._close_shard()
+        if self._file is None:
+            self._open()
+        self._file.write(data)
+        self._bytes += len(data)
+        self._urls += 1
+        shard = self.shards[-1]
+        shard['urls'] += 1
+        if lastmod and (shard['lastmod'] is None or lastmod > shard['lastmod']):
+            shard['lastmod'] = lastmod
+
+    def close(self):
+        """Finish the last shard and delete shards left over from a bigger run"""
+        if self._file is None and not self.shards:
+            self._open()  # an empty but valid sitemap
+        if self._file is not None:
+            self._close_shard()
+        removed = []
+        number = len(self.shards) + 1
+        while os.path.exists(os.path.join(self.directory, shard_name(number))):
+            os.remove(os.path.join(self.directory, shard_name(number)))
+            removed.append(shard_name(number))
+            number += 1
+        return removed
+
+
+def write_index(entries, path):
+    """
+    Write a sitemap index for entries of (name, lastmod). Returns True if
+    the file changed.
+    """
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_NS}">\n')
+        for name, lastmod in entries:
+            f.write(f"  <sitemap>\n    <loc>{escape(f'{SITE_URL}/{name}')}</loc>\n")
+            if lastmod:
+                f.write(f"    <lastmod>{lastmod}</lastmod>\n")
+            f.write("  </sitemap>\n")
+        f.write('</sitemapindex>\n')
+    return replace_if_changed(path + '.tmp', path)
+
+
+def build(root='.', lastmod='git', max_urls=MAX_URLS, max_bytes=MAX_BYTES, export=None):
+    """
+    Collect pages, write the sitemap shards and the index. With a CMS
+    export (any form cms.read_export() takes), posts without a page of
+    their own are listed too; without one, the snapshot sync-sanity.py
+    keeps is used if there is one (export=False skips the CMS posts).
+    Returns (pages, skipped, shards, removed shard names, index changed).
+    """
+    pages, skipped = collect_pages(root)
+    assign_lastmod(pages, root, lastmod)
+    if export is None:
+        export = os.path.join(root, SNAPSHOT_PATH)
+        export = export if os.path.exists(export) else None
+    if export:
+        pages += cms_pages(root, post_dates(export), {page.url for page in pages})
+
+    writer = SitemapWriter(root, max_urls=max_urls, max_bytes=max_bytes)
+    for page in pages:
+        writer.add(page.url, page.lastmod, page.changefreq, page.priority)
+    removed = writer.close()
+
+    entries = [(shard['name'], shard['lastmod']) for shard in writer.shards]
+    extra = [name for name in EXTRA_SITEMAPS if os.path.exists(os.path.join(root, name))]
+    if extra:
+        extra_dates = {}
+        if lastmod == 'git':
+            dirty = git_dirty(root)
+            extra_dates = git_dates(root, [name for name in extra if name not in dirty])
+        for name in extra:
+            entries.append((name, extra_dates.get(name) or _mtime_date(os.path.join(root, name))))
+    index_changed = write_index(entries, os.path.join(root, INDEX_NAME))
+    return pages, skipped, writer.shards, removed, index_changed
@@ -0,0 +1,233 @@
+"""
+Local snapshot of the Sanity blog content in SQLite, kept current by delta
+sync.
+
+Snapshot.sync() asks the query API only for documents whose _updatedAt is
+newer than the newest one already stored, PAGE_SIZE at a time. Pages are
+ordered by (_updatedAt, _id) and resume after the last pair seen, so
+documents that share a timestamp are never skipped or fetched twice, and
+each page is committed with the cursor, so an interrupted sync picks up
+where it stopped. One more query lists the ids that still exist, which is
+how deleted documents leave the snapshot. When nothing changed a sync
+costs two small requests.
+
+The builds then read the snapshot instead of the API:
+
+    snapshot = Snapshot(os.path.join(root, SNAPSHOT_PATH))
+    snapshot.posts()               # blog/post.html's projection, newest first
+    snapshot.post('my-post')
+
+and cms.read_export() accepts the snapshot file anywhere it takes an
+export, so build-feed.py --export .site-cache/sanity.sqlite works offline.
+
+The API URL defaults to the public endpoint of the production dataset,
+with the project, dataset and API version assets/js/ uses. Set --api-url
+or SANITY_API_URL to point a sync elsewhere, such as the stand-in server
+in benchmarks/sanity_standin.py. SANITY_TOKEN is sent as a bearer token
+when set. Drafts are never synced.
+"""
+import json
+import os
+import sqlite3
+import time
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from site_tools import cms
+from site_tools.cache import CACHE_DIR
+from site_tools.cms import SANITY_API_VERSION, SANITY_DATASET, SANITY_PROJECT_ID
+
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, 'sanity.sqlite')
+
+# Categories come along so post categories resolve to titles offline
+SYNC_TYPES = (cms.POST_TYPE, cms.CATEGORY_TYPE)
+
+PAGE_SIZE = 500
+
+# Older than any document, so the first sync fetches everything
+EPOCH = '1970-01-01T00:00:00Z'
+
+_PUBLISHED = '_type in $types && !(_id in path("drafts.**"))'
+DELTA_QUERY = (f'*[{_PUBLISHED} && (_updatedAt > $since || (_updatedAt == $since && _id > $lastId))]'
+               ' | order(_updatedAt asc, _id asc)')
+IDS_QUERY = f'*[{_PUBLISHED}]._id'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS documents (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    slug TEXT,
+    updated_at TEXT NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_type ON documents (type);
+CREATE INDEX IF NOT EXISTS documents_slug ON documents (slug);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+'''
+
+
+def default_api_url():
+    """SANITY_API_URL, or the public query endpoint of the production dataset"""
+    return os.environ.get('SANITY_API_URL') or (
+        f"https://{SANITY_PROJECT_ID}.api.sanity.io/v{SANITY_API_VERSION}"
+        f"/data/query/{SANITY_DATASET}")
+
+
+def delta_query(limit=PAGE_SIZE):
+    return f"{DELTA_QUERY}[0...{limit}]"
+
+
+class QueryClient:
+    """GET requests against a Sanity query endpoint"""
+
+    def __init__(self, api_url=None, token=None, timeout=30):
+        self.api_url = api_url or default_api_url()
+        self.token = token if token is not None else os.environ.get('SANITY_TOKEN')
+        self.timeout = timeout
+        self.requests = 0
+
+    def query(self, query, params=None):
+        """Run a GROQ query and return its result; params are JSON-encoded as $name"""
+        fields = {'query': query}
+        for name, value in (params or {}).items():
+            fields[f'${name}'] = json.dumps(value)
+        request = Request(f"{self.api_url}?{urlencode(fields)}")
+        if self.token:
+            request.add_header('Authorization', f'Bearer {self.token}')
+        self.requests += 1
+        with urlopen(request, timeout=self.timeout) as response:
+            data = json.load(response)
+        if not isinstance(data, dict) or 'result' not in data:
+            raise ValueError(f"unexpected response from {self.api_url}")
+        return data['result']
+
+
+class SyncReport:
+    """What one sync fetched and dropped"""
+
+    def __init__(self):
+        self.fetched = 0
+        self.deleted = 0
+        self.requests = 0
+        self.reset = False
+        self.seconds = 0.0
+
+
+class Snapshot:
+    """The synced documents, stored in .site-cache/sanity.sqlite"""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self, key, default=None):
+        row = self.db.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    @property
+    def synced_at(self):
+        """When the last sync finished (ISO timestamp), or None"""
+        return self._meta('synced_at')
+
+    def _store(self, docs):
+        rows = []
+        for doc in docs:
+            slug = doc.get('slug')
+            rows.append((doc['_id'], doc.get('_type', ''),
+                         slug.get('current') if isinstance(slug, dict) else slug,
+                         doc.get('_updatedAt', ''), json.dumps(doc, separators=(',', ':'))))
+        self.db.executemany('INSERT OR REPLACE INTO documents (id, type, slug, updated_at, doc) '
+                            'VALUES (?, ?, ?, ?, ?)', rows)
+
+    def sync(self, client, full=False):
+        """Bring the snapshot up to date from client (a QueryClient); returns a SyncReport"""
+        report = SyncReport()
+        start = time.perf_counter()
+        requests = client.requests
+        # A different endpoint or set of types is a different snapshot; the
+        # old one is only dropped once the new source has answered
+        source = json.dumps([client.api_url, SYNC_TYPES])
+        reset = full or self._meta('source') != source
+        report.reset = reset and (full or self._meta('source') is not None)
+        since, last_id = EPOCH, ''
+        if not reset:
+            since, last_id = self._meta('since', EPOCH), self._meta('last_id', '')
+        while True:
+            docs = client.query(delta_query(), {'types': list(SYNC_TYPES), 'since': since,
+                                                'lastId': last_id})
+            with self.db:
+                if reset:
+                    self.db.execute('DELETE FROM documents')
+                    self.db.execute('DELETE FROM meta')
+                    self._set_meta('source', source)
+                    reset = False
+                if docs:
+                    since, last_id = docs[-1]['_updatedAt'], docs[-1]['_id']
+                    self._store(docs)
+                    self._set_meta('since', since)
+                    self._set_meta('last_id', last_id)
+            report.fetched += len(docs)
+            if len(docs) < PAGE_SIZE:
+                break
+
+        live = set(client.query(IDS_QUERY, {'types': list(SYNC_TYPES)}))
+        stored = [row[0] for row in self.db.execute('SELECT id FROM documents')]
+        gone = [(doc_id,) for doc_id in stored if doc_id not in live]
+        with self.db:
+            self.db.executemany('DELETE FROM documents WHERE id = ?', gone)
+            self._set_meta('synced_at', time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()))
+        report.deleted = len(gone)
+        report.requests = client.requests - requests
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def count(self, doc_type=None):
+        if doc_type is None:
+            return self.db.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+        return self.db.execute('SELECT COUNT(*) FROM documents WHERE type = ?',
+                               (doc_type,)).fetchone()[0]
+
+    def documents(self, types=None):
+        """Stored documents (of the given types), as dicts"""
+        if types is None:
+            rows = self.db.execute('SELECT doc FROM documents ORDER BY id')
+        else:
+            marks = ','.join('?' * len(types))
+            rows = self.db.execute(f'SELECT doc FROM documents WHERE type IN ({marks}) ORDER BY id',
+                                   tuple(types))
+        return [json.loads(doc) for doc, in rows]
+
+    def _categories(self):
+        return {doc['_id']: doc.get('title') for doc in self.documents((cms.CATEGORY_TYPE,))}
+
+    def posts(self):
+        """Every post in cms.load_posts() shape, newest first"""
+        return cms.load_posts(self.documents(SYNC_TYPES))
+
+    def post(self, slug):
+        """One post in cms.load_posts() shape, or None"""
+        row = self.db.execute('SELECT doc FROM documents WHERE type = ? AND slug = ?',
+                              (cms.POST_TYPE, slug)).fetchone()
+        return cms.post_from_doc(json.loads(row[0]), self._categories()) if row else None
+
+    def updated(self):
+        """{slug: _updatedAt} of every post, for lastmod-style queries"""
+        return dict(self.db.execute('SELECT slug, updated_at FROM documents '
+                                    'WHERE type = ? AND slug IS NOT NULL', (cms.POST_TYPE,)))
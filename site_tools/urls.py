@@ -0,0 +1,64 @@
+"""
+Map between public site URLs and files in the repo.
+"""
+import xml.etree.ElementTree as ET
+
+SITE_URL = 'https://www.creativejobhub.com'
+
+# Hosts that serve this site: absolute URLs on them are internal links
+SITE_HOSTS = ('creativejobhub.com', 'www.creativejobhub.com')
+
+
+def is_file_url(url):
+    """False for URLs with a query string, such as CMS blog posts served by
+    blog/post.html?slug=..., which have no file of their own"""
+    return '?' not in url
+
+
+def url_to_file_path(url):
+    """Convert sitemap URL to local file path"""
+    # Remove base URL
+    path = url.replace(SITE_URL, '')
+
+    if not path or path == '/':
+        return 'index.html'
+
+    # Handle .html files
+    if path.endswith('.html'):
+        return path.lstrip('/')
+
+    # Handle directory URLs with trailing slash
+    if path.endswith('/'):
+        return path.lstrip('/') + 'index.html'
+
+    # Shouldn't happen but handle just in case
+    return path.lstrip('/') + '/index.html'
+
+
+def file_path_to_url(path):
+    """Convert a repo-relative file path to its public URL (inverse of url_to_file_path)"""
+    path = path.replace('\\', '/')
+    if path.startswith('./'):
+        path = path[2:]
+    if path == 'index.html':
+        return SITE_URL + '/'
+    if path.endswith('/index.html'):
+        return f"{SITE_URL}/{path[:-len('index.html')]}"
+    return f"{SITE_URL}/{path}"
+
+
+def extract_urls_from_sitemap(sitemap_path):
+    """Extract all URLs from sitemap.xml"""
+    tree = ET.parse(sitemap_path)
+    root = tree.getroot()
+
+    # Handle XML namespace
+    namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+    urls = []
+
+    for url in root.findall('ns:url', namespace):
+        loc = url.find('ns:loc', namespace)
+        if loc is not None:
+            urls.append(loc.text)
+
+    return urls
@@ -0,0 +1,433 @@
+"""
+Watch the tree and re-audit only what a change touches.
+
+SiteState parses every page once at start-up (head metadata, internal
+references, head order) and keeps the result in memory together with
+the file set, the redirect table and the sitemap. A change then costs
+one page parse plus a few dict lookups:
+
+  - an edited page is re-parsed and gets every audit (canonical against
+    the sitemap, head order, ?v= asset versions, links)
+  - a page or asset that appears or disappears re-checks the links of
+    the pages that reference it (the inbound index)
+  - vercel.json or _redirects re-checks every page's links, and a
+    sitemap re-checks every canonical, both without re-reading pages
+
+Changes come from inotify on Linux (through ctypes, no extra package)
+and from polling (size and mtime of every file) anywhere else, or with
+--poll. Events are debounced: a batch closes after DEBOUNCE_SECONDS of
+quiet, or MAX_BATCH_SECONDS after it opened, so an editor's
+write-rename-chmod or a git checkout of hundreds of files is audited
+once. Batches bigger than RELOAD_THRESHOLD (and inotify queue
+overflows) reload the whole state instead.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from functools import partial
+
+from site_tools.files import SKIP_DIRS, iter_html_files, rel_path
+from site_tools.headindex import extract_head_metadata
+from site_tools.headorder import reorder_head
+from site_tools.linkgraph import SiteFiles, extract_references, internal_path, resolve
+from site_tools.parallel import run_parallel
+from site_tools.redirects import NETLIFY_FILE, VERCEL_FILE, RedirectTable, load_redirects
+from site_tools.rules import CSS_VERSION, HEADER_JS_VERSION
+from site_tools.sitemap import shard_name
+from site_tools.urls import extract_urls_from_sitemap, file_path_to_url, is_file_url, url_to_file_path
+
+DEBOUNCE_SECONDS = 0.05
+MAX_BATCH_SECONDS = 1.0
+POLL_INTERVAL = 0.5
+RELOAD_THRESHOLD = 500
+
+AUDITS = ('canonical', 'head-order', 'asset-version', 'links')
+
+REDIRECT_FILES = (VERCEL_FILE, NETLIFY_FILE)
+
+
+def ignored(path):
+    """Dotfiles, editor backups and anything in a skipped directory"""
+    parts = path.split('/')
+    name = parts[-1]
+    return (any(part in SKIP_DIRS or part.startswith('.') for part in parts)
+            or name.endswith(('~', '.swp', '.swx', '.tmp')) or name == '4913')
+
+
+class PageState:
+    """What the audits need from one page, parsed once per change"""
+
+    def __init__(self, path, head, links, moves):
+        self.path = path
+        self.head = head
+        self.links = links    # (line, attribute, url, site path or None)
+        self.moves = moves    # labels of head elements out of order
+
+
+def parse_page(root, path):
+    with open(os.path.join(root, path), 'r', encoding='utf-8', errors='replace') as f:
+        content = f.read()
+    page_url = file_path_to_url(path)
+    links = [(reference.line, reference.attribute, reference.url,
+              internal_path(reference.url, page_url))
+             for reference in extract_references(content, path)]
+    _, moves = reorder_head(content)
+    return PageState(path, extract_head_metadata(content), links, [label for label, _ in moves])
+
+
+def _parse_one(root, path):
+    """run_parallel() worker: (path, PageState, error)"""
+    try:
+        return path, parse_page(root, path), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def site_paths(path):
+    """Site paths a file is served at: 'a/index.html' -> /a/index.html, /a/, /a"""
+    paths = ['/' + path]
+    if path == 'index.html':
+        paths.append('/')
+    elif path.endswith('/index.html'):
+        directory = '/' + path[:-len('index.html')]
+        paths.extend([directory, directory.rstrip('/')])
+    return paths
+
+
+def load_sitemap(root):
+    """{page path: sitemap URL} from sitemap.xml and its shards"""
+    expected = {}
+    number = 1
+    while os.path.exists(os.path.join(root, shard_name(number))):
+        try:
+            urls = extract_urls_from_sitemap(os.path.join(root, shard_name(number)))
+        except Exception:
+            urls = []
+        for url in filter(is_file_url, urls):
+            expected.setdefault(url_to_file_path(url), url)
+        number += 1
+    return expected
+
+
+class SiteState:
+    """Parsed pages plus everything their audits look up"""
+
+    def __init__(self, root='.', workers=1):
+        self.root = root
+        self.workers = workers
+        self.pages = {}
+        self.findings = {}
+        self.errors = {}
+        self.load()
+
+    def load(self):
+        """(Re)build everything from the tree"""
+        self.site_files = SiteFiles(self.root)
+        self.table = RedirectTable(load_redirects(self.root))
+        self.sitemap = load_sitemap(self.root)
+        self.resolved = {}
+        self.inbound = {}
+        self.pages = {}
+        self.errors = {}
+        files = [rel_path(file_path, self.root) for file_path in iter_html_files(self.root)]
+        for path, page, error in run_parallel(partial(_parse_one, self.root), files, self.workers):
+            self._store(path, page, error)
+        self.findings = {path: self.audit(path) for path in self.pages}
+
+    def _store(self, path, page, error):
+        old = self.pages.pop(path, None)
+        if old is not None:
+            for _, _, _, site_path in old.links:
+                if site_path is not None:
+                    self.inbound.get(site_path, set()).discard(path)
+        self.errors.pop(path, None)
+        if error is not None:
+            self.errors[path] = error
+        if page is None:
+            return
+        self.pages[path] = page
+        for _, _, _, site_path in page.links:
+            if site_path is not None:
+                self.inbound.setdefault(site_path, set()).add(path)
+
+    def _resolve(self, site_path):
+        if site_path not in self.resolved:
+            self.resolved[site_path] = resolve(site_path, self.site_files, self.table)
+        return self.resolved[site_path]
+
+    def audit(self, path):
+        """[(audit, message)] for one parsed page"""
+        page = self.pages[path]
+        head = page.head
+        findings = []
+
+        expected = self.sitemap.get(path)
+        if expected is not None and head['canonical'] != expected:
+            findings.append(('canonical', f"canonical is {head['canonical']}, sitemap lists {expected}"
+                             if head['canonical'] else f"no canonical tag, sitemap lists {expected}"))
+
+        if page.moves:
+            findings.append(('head-order', f"{len(page.moves)} head elements out of order "
+                                           f"({', '.join(page.moves[:3])}); reorder-head.py fixes it"))
+
+        if head['css_version'] is not None and head['css_version'] != CSS_VERSION:
+            findings.append(('asset-version', f"site.css?v={head['css_version']}, expected "
+                                              f"v={CSS_VERSION} (update-css-version.py)"))
+        if head['header_js_version'] is not None and head['header_js_version'] != HEADER_JS_VERSION:
+            findings.append(('asset-version', f"header.js?v={head['header_js_version']}, expected "
+                                              f"v={HEADER_JS_VERSION} (update-header-version.py)"))
+
+        for line, attribute, url, site_path in page.links:
+            if site_path is None:
+                continue
+            resolution = self._resolve(site_path)
+            if resolution.loop:
+                findings.append(('links', f"line {line}: {attribute}=\"{url}\" is a redirect loop"))
+            elif resolution.file is None:
+                findings.append(('links', f"line {line}: {attribute}=\"{url}\" is broken"))
+        return findings
+
+    def _expand(self, paths):
+        """Changed paths, with a removed or moved directory expanded to its known files"""
+        expanded = set()
+        for path in paths:
+            if path in self.site_files.files or os.path.isfile(os.path.join(self.root, path)):
+                expanded.add(path)
+                continue
+            prefix = path.rstrip('/') + '/'
+            inside = [known for known in self.site_files.files if known.startswith(prefix)]
+            expanded.update(inside or [path])
+        return expanded
+
+    def apply(self, paths):
+        """
+        Bring the state up to date with the changed repo-relative paths and
+        re-audit what they affect. Returns (changed pages, {page: findings}
+        for every page whose findings were recomputed, deleted pages).
+        """
+        paths = {path for path in self._expand(paths) if not ignored(path)}
+        affected = set()
+        changed = set()
+        deleted = set()
+        recheck_all = False
+
+        for path in sorted(paths):
+            exists = os.path.isfile(os.path.join(self.root, path))
+            if exists != (path in self.site_files.files):
+                # Appeared or disappeared: every link to it may change state
+                if exists:
+                    self.site_files.files.add(path)
+                else:
+                    self.site_files.files.discard(path)
+                self.resolved.clear()
+                for site_path in site_paths(path):
+                    affected.update(self.inbound.get(site_path, ()))
+            if path in REDIRECT_FILES:
+                self.table = RedirectTable(load_redirects(self.root))
+                self.resolved.clear()
+                recheck_all = True
+            elif path.startswith('sitemap') and path.endswith('.xml'):
+                self.sitemap = load_sitemap(self.root)
+                recheck_all = True
+            elif path.endswith('.html'):
+                if exists:
+                    self._store(*_parse_one(self.root, path))
+                    changed.add(path)
+                else:
+                    self._store(path, None, None)
+                    self.findings.pop(path, None)
+                    deleted.add(path)
+
+        if recheck_all:
+            affected.update(self.pages)
+        affected.update(changed)
+        results = {}
+        for path in sorted(affected):
+            if path in self.pages:
+                results[path] = self.findings[path] = self.audit(path)
+        return changed, results, deleted
+
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct('iIII')
+
+# Returned by wait() when changes were lost and everything must be reloaded
+OVERFLOW = object()
+
+
+def _libc():
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyWatcher:
+    """Changed paths from inotify, one watch per directory"""
+
+    name = 'inotify'
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.libc = _libc()
+        if self.libc is None:
+            raise OSError("inotify is not available")
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}   # watch descriptor -> repo-relative directory ('' for root)
+        self._watch_tree('')
+
+    @staticmethod
+    def available():
+        return _libc() is not None
+
+    def _watch_tree(self, directory):
+        """Watch directory and everything below it; returns the files found"""
+        files = []
+        base = os.path.join(self.root, directory)
+        for dirpath, dirs, names in os.walk(base):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+            relative = rel_path(dirpath, self.root)
+            relative = '' if relative == '.' else relative
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"cannot watch {dirpath} "
+                                                  "(raise fs.inotify.max_user_watches or use --poll)")
+            self.dirs[wd] = relative
+            files.extend(f"{relative}/{name}" if relative else name for name in names)
+        return files
+
+    def wait(self, timeout):
+        """Paths changed within timeout seconds (None waits forever), or OVERFLOW"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b'\0')
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return OVERFLOW
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            name = os.fsdecode(name)
+            path = f"{directory}/{name}" if directory else name
+            if ignored(path):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._watch_tree(path))
+                else:
+                    changed.add(path)   # expanded to its files by SiteState
+            else:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Changed paths found by comparing the size and mtime of every file"""
+
+    name = 'polling'
+
+    def __init__(self, root='.', interval=POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        snapshot = {}
+        for dirpath, dirs, names in os.walk(self.root):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
+            for name in names:
+                file_path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[rel_path(file_path, self.root)] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout):
+        delay = self.next_scan - time.monotonic()
+        if timeout is not None and delay > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        time.sleep(max(delay, 0))
+        snapshot = self._scan()
+        self.next_scan = time.monotonic() + self.interval
+        changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                   if snapshot.get(path) != self.snapshot.get(path) and not ignored(path)}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root='.', poll=False, interval=POLL_INTERVAL):
+    """InotifyWatcher where it works, PollingWatcher otherwise"""
+    if not poll and InotifyWatcher.available():
+        try:
+            return InotifyWatcher(root)
+        except OSError as e:
+            print(f"⚠️  {e}; falling back to polling")
+    return PollingWatcher(root, interval)
+
+
+def batches(watcher, debounce=DEBOUNCE_SECONDS, max_batch=MAX_BATCH_SECONDS):
+    """
+    Yield sets of changed paths (or OVERFLOW), each collected until the
+    tree has been quiet for debounce seconds or max_batch has passed
+    """
+    while True:
+        changed = watcher.wait(None)
+        if not changed:
+            continue
+        deadline = time.monotonic() + max_batch
+        while changed is not OVERFLOW:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            more = watcher.wait(min(debounce, remaining))
+            if more is OVERFLOW:
+                changed = OVERFLOW
+            elif not more:
+                break
+            else:
+                changed |= more
+        yield changed
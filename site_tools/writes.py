@@ -0,0 +1,211 @@
+"""
+Write files back only when their bytes really change, atomically, in the
+encoding and line endings they were read with.
+
+    page = TextFile.read('pricing/index.html')
+    new_text = page.text.replace('v=30', 'v=31')
+    page.write(new_text)        # False, and no write, if nothing changed
+
+An unchanged page is never opened for writing, so it keeps its mtime and
+incremental deploys and CDN uploads skip it. Pages are decoded as UTF-8
+(keeping a BOM if there is one, falling back to Latin-1 so any bytes
+round-trip). CRLF pages are edited as '\\n' text and written back as CRLF;
+pages that already mix line endings are kept byte for byte.
+
+Writes go to a temp file in the same directory that is then renamed over
+the target, so an interrupted run never leaves a half-written page.
+
+For --dry-run, TextFile.diff() gives the change as a unified diff and a
+DiffSet collects them into one patch (add_dry_run_arguments()). With
+--diff -, the patch is the only thing written to stdout; progress output
+goes to stderr.
+"""
+import codecs
+import difflib
+import os
+import stat
+import sys
+import tempfile
+
+from site_tools import instrument
+
+# Mode for new files, as open() would create them
+_umask = os.umask(0)
+os.umask(_umask)
+NEW_FILE_MODE = 0o666 & ~_umask
+
+
+def write_atomic(path, data):
+    """Replace path with data via a temp file and rename, keeping its permissions"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.",
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if instrument.enabled:
+        instrument.count_io(path, bytes_written=len(data))
+
+
+def write_if_changed(path, data, dry_run=False):
+    """
+    Write data (bytes, or str as UTF-8) to path unless the file already
+    holds exactly that; True if it was (or, with dry_run, would be) written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    if not dry_run:
+        write_atomic(path, data)
+    return True
+
+
+def replace_if_changed(tmp_path, path):
+    """
+    Move a finished temp file over path unless the bytes are identical (then
+    the temp file is removed); True if path was replaced. For writers that
+    stream their output to tmp_path instead of building it in memory.
+    """
+    try:
+        if os.path.getsize(tmp_path) == os.path.getsize(path):
+            with open(tmp_path, 'rb') as new, open(path, 'rb') as old:
+                if new.read() == old.read():
+                    os.remove(tmp_path)
+                    return False
+    except OSError:
+        pass
+    os.replace(tmp_path, path)
+    return True
+
+
+def decode(data):
+    """(text, encoding, bom, newline) for file bytes; newline None means mixed"""
+    bom = data.startswith(codecs.BOM_UTF8)
+    body = data[len(codecs.BOM_UTF8):] if bom else data
+    try:
+        text, encoding = body.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        text, encoding = body.decode('latin-1'), 'latin-1'
+
+    if '\r' not in text:
+        return text, encoding, bom, '\n'
+    crlf, cr, lf = text.count('\r\n'), text.count('\r'), text.count('\n')
+    if crlf == cr == lf:
+        return text.replace('\r\n', '\n'), encoding, bom, '\r\n'
+    if lf == 0:
+        return text.replace('\r', '\n'), encoding, bom, '\r'
+    return text, encoding, bom, None
+
+
+class TextFile:
+    """A text file read into memory, written back in the same format"""
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data    # bytes on disk (or, after a dry-run write, that would be)
+        self.text, self.encoding, self.bom, self.newline = decode(data)
+
+    @classmethod
+    def read(cls, path):
+        with open(path, 'rb') as f:
+            return cls(path, f.read())
+
+    def encode(self, text):
+        """text in this file's encoding, BOM and line endings"""
+        if self.newline not in (None, '\n'):
+            text = text.replace('\n', self.newline)
+        data = text.encode(self.encoding)
+        return codecs.BOM_UTF8 + data if self.bom else data
+
+    def write(self, text, dry_run=False):
+        """Write text back if that changes the bytes; True if it did (or would)"""
+        if text == self.text:
+            return False
+        data = self.encode(text)
+        if data == self.data:
+            return False
+        if not dry_run:
+            write_atomic(self.path, data)
+        self.data = data
+        self.text = text
+        return True
+
+    def diff(self, text, label=None):
+        """Unified diff from the current text to text ('' if they're the same)"""
+        if text == self.text:
+            return ''
+        label = label or str(self.path)
+        old, new = self.text, text
+        if self.newline not in (None, '\n'):
+            # Diff the line endings on disk, so the patch applies to the file
+            old, new = old.replace('\n', self.newline), new.replace('\n', self.newline)
+        lines = difflib.unified_diff(old.splitlines(keepends=True),
+                                     new.splitlines(keepends=True),
+                                     f"a/{label}", f"b/{label}")
+        return ''.join(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n'
+                       for line in lines)
+
+
+class DiffSet:
+    """Unified diffs from a dry run, written out as one patch"""
+
+    def __init__(self, stdout=None):
+        self.diffs = []
+        self.stdout = stdout or sys.stdout
+
+    def add(self, diff):
+        if diff:
+            self.diffs.append(diff)
+
+    def __len__(self):
+        return len(self.diffs)
+
+    def write(self, target):
+        """Write the patch to target, or to stdout for '-'"""
+        patch = ''.join(self.diffs)
+        if target == '-':
+            self.stdout.write(patch)
+        else:
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(patch)
+            print(f"📄 Wrote {len(self.diffs)} file diffs to {target}")
+
+
+def add_dry_run_arguments(parser):
+    """Add --dry-run and --diff FILE to an argparse parser"""
+    parser.add_argument('--dry-run', action='store_true', help="report changes without writing")
+    parser.add_argument('--diff', metavar='FILE',
+                        help="write the changes as a unified diff to FILE ('-' for stdout); "
+                             "implies --dry-run")
+
+
+def dry_run_options(args):
+    """
+    (dry_run, DiffSet or None) from the parsed --dry-run/--diff arguments.
+    For --diff -, everything printed from here on goes to stderr, so stdout
+    carries nothing but the patch.
+    """
+    if args.diff == '-':
+        diffs = DiffSet(stdout=sys.stdout)
+        sys.stdout = sys.stderr
+        return True, diffs
+    if args.diff:
+        return True, DiffSet()
+    return args.dry_run, None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Check and sync the redirect rules in vercel.json and _redirects.
+
+Both files are compiled into one table (vercel.json first, as it is the
+live host) and checked for:
+
+  ❌ conflicts   - the same source redirects to different places
+  🔁 chains      - a redirect lands on another redirect (or loops)
+  🕳️  shadowed    - a rule that an earlier pattern always beats
+  ↔️  drift       - rules that only one of the two files has
+
+--write regenerates one file from the combined rules, so both hosts
+serve the same redirects. Vercel applies redirects before the file
+system, so --write vercel leaves out _redirects rules (not forced with
+"!") whose source is a live page, and exits 1 when it skipped any;
+--force writes them anyway. --resolve shows where paths end up.
+
+Usage:
+  python3 sync-redirects.py
+  python3 sync-redirects.py --resolve /pricing.html /compare
+  python3 sync-redirects.py --write vercel
+"""
+import argparse
+import os
+import sys
+
+from site_tools import redirects
+from site_tools.linkgraph import SiteFiles
+from site_tools.writes import write_if_changed
+
+NETLIFY_HEADER = (
+    "Netlify-style redirects (for future hosting compatibility)",
+    "Generated by sync-redirects.py from vercel.json and the previous _redirects;",
+    "edit either file and re-run it to keep the two in sync.",
+    "",
+)
+
+
+def hop_text(hops):
+    return ' -> '.join([hops[0].source] + [hop.destination for hop in hops])
+
+
+def combined(table, prefer):
+    """
+    One rule per source, in priority order: what both files should contain.
+    When both files have the same rule, the copy from prefer is used, so
+    regenerating a file keeps its own status codes and "!" flags.
+    """
+    rules = {}
+    for redirect in table.redirects:
+        first = rules.get(redirect.source)
+        if first is None:
+            rules[redirect.source] = redirect
+        elif (redirect.origin == prefer and first.origin != prefer
+              and redirect.destination == first.destination):
+            rules[redirect.source] = redirect
+    return list(rules.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and sync vercel.json and _redirects")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--resolve', nargs='+', metavar='PATH', help="show where paths redirect to")
+    parser.add_argument('--write', choices=('vercel', 'netlify'),
+                        help="regenerate vercel.json redirects or _redirects from both files")
+    parser.add_argument('--force', action='store_true',
+                        help="with --write vercel, also write rules that hide live pages")
+    args = parser.parse_args()
+
+    table = redirects.RedirectTable(redirects.load_redirects(args.root))
+    site_files = SiteFiles(args.root)
+
+    def exists(path):
+        return site_files.file_for(path) is not None
+
+    if args.resolve:
+        for path in args.resolve:
+            hops, loop = table.follow(path, exists)
+            if not hops:
+                served = site_files.file_for(path)
+                print(f"   {path}: {'serves ' + served if served else 'no rule, nothing served'}")
+                continue
+            rules = ', '.join(hop.location for hop in hops)
+            print(f"   {hop_text(hops)}{' (loop)' if loop else ''} [{rules}]")
+        return
+
+    report = redirects.analyze(table, exists)
+    print(f"↪️  {len(table.redirects)} rules: {len(table.exact)} exact sources, "
+          f"{table.patterns} patterns")
+
+    for redirect, reason in report.unsupported:
+        print(f"⚠️  {redirect.location}: {reason}")
+    for first, other in report.conflicts:
+        print(f"❌ {other.source}: {first.location} -> {first.destination} "
+              f"but {other.location} -> {other.destination}")
+    for first, other in report.duplicates:
+        print(f"⚠️  {other.location}: repeats {first.location} ({other.source})")
+    for redirect, pattern in report.shadowed:
+        print(f"🕳️  {redirect.location}: {redirect.source} is always caught by "
+              f"{pattern.source} ({pattern.location})")
+    for hops in report.chains:
+        print(f"🔁 chain: {hop_text(hops)}")
+    for hops in report.loops:
+        print(f"🔁 loop: {hop_text(hops)}")
+    for origin, rules in report.only_in.items():
+        if rules:
+            print(f"↔️  {len(rules)} rules only in {origin}:")
+            for redirect in rules:
+                print(f"   {redirect.source} -> {redirect.destination} ({redirect.location})")
+
+    skipped = []
+    if args.write:
+        if args.write == 'vercel':
+            path = os.path.join(args.root, redirects.VERCEL_FILE)
+            rules = combined(table, redirects.VERCEL_FILE)
+            # Vercel applies every redirect before the file system, so a
+            # rule Netlify would skip for a live page would hide it there
+            skipped = [redirect for redirect in rules
+                       if not redirect.force and exists(redirect.source)]
+            for redirect in skipped:
+                if args.force:
+                    print(f"⚠️  {redirect.source} exists; on Vercel the redirect will hide it")
+                else:
+                    print(f"⏭️  {redirect.source} exists, rule left out ({redirect.location}; "
+                          f"--force writes it)")
+            if args.force:
+                skipped = []
+            else:
+                rules = [redirect for redirect in rules if redirect not in skipped]
+            text = redirects.vercel_config_with(path, rules)
+        else:
+            path = os.path.join(args.root, redirects.NETLIFY_FILE)
+            rules = combined(table, redirects.NETLIFY_FILE)
+            text = redirects.to_netlify(rules, header=NETLIFY_HEADER)
+        changed = write_if_changed(path, text)
+        print(f"✓ {os.path.basename(path)}: {len(rules)} rules ({'updated' if changed else 'unchanged'})")
+
+    if not (report.conflicts or report.loops or report.chains or report.shadowed
+            or any(report.only_in.values())):
+        print("✅ Redirects are consistent")
+    sys.exit(1 if report.conflicts or report.loops or skipped else 0)
+
+
+if __name__ == '__main__':
+    main()
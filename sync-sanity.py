@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Keep a local SQLite snapshot of the Sanity blog posts and categories, so
+builds read posts from disk instead of fetching the whole list from the
+API every time.
+
+  - only documents changed since the last sync are fetched (by
+    _updatedAt); deleted documents are dropped
+  - the snapshot is .site-cache/sanity.sqlite; pass it to
+    build-feed.py --export to build from it offline
+  - --api-url (or SANITY_API_URL) points the sync at another endpoint,
+    e.g. benchmarks/sanity_standin.py serving an export on localhost
+
+Usage:
+  python3 sync-sanity.py
+  python3 sync-sanity.py --list
+  python3 sync-sanity.py --offline --post getting-started
+  python3 sync-sanity.py --api-url http://127.0.0.1:8765/v2024-01-01/data/query/production
+"""
+import argparse
+import json
+import os
+
+from site_tools import cms, snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync the local snapshot of the Sanity blog content")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--api-url', help="query endpoint (default: SANITY_API_URL or the "
+                                          "production dataset)")
+    parser.add_argument('--full', action='store_true', help="discard the snapshot and fetch everything")
+    parser.add_argument('--offline', action='store_true', help="skip the sync and only read the snapshot")
+    parser.add_argument('--list', action='store_true', help="list the posts in the snapshot")
+    parser.add_argument('--post', metavar='SLUG', help="print one post as JSON")
+    args = parser.parse_args()
+
+    path = os.path.join(args.root, snapshot.SNAPSHOT_PATH)
+    with snapshot.Snapshot(path) as store:
+        if not args.offline:
+            client = snapshot.QueryClient(args.api_url)
+            try:
+                report = store.sync(client, full=args.full)
+            except (OSError, ValueError) as e:
+                print(f"❌ Sync from {client.api_url} failed: {e}")
+                print(f"   The snapshot still holds the last sync ({store.synced_at or 'never'})")
+                raise SystemExit(1)
+            if report.reset:
+                print("🧹 Started a new snapshot")
+            print(f"🔄 Synced in {report.seconds:.2f}s with {report.requests} requests: "
+                  f"{report.fetched} documents updated, {report.deleted} deleted")
+
+        print(f"🗄️  {path}: {store.count(cms.POST_TYPE)} posts, "
+              f"{store.count(cms.CATEGORY_TYPE)} categories "
+              f"(last synced {store.synced_at or 'never'})")
+        if args.list:
+            for post in store.posts():
+                print(f"   {(post['publishedAt'] or '')[:10]:<10}  {post['slug']}  {post['title'] or ''}")
+        if args.post:
+            post = store.post(args.post)
+            if post is None:
+                print(f"❌ No post with slug {args.post}")
+                raise SystemExit(1)
+            print(json.dumps(post, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
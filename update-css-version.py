@@ -1,60 +1,49 @@
 #!/usr/bin/env python3
 """
-Update all HTML files to use the latest site.css version (v=29)
-Handles both site.css and site.min.css
+Update all HTML files to use the latest site.css version (see CSS_VERSION
+in site_tools/rules.py). Handles both site.css and site.min.css.
+
+To run this together with the other release rewrites in a single pass,
+use release-rewrite.py instead.
+Pages switched to content-hashed asset names by fingerprint-assets.py
+no longer carry a ?v=N and are left alone.
 """
-import os
-import re
-from pathlib import Path
+import argparse
+
+from site_tools import rewrite
+from site_tools.files import iter_html_files
+from site_tools.parallel import add_workers_argument, run_parallel
+from site_tools.rules import CSS_VERSION, CSS_VERSION_RULE
+
+RULESET = rewrite.RuleSet([CSS_VERSION_RULE])
 
 def update_css_version(file_path):
-    """Update site.css and site.min.css version to v=29"""
+    """Update site.css and site.min.css version to CSS_VERSION"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original = content
-        
-        # Replace site.css?v=XX with v=31 (for any version number)
-        content = re.sub(r'site\.css\?v=\d+', 'site.css?v=31', content)
-        
-        # Replace site.min.css?v=XX with v=31 (for any version number)
-        content = re.sub(r'site\.min\.css\?v=\d+', 'site.min.css?v=31', content)
-        
-        # Only write if changed
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+        return bool(rewrite.rewrite_file(RULESET, file_path))
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return False
 
 def main():
-    root_dir = Path('.')
+    parser = argparse.ArgumentParser(description="Update site.css version in all HTML files")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+
     updated_count = 0
     
     # Find all HTML files (excluding node_modules, .git, etc.)
-    html_files = []
-    for ext in ['*.html']:
-        html_files.extend(root_dir.rglob(ext))
-    
-    # Filter out unwanted directories
-    html_files = [
-        f for f in html_files 
-        if not any(part.startswith('.') or part == 'node_modules' 
-                   for part in f.parts)
-    ]
+    html_files = list(iter_html_files('.'))
     
     print(f"Found {len(html_files)} HTML files")
     
-    for html_file in html_files:
-        if update_css_version(html_file):
+    results = run_parallel(update_css_version, html_files, args.workers)
+    for html_file, updated in zip(html_files, results):
+        if updated:
             print(f"✓ Updated: {html_file}")
             updated_count += 1
     
-    print(f"\n✅ Updated {updated_count} files to site.css/site.min.css?v=31")
+    print(f"\n✅ Updated {updated_count} files to site.css/site.min.css?v={CSS_VERSION}")
 
 if __name__ == '__main__':
     main()
@@ -1,47 +1,32 @@
 #!/usr/bin/env python3
 """
-Update all HTML files to use the latest header.js version (v=4)
+Update all HTML files to use the latest header.js version (see
+HEADER_JS_VERSION in site_tools/rules.py).
+
+To run this together with the other release rewrites in a single pass,
+use release-rewrite.py instead.
+Pages switched to content-hashed asset names by fingerprint-assets.py
+no longer carry a ?v=N and are left alone.
 """
-import os
-import re
-from pathlib import Path
+from site_tools import rewrite
+from site_tools.files import iter_html_files
+from site_tools.rules import HEADER_JS_VERSION, HEADER_VERSION_RULE
+
+RULESET = rewrite.RuleSet([HEADER_VERSION_RULE])
 
 def update_header_version(file_path):
-    """Update header.js version from v=2 or v=3 to v=4"""
+    """Update header.js version to HEADER_JS_VERSION"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        original = content
-        
-        # Replace header.js?v=2 or v=3 with v=4
-        content = re.sub(r'header\.js\?v=[23]', 'header.js?v=4', content)
-        
-        # Only write if changed
-        if content != original:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            return True
-        return False
+        return bool(rewrite.rewrite_file(RULESET, file_path))
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return False
 
 def main():
-    root_dir = Path('.')
     updated_count = 0
     
     # Find all HTML files (excluding node_modules, .git, etc.)
-    html_files = []
-    for ext in ['*.html']:
-        html_files.extend(root_dir.rglob(ext))
-    
-    # Filter out unwanted directories
-    html_files = [
-        f for f in html_files 
-        if not any(part.startswith('.') or part == 'node_modules' 
-                   for part in f.parts)
-    ]
+    html_files = list(iter_html_files('.'))
     
     print(f"Found {len(html_files)} HTML files")
     
@@ -50,7 +35,7 @@ def main():
             print(f"✓ Updated: {html_file}")
             updated_count += 1
     
-    print(f"\n✅ Updated {updated_count} files from header.js?v=2 or v=3 to v=4")
+    print(f"\n✅ Updated {updated_count} files to header.js?v={HEADER_JS_VERSION}")
 
 if __name__ == '__main__':
     main()
@@ -1,30 +1,29 @@
 #!/bin/bash
 
-# Update sitemap with latest blog posts from Sanity
+# Regenerate sitemap.xml / sitemap-index.xml from the pages in the repo,
+# plus the blog posts that only exist in the CMS (blog/post.html?slug=...).
+# Those come from the Sanity snapshot, which is synced first; pass a Sanity
+# export as the first argument to read the posts from it instead.
 
-echo "🗺️  Generating updated sitemap from Sanity..."
+echo "🗺️  Generating updated sitemap..."
 echo ""
 
-cd ~/Documents/GitHub/creativejobhub-site
+cd "$(dirname "$0")"
 
-# Generate and save sitemap
-node generate-sitemap.js > sitemap-new.xml 2>&1
+args=()
+if [ -n "$1" ]; then
+    args=(--export "$1")
+elif ! python3 sync-sanity.py; then
+    echo "⚠️  Sanity sync failed, using the posts from the last snapshot"
+fi
 
-# Check if generation was successful
-if grep -q "urlset" sitemap-new.xml; then
-    # Remove the console output lines
-    sed -n '/<\?xml/,/<\/urlset>/p' sitemap-new.xml > sitemap.xml
-    rm sitemap-new.xml
-    
-    echo "✅ Sitemap updated successfully!"
+if python3 build-sitemap.py "${args[@]}"; then
     echo ""
     echo "📝 Next steps:"
     echo "   1. Review the sitemap.xml file"
-    echo "   2. Commit and push: git add sitemap.xml && git commit -m 'Update sitemap' && git push"
+    echo "   2. Commit and push: git add sitemap*.xml && git commit -m 'Update sitemap' && git push"
     echo ""
 else
     echo "❌ Error generating sitemap"
-    cat sitemap-new.xml
-    rm sitemap-new.xml
     exit 1
 fi
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Watch the site while editing and re-run the audits on what changed.
+
+Every page is parsed once at start-up; after that, saving a page re-runs
+the canonical check (against the sitemap), the head order check, the
+?v= asset version check and the link check on that page alone, and
+pages that link to a file re-check their links when it appears or
+disappears. vercel.json, _redirects and sitemap edits re-check every page
+from memory. Only findings that changed are printed.
+
+Uses inotify on Linux and polls elsewhere (or with --poll). Bulk saves
+and git checkouts are collected into one batch before auditing.
+
+Usage:
+  python3 watch-site.py
+  python3 watch-site.py --poll --interval 1
+  python3 watch-site.py --once        # audit everything once and exit
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+
+from site_tools import watch
+from site_tools.parallel import add_workers_argument
+
+SHOW_SAVED = 5
+
+
+def print_findings(path, findings, previous):
+    if not findings:
+        note = f" (fixed {len(previous)})" if previous else ''
+        print(f"   ✅ {path}{note}")
+        return
+    print(f"   {path}")
+    for audit, message in findings:
+        print(f"      {'❌' if audit in ('links', 'canonical') else '⚠️ '} {audit}: {message}")
+
+
+def print_totals(state):
+    totals = Counter(audit for findings in state.findings.values() for audit, _ in findings)
+    pages = sum(1 for findings in state.findings.values() if findings)
+    print(f"📋 {len(state.pages)} pages, {pages} with findings: "
+          + ', '.join(f"{audit} {totals[audit]}" for audit in watch.AUDITS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-audit pages as they change")
+    parser.add_argument('--root', default='.', help="site root (default: current directory)")
+    parser.add_argument('--poll', action='store_true', help="poll for changes instead of using inotify")
+    parser.add_argument('--interval', type=float, default=watch.POLL_INTERVAL,
+                        help=f"seconds between polls (default: {watch.POLL_INTERVAL})")
+    parser.add_argument('--debounce', type=int, default=int(watch.DEBOUNCE_SECONDS * 1000),
+                        help="milliseconds of quiet that close a batch of changes "
+                             f"(default: {int(watch.DEBOUNCE_SECONDS * 1000)})")
+    parser.add_argument('--once', action='store_true', help="audit every page once and exit")
+    parser.add_argument('--verbose', action='store_true', help="list every finding at start-up")
+    add_workers_argument(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = watch.SiteState(args.root, workers=args.workers)
+    print(f"🔎 Parsed {len(state.pages)} pages in {time.perf_counter() - start:.2f}s")
+    for path, error in sorted(state.errors.items()):
+        print(f"❌ Error processing {path}: {error}")
+    print_totals(state)
+    if args.verbose or args.once:
+        for path in sorted(state.findings):
+            if state.findings[path]:
+                print_findings(path, state.findings[path], [])
+    if args.once:
+        sys.exit(1 if any(state.findings.values()) else 0)
+
+    watcher = watch.make_watcher(args.root, poll=args.poll, interval=args.interval)
+    print(f"👀 Watching {args.root} ({watcher.name}); Ctrl+C to stop")
+    try:
+        for changed in watch.batches(watcher, debounce=args.debounce / 1000):
+            start = time.perf_counter()
+            stamp = time.strftime('%H:%M:%S')
+            if changed is watch.OVERFLOW or len(changed) > watch.RELOAD_THRESHOLD:
+                state.load()
+                print(f"\n[{stamp}] Reloaded everything in {time.perf_counter() - start:.2f}s")
+                print_totals(state)
+                continue
+            previous = dict(state.findings)
+            pages, results, deleted = state.apply(changed)
+            elapsed = (time.perf_counter() - start) * 1000
+            # A few saved pages are always shown; a bulk change only shows
+            # pages whose findings changed
+            saved = pages if len(pages) <= SHOW_SAVED else set()
+            shown = {path: findings for path, findings in results.items()
+                     if path in saved or findings != previous.get(path)}
+            if not shown and not deleted:
+                continue
+            print(f"\n[{stamp}] {len(pages)} pages changed, {len(results)} re-audited "
+                  f"in {elapsed:.0f} ms")
+            for path in sorted(deleted):
+                print(f"   🗑️  {path} deleted")
+            for path in sorted(shown):
+                print_findings(path, shown[path], previous.get(path))
+            for path in sorted(changed):
+                if path in state.errors:
+                    print(f"❌ Error processing {path}: {state.errors[path]}")
+    except KeyboardInterrupt:
+        print()
+    finally:
+        watcher.close()
+
+
+if __name__ == '__main__':
+    main()